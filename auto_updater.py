@@ -4,22 +4,323 @@ Checks GitHub releases and downloads updates automatically
 """
 import requests
 import os
+import re
 import sys
+import glob
 import zipfile
+import hashlib
 import tempfile
 import shutil
+import queue
+import threading
 import subprocess
 import json
 from pathlib import Path
 import time
 
+# Release endpoint override (e.g. a local stand-in server); {repo} is replaced by the repo name
+UPDATE_URL_ENV = 'EXAM_CLONE_UPDATE_URL'
+DEFAULT_API_URL = "https://api.github.com/repos/{repo}/releases/latest"
+# Don't ask GitHub again within this many seconds of the last answer
+MIN_CHECK_INTERVAL = 3600
+# A missing release (404) is remembered this long
+NOT_FOUND_CACHE_SECONDS = 6 * 3600
+# Backoff when rate limited without a Retry-After / X-RateLimit-Reset hint
+RATE_LIMIT_BACKOFF = 3600
+REQUEST_TIMEOUT = 10
+DOWNLOAD_TIMEOUT = 30
+
+# Download chunks start small and double while reads return quickly (halve when slow)
+DOWNLOAD_CHUNK_MIN = 64 * 1024
+DOWNLOAD_CHUNK_MAX = 1024 * 1024
+FAST_CHUNK_SECONDS = 0.05
+SLOW_CHUNK_SECONDS = 0.5
+# Parallel range downloads only pay off for large files
+PARALLEL_MIN_SIZE = 8 * 1024 * 1024
+# Out-of-order bytes held for hashing while parallel ranges catch up
+HASH_PENDING_LIMIT = 32 * 1024 * 1024
+SHA256_LINE = re.compile(r'sha-?256\W+([0-9a-fA-F]{64})\b', re.IGNORECASE)
+
+# Delta updates: each release publishes '<exe>.blocks.json' listing the content-defined
+# chunks of the exe; chunks the installed exe already contains are copied locally
+DELTA_MANIFEST_SUFFIX = '.blocks.json'
+DELTA_ANCHOR = b'\xa5\x5a'
+DELTA_MIN_CHUNK = 16 * 1024
+DELTA_MAX_CHUNK = 256 * 1024
+# Above this share of new bytes a plain full download is simpler
+DELTA_MAX_FETCH_FRACTION = 0.7
+
+# Staged updates: a verified exe prefetched in the background, swapped in on exit
+STAGED_MANIFEST = 'staged.json'
+# Prefetch progress events are sent at most this often
+PREFETCH_PROGRESS_SECONDS = 0.5
+# How often UpdateWindow drains prefetch events
+PREFETCH_POLL_MS = 100
+THREAD_PRIORITY_LOWEST = -2  # Windows SetThreadPriority
+PREFETCH_NICENESS = 10  # Linux, per thread
+
+
+def default_cache_dir():
+    """Per-user cache directory for update metadata"""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return os.path.join(base, 'ExamCloneTool')
+
+
+class ReleaseCache:
+    """
+    Release metadata from the last check, kept in a small JSON file:
+    url, status (200/404), etag, last_modified, checked_at, retry_after (epoch
+    seconds before which GitHub must not be asked again) and the release fields
+    the updater uses (tag_name, body, assets).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def for_url(self, url):
+        """Cached entry for url, or {} (a cache written for another endpoint is ignored)"""
+        return self.data if self.data.get('url') == url else {}
+
+    def save(self, **fields):
+        self.data.update(fields)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not write update cache: {e}")
+
+
+def release_summary(release_data):
+    """The parts of a GitHub release the updater needs (the full JSON is much larger)"""
+    return {
+        'tag_name': release_data.get('tag_name', ''),
+        'body': release_data.get('body', ''),
+        'assets': [{'name': asset.get('name', ''), 'browser_download_url': asset.get('browser_download_url'),
+                    'size': asset.get('size'), 'digest': asset.get('digest')}
+                   for asset in release_data.get('assets', [])],
+    }
+
+
+def rate_limit_until(response, now):
+    """Epoch seconds to back off until, from Retry-After / X-RateLimit-* headers; None when not limited"""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return now + max(0, int(retry_after))
+        except ValueError:
+            return now + RATE_LIMIT_BACKOFF
+    if response.headers.get('X-RateLimit-Remaining') == '0':
+        try:
+            return max(now, int(response.headers.get('X-RateLimit-Reset', '')))
+        except ValueError:
+            return now + RATE_LIMIT_BACKOFF
+    if response.status_code in (403, 429):
+        return now + RATE_LIMIT_BACKOFF
+    return None
+
+
+def content_chunks(data, anchor=DELTA_ANCHOR, min_size=DELTA_MIN_CHUNK, max_size=DELTA_MAX_CHUNK):
+    """
+    Content-defined chunking: a chunk ends right after the first anchor byte
+    sequence at least min_size into it, or at max_size. Boundaries only depend
+    on nearby bytes, so an insertion changes the chunk it falls in and the rest
+    line up again (fixed-size blocks would all shift). Yields (offset, length).
+    """
+    start = 0
+    size = len(data)
+    while start < size:
+        found = data.find(anchor, start + max(0, min_size - len(anchor)), start + max_size)
+        end = min(size, start + max_size) if found < 0 else found + len(anchor)
+        yield start, end - start
+        start = end
+
+
+def chunk_digest(chunk):
+    return hashlib.blake2b(chunk, digest_size=16).hexdigest()
+
+
+def build_delta_manifest(exe_path):
+    """Chunk list of a release exe: {'size', 'sha256', chunker parameters, 'chunks': [[length, digest], ...]}"""
+    with open(exe_path, 'rb') as f:
+        data = f.read()
+    return {
+        'format': 1,
+        'size': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'anchor': DELTA_ANCHOR.hex(),
+        'min_chunk': DELTA_MIN_CHUNK,
+        'max_chunk': DELTA_MAX_CHUNK,
+        'chunks': [[length, chunk_digest(data[offset:offset + length])] for offset, length in content_chunks(data)],
+    }
+
+
+def write_delta_manifest(exe_path, manifest_path=None):
+    """Write '<exe>.blocks.json' next to a built exe (published with the release)"""
+    manifest_path = manifest_path or exe_path + DELTA_MANIFEST_SUFFIX
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(build_delta_manifest(exe_path), f, separators=(',', ':'))
+    return manifest_path
+
+
+def adaptive_chunks(raw, size=DOWNLOAD_CHUNK_MIN):
+    """Read a streamed response body, doubling the chunk size while reads are fast and halving it when slow"""
+    while True:
+        started = time.perf_counter()
+        chunk = raw.read(size)
+        if not chunk:
+            return
+        yield chunk
+        elapsed = time.perf_counter() - started
+        if elapsed < FAST_CHUNK_SECONDS and size < DOWNLOAD_CHUNK_MAX:
+            size *= 2
+        elif elapsed > SLOW_CHUNK_SECONDS and size > DOWNLOAD_CHUNK_MIN:
+            size //= 2
+
+
+class OrderedHasher:
+    """
+    SHA-256 of a file whose byte ranges arrive out of order (parallel downloads).
+    Chunks at the hash position are hashed at once; later ones wait in memory, and
+    their writers block while more than max_pending bytes are waiting. The range
+    at the hash position never blocks, so the download always makes progress.
+    """
+
+    def __init__(self, max_pending=HASH_PENDING_LIMIT):
+        self.sha256 = hashlib.sha256()
+        self.offset = 0
+        self.max_pending = max_pending
+        self.pending = {}
+        self.pending_bytes = 0
+        self.aborted = False
+        self.condition = threading.Condition()
+
+    def add(self, offset, chunk):
+        with self.condition:
+            while (offset != self.offset and self.pending_bytes + len(chunk) > self.max_pending
+                   and not self.aborted):
+                self.condition.wait()
+            if self.aborted:
+                raise IOError("Download aborted")
+            if offset != self.offset:
+                self.pending[offset] = chunk
+                self.pending_bytes += len(chunk)
+                return
+            self.sha256.update(chunk)
+            self.offset += len(chunk)
+            while self.offset in self.pending:
+                chunk = self.pending.pop(self.offset)
+                self.pending_bytes -= len(chunk)
+                self.sha256.update(chunk)
+                self.offset += len(chunk)
+            self.condition.notify_all()
+
+    def abort(self):
+        with self.condition:
+            self.aborted = True
+            self.condition.notify_all()
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+
+def lower_thread_priority():
+    """Best effort: run the calling thread below normal priority so it never competes with the UI"""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_LOWEST)
+        elif sys.platform.startswith('linux'):
+            # Linux applies niceness to the single thread with this id
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PREFETCH_NICENESS)
+    except (OSError, AttributeError):
+        pass
+
+
+class ThrottledProgress:
+    """Progress callback wrapper that passes on at most one value per interval (and always 100%)"""
+
+    def __init__(self, callback, interval=PREFETCH_PROGRESS_SECONDS):
+        self.callback = callback
+        self.interval = interval
+        self.last_sent = None
+
+    def __call__(self, percent):
+        now = time.monotonic()
+        if percent >= 100 or self.last_sent is None or now - self.last_sent >= self.interval:
+            self.last_sent = now
+            self.callback(percent)
+
+
+class UpdatePrefetcher:
+    """
+    Downloads, verifies and stages an update on a low-priority daemon thread.
+    Nothing is called back on the caller's thread: the UI polls `events` for
+    ('progress', percent), ('staged', exe path) and ('failed', message).
+    A prefetch cut short by exiting resumes from its partial file next time.
+    """
+
+    def __init__(self, updater, download_url, version):
+        self.updater = updater
+        self.download_url = download_url
+        self.version = version
+        self.events = queue.Queue()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='update-prefetch', daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        lower_thread_priority()
+        try:
+            staged_path = self.updater.stage_update(
+                self.download_url, self.version,
+                ThrottledProgress(lambda percent: self.events.put(('progress', percent))))
+        except Exception as e:
+            self.events.put(('failed', f"Update download failed: {e}"))
+            return
+        if staged_path:
+            self.events.put(('staged', staged_path))
+        else:
+            self.events.put(('failed', "Update download failed"))
+
+
 class AutoUpdater:
-    def __init__(self, current_version, repo_name, exe_name="Exam_Clone_Tool_v2.exe"):
+    def __init__(self, current_version, repo_name, exe_name="Exam_Clone_Tool_v2.exe", api_url=None,
+                 cache_path=None, min_check_interval=MIN_CHECK_INTERVAL, download_dir=None, parallel_downloads=1,
+                 staging_dir=None):
         self.current_version = current_version
         self.repo_name = repo_name  # "zerocool5878/exam-clone-tool"
         self.exe_name = exe_name
-        self.api_url = f"https://api.github.com/repos/{repo_name}/releases/latest"
+        url = api_url or os.environ.get(UPDATE_URL_ENV) or DEFAULT_API_URL
+        self.api_url = url.replace('{repo}', repo_name)
+        self.min_check_interval = min_check_interval
+        self.cache = ReleaseCache(cache_path or os.path.join(default_cache_dir(), 'release_cache.json'))
+        # Partial downloads are kept here so an interrupted download can resume
+        self.download_dir = download_dir or os.path.join(default_cache_dir(), 'downloads')
+        self.parallel_downloads = max(1, parallel_downloads)
+        # Verified updates wait here (with STAGED_MANIFEST) until they are swapped in
+        self.staging_dir = staging_dir or os.path.join(default_cache_dir(), 'staged')
+        self.latest_release = None
+        # One pooled connection per host for metadata, checksums and (parallel) downloads
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(10, self.parallel_downloads))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.current_exe_path = self.get_current_exe_path()
+        # Only a built exe can be replaced; running from source the update is downloaded but not installed
+        self.can_self_update = bool(getattr(sys, 'frozen', False))
         
     def get_current_exe_path(self):
         """Get the path of the currently running executable"""
@@ -30,14 +331,66 @@ class AutoUpdater:
             # Running as Python script (development)
             return __file__
     
-    def check_for_updates(self):
-        """Check if a newer version is available on GitHub"""
+    def fetch_latest_release(self, force=False):
+        """
+        Latest release metadata, revalidated against GitHub only when needed.
+        Returns (release_data or None, source) where source is one of:
+        'cached'       -> answered from the cache (checked recently, or backing off after a rate limit)
+        'not_modified' -> GitHub answered 304 to If-None-Match / If-Modified-Since
+        'fresh'        -> new release JSON
+        'not_found'    -> no release (404, remembered for NOT_FOUND_CACHE_SECONDS)
+        force=True ignores the minimum interval (but not a rate-limit backoff).
+        """
+        now = time.time()
+        cached = self.cache.for_url(self.api_url)
+        cached_release = cached.get('release') if cached.get('status') == 200 else None
+        
+        if now < cached.get('retry_after', 0):
+            return cached_release, 'cached'
+        if cached and not force:
+            interval = NOT_FOUND_CACHE_SECONDS if cached.get('status') == 404 else self.min_check_interval
+            if now - cached.get('checked_at', 0) < interval:
+                return cached_release, ('not_found' if cached.get('status') == 404 else 'cached')
+        
+        headers = {'Accept': 'application/vnd.github+json', 'User-Agent': f"ExamCloneTool/{self.current_version}"}
+        if cached_release is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        response = self.session.get(self.api_url, headers=headers, timeout=REQUEST_TIMEOUT)
+        backoff = rate_limit_until(response, now)
+        
+        if response.status_code == 304 and cached_release is not None:
+            self.cache.save(checked_at=now, retry_after=backoff or 0)
+            return cached_release, 'not_modified'
+        if response.status_code == 404:
+            self.cache.save(url=self.api_url, status=404, checked_at=now, retry_after=backoff or 0,
+                            etag=None, last_modified=None, release=None)
+            return None, 'not_found'
+        if response.status_code in (403, 429) and backoff:
+            print(f"⚠️ GitHub rate limit reached, next update check after {time.ctime(backoff)}")
+            self.cache.save(url=self.api_url, retry_after=backoff)
+            return cached_release, 'cached'
+        response.raise_for_status()
+        
+        release = release_summary(response.json())
+        self.cache.save(url=self.api_url, status=200, checked_at=now, retry_after=backoff or 0,
+                        etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'),
+                        release=release)
+        return release, 'fresh'
+    
+    def check_for_updates(self, force=False):
+        """Check if a newer version is available on GitHub (see fetch_latest_release for caching)"""
         try:
             print("🔍 Checking for updates...")
-            response = requests.get(self.api_url, timeout=10)
-            response.raise_for_status()
+            release_data, source = self.fetch_latest_release(force)
+            if release_data is None:
+                print(f"ℹ️ No release information available ({source})")
+                return None, None, None
+            self.latest_release = release_data
             
-            release_data = response.json()
             latest_version = release_data.get('tag_name', '').lstrip('v')
             download_url = None
             
@@ -82,44 +435,347 @@ class AutoUpdater:
             # Fallback to string comparison
             return latest != current
     
-    def download_update(self, download_url, progress_callback=None):
-        """Download the update file"""
+    def expected_sha256(self, download_url):
+        """
+        SHA-256 published for the asset at download_url: GitHub's asset digest,
+        a '<asset name>.sha256' release asset, or a 'SHA256: <hex>' line in the
+        release notes. None when the release publishes no digest.
+        """
+        release = self.latest_release or {}
+        assets = release.get('assets', [])
+        asset = next((a for a in assets if a.get('browser_download_url') == download_url), None)
+        if asset is None:
+            return None
+        digest = asset.get('digest') or ''
+        if digest.startswith('sha256:'):
+            return digest[len('sha256:'):].lower()
+        checksum_asset = next((a for a in assets if a.get('name') == asset['name'] + '.sha256'), None)
+        if checksum_asset:
+            response = self.session.get(checksum_asset['browser_download_url'], timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            match = re.search(r'\b[0-9a-fA-F]{64}\b', response.text)
+            if match:
+                return match.group(0).lower()
+        match = SHA256_LINE.search(release.get('body') or '')
+        return match.group(1).lower() if match else None
+    
+    def delta_manifest_url(self, download_url):
+        """URL of the '<asset>.blocks.json' chunk manifest published next to download_url, or None"""
+        assets = (self.latest_release or {}).get('assets', [])
+        asset = next((a for a in assets if a.get('browser_download_url') == download_url), None)
+        if asset is None:
+            return None
+        manifest = next((a for a in assets if a.get('name') == asset['name'] + DELTA_MANIFEST_SUFFIX), None)
+        return manifest['browser_download_url'] if manifest else None
+    
+    def download_update(self, download_url, progress_callback=None, expected_sha256=None, parallel=None):
+        """
+        Download the update file into download_dir.
+        When the release publishes a chunk manifest, only the chunks the installed
+        exe lacks are fetched (see _download_delta); otherwise, or if that fails,
+        the full file is downloaded. An interrupted full download resumes from
+        its partial file with an HTTP Range request; a fresh download of a large
+        file can fetch `parallel` byte ranges at once (default: parallel_downloads).
+        The SHA-256 is computed while streaming and must match expected_sha256
+        (default: the digest published with the release), otherwise the file is
+        deleted and None returned.
+        """
         try:
             print(f"⬇️ Downloading update from: {download_url}")
+            if expected_sha256 is None:
+                expected_sha256 = self.expected_sha256(download_url)
+            
+            os.makedirs(self.download_dir, exist_ok=True)
+            target_file = os.path.join(self.download_dir, self.exe_name)
+            # The partial file is tied to its URL, so a newer release never resumes an older one
+            url_key = hashlib.blake2b(download_url.encode('utf-8'), digest_size=6).hexdigest()
+            part_file = f"{target_file}.{url_key}.part"
+            for stale in glob.glob(glob.escape(target_file) + '.*.part'):
+                if stale != part_file:
+                    os.remove(stale)
             
-            # Create temporary directory
-            temp_dir = tempfile.mkdtemp(prefix="exam_tool_update_")
-            temp_file = os.path.join(temp_dir, self.exe_name)
+            parallel = parallel or self.parallel_downloads
+            digest = None
+            manifest_url = self.delta_manifest_url(download_url)
+            if manifest_url and not os.path.exists(part_file):
+                digest = self._download_delta(download_url, manifest_url, part_file, progress_callback)
+            if digest is None and parallel > 1 and not os.path.exists(part_file):
+                head = self.session.head(download_url, allow_redirects=True, timeout=REQUEST_TIMEOUT,
+                                         headers={'Accept-Encoding': 'identity'})
+                size = int(head.headers.get('Content-Length', 0))
+                if head.ok and head.headers.get('Accept-Ranges') == 'bytes' and size >= PARALLEL_MIN_SIZE:
+                    digest = self._download_parallel(head.url, part_file, size, parallel, progress_callback)
+            if digest is None:
+                digest = self._download_resumable(download_url, part_file, progress_callback)
+            
+            if expected_sha256:
+                if digest != expected_sha256.lower():
+                    os.remove(part_file)
+                    print(f"❌ Checksum mismatch: expected {expected_sha256}, got {digest} - download discarded")
+                    return None
+                print(f"🔒 SHA-256 verified: {digest}")
+            else:
+                print(f"⚠️ No SHA-256 published for this release (downloaded file: {digest})")
             
-            # Download with progress
-            response = requests.get(download_url, stream=True, timeout=30)
+            os.replace(part_file, target_file)
+            print(f"✅ Download completed: {target_file}")
+            return target_file
+            
+        except Exception as e:
+            print(f"❌ Download failed: {e}")
+            return None
+    
+    def _download_delta(self, url, manifest_url, part_file, progress_callback=None):
+        """
+        Rebuild the new exe into part_file from the installed exe plus the missing
+        chunks of url (fetched with Range requests, one per run of missing chunks).
+        Returns the SHA-256 of the result, or None to fall back to a full download.
+        """
+        try:
+            if not os.path.isfile(self.current_exe_path):
+                return None
+            response = self.session.get(manifest_url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
+            manifest = response.json()
+            if manifest.get('format') != 1:
+                return None
             
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
+            with open(self.current_exe_path, 'rb') as f:
+                old_data = f.read()
+            local_chunks = {}
+            for offset, length in content_chunks(old_data, bytes.fromhex(manifest['anchor']),
+                                                 manifest['min_chunk'], manifest['max_chunk']):
+                local_chunks.setdefault(chunk_digest(old_data[offset:offset + length]), offset)
             
-            with open(temp_file, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if progress_callback and total_size > 0:
-                            progress = (downloaded / total_size) * 100
-                            progress_callback(progress)
+            # Plan: runs of consecutive chunks, each copied locally or fetched as one byte range
+            runs = []
+            offset = 0
+            for length, digest in manifest['chunks']:
+                local = local_chunks.get(digest)
+                if local is None and runs and runs[-1][0] == 'fetch':
+                    runs[-1][3].append((length, digest))
+                elif local is None:
+                    runs.append(['fetch', offset, None, [(length, digest)]])
+                else:
+                    runs.append(['copy', offset, local, [(length, digest)]])
+                offset += length
+            if offset != manifest['size']:
+                return None
+            fetch_bytes = sum(length for kind, _, _, chunks in runs if kind == 'fetch' for length, _ in chunks)
+            print(f"🧩 Delta update: {fetch_bytes / 1024:.0f} KB of {manifest['size'] / 1024:.0f} KB to download")
+            if fetch_bytes > manifest['size'] * DELTA_MAX_FETCH_FRACTION:
+                return None
             
-            print(f"✅ Download completed: {temp_file}")
-            return temp_file
+            sha256 = hashlib.sha256()
+            written = 0
+            with open(part_file, 'wb') as out:
+                for kind, start, local, chunks in runs:
+                    if kind == 'copy':
+                        length = chunks[0][0]
+                        pieces = [old_data[local:local + length]]
+                    else:
+                        pieces = self._fetch_chunks(url, start, chunks)
+                    for piece in pieces:
+                        out.write(piece)
+                        sha256.update(piece)
+                        written += len(piece)
+                    if progress_callback:
+                        progress_callback(written / manifest['size'] * 100)
             
+            digest = sha256.hexdigest()
+            if digest != manifest['sha256']:
+                print("⚠️ Delta result does not match the manifest, downloading the full file")
+                os.remove(part_file)
+                return None
+            return digest
         except Exception as e:
-            print(f"❌ Download failed: {e}")
+            print(f"⚠️ Delta update unavailable ({e}), downloading the full file")
+            if os.path.exists(part_file):
+                os.remove(part_file)
+            return None
+    
+    def _fetch_chunks(self, url, start, chunks):
+        """Fetch consecutive manifest chunks starting at byte `start`; each is checked against its digest"""
+        end = start + sum(length for length, _ in chunks) - 1
+        headers = {'Range': f"bytes={start}-{end}", 'Accept-Encoding': 'identity'}
+        with self.session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            if response.status_code != 206:
+                raise IOError(f"Range request answered with HTTP {response.status_code}")
+            pieces = []
+            for length, digest in chunks:
+                piece = response.raw.read(length)
+                if len(piece) != length or chunk_digest(piece) != digest:
+                    raise IOError(f"Chunk at {start} does not match the manifest")
+                pieces.append(piece)
+                start += length
+        return pieces
+    
+    def _download_resumable(self, url, part_file, progress_callback=None):
+        """Stream url into part_file, continuing after the bytes already there; returns the SHA-256"""
+        sha256 = hashlib.sha256()
+        offset = 0
+        if os.path.exists(part_file):
+            # Only the missing tail comes over the network; the existing bytes just seed the hash
+            with open(part_file, 'rb') as f:
+                for block in iter(lambda: f.read(DOWNLOAD_CHUNK_MAX), b''):
+                    sha256.update(block)
+                    offset += len(block)
+        
+        headers = {'Accept-Encoding': 'identity'}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            print(f"↩️ Resuming download at {offset} bytes")
+        with self.session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            if offset and response.status_code == 416:
+                return sha256.hexdigest()  # the partial file is already complete
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                # Server ignored the range: start over
+                sha256 = hashlib.sha256()
+                offset = 0
+            total_size = offset + int(response.headers.get('content-length', 0))
+            downloaded = offset
+            
+            with open(part_file, 'ab' if offset else 'wb') as f:
+                for chunk in adaptive_chunks(response.raw):
+                    f.write(chunk)
+                    sha256.update(chunk)
+                    downloaded += len(chunk)
+                    
+                    if progress_callback and total_size > 0:
+                        progress_callback(downloaded / total_size * 100)
+        
+        if total_size > offset and downloaded != total_size:
+            raise IOError(f"Download incomplete: {downloaded}/{total_size} bytes")
+        return sha256.hexdigest()
+    
+    def _download_parallel(self, url, part_file, size, parts, progress_callback=None):
+        """Fetch `parts` byte ranges of url concurrently into part_file; returns the SHA-256"""
+        with open(part_file, 'wb') as f:
+            f.truncate(size)
+        hasher = OrderedHasher()
+        received = [0] * parts
+        errors = []
+        
+        def fetch(index, start, end):
+            try:
+                headers = {'Range': f"bytes={start}-{end}", 'Accept-Encoding': 'identity'}
+                with self.session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                    if response.status_code != 206:
+                        raise IOError(f"Range request answered with HTTP {response.status_code}")
+                    with open(part_file, 'r+b') as f:
+                        f.seek(start)
+                        position = start
+                        for chunk in adaptive_chunks(response.raw):
+                            f.write(chunk)
+                            hasher.add(position, chunk)
+                            position += len(chunk)
+                            received[index] = position - start
+                if position != end + 1:
+                    raise IOError(f"Range {start}-{end} incomplete: {position - start} bytes")
+            except Exception as e:
+                errors.append(e)
+                hasher.abort()
+        
+        bounds = [(i * size // parts, (i + 1) * size // parts - 1) for i in range(parts)]
+        threads = [threading.Thread(target=fetch, args=(i, start, end), daemon=True)
+                   for i, (start, end) in enumerate(bounds)]
+        for thread in threads:
+            thread.start()
+        # Progress is reported from the calling thread only (callers may update a UI)
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.1)
+                if progress_callback:
+                    progress_callback(sum(received) / size * 100)
+        
+        if errors:
+            # A file with holes cannot be resumed as a single stream
+            os.remove(part_file)
+            raise errors[0]
+        return hasher.hexdigest()
+    
+    def staged_update(self):
+        """
+        The update waiting in staging_dir: {'version', 'file', 'size', 'sha256', 'path'},
+        or None. A stage that is incomplete or not newer than the running version
+        (e.g. already installed) is removed.
+        """
+        manifest_path = os.path.join(self.staging_dir, STAGED_MANIFEST)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                staged = json.load(f)
+            staged['path'] = os.path.join(self.staging_dir, staged['file'])
+            valid = (os.path.getsize(staged['path']) == staged['size']
+                     and self.is_newer_version(staged['version'], self.current_version))
+        except (OSError, ValueError, KeyError, TypeError):
+            staged, valid = None, False
+        if not valid:
+            self.discard_staged_update()
+            return None
+        return staged
+    
+    def discard_staged_update(self):
+        if os.path.isdir(self.staging_dir):
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+    
+    def stage_update(self, download_url, version, progress_callback=None):
+        """
+        Download and verify an update into staging_dir, ready to be swapped in
+        without touching the network. Returns the staged exe path, or None.
+        An update already staged for this version is returned as is.
+        """
+        staged = self.staged_update()
+        if staged and staged['version'] == version:
+            print(f"📦 Update {version} already staged: {staged['path']}")
+            return staged['path']
+        
+        expected_sha256 = self.expected_sha256(download_url)
+        new_exe_path = self.download_update(download_url, progress_callback, expected_sha256)
+        if not new_exe_path:
             return None
+        
+        self.discard_staged_update()
+        os.makedirs(self.staging_dir, exist_ok=True)
+        staged_path = os.path.join(self.staging_dir, self.exe_name)
+        os.replace(new_exe_path, staged_path)
+        # The manifest is written last: a stage without one is incomplete
+        manifest_path = os.path.join(self.staging_dir, STAGED_MANIFEST)
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'file': self.exe_name, 'size': os.path.getsize(staged_path),
+                       'sha256': expected_sha256, 'url': download_url}, f)
+        os.replace(manifest_path + '.tmp', manifest_path)
+        print(f"📦 Update {version} staged: {staged_path}")
+        return staged_path
     
-    def apply_update(self, new_exe_path):
-        """Apply the update by creating a batch script to replace the exe after exit"""
+    def apply_staged_update(self, restart=False):
+        """
+        Swap in the staged update once this process exits (no download happens here).
+        restart=True starts the new version afterwards. Returns True when an update was scheduled.
+        """
+        staged = self.staged_update()
+        if staged is None:
+            return False
+        if not self.apply_update(staged['path'], restart=restart):
+            return False
+        # The update script owns the staged exe from here on
+        try:
+            os.remove(os.path.join(self.staging_dir, STAGED_MANIFEST))
+        except OSError:
+            pass
+        return True
+    
+    def apply_update(self, new_exe_path, restart=True):
+        """
+        Apply the update by creating a batch script to replace the exe after exit.
+        restart=False only replaces the exe (installing on exit); the next launch runs the new version.
+        """
         try:
             print("🔄 Preparing update...")
             
+            if not self.can_self_update:
+                raise Exception(f"Not running as an exe, {self.current_exe_path} is left unchanged")
+            
             # Verify the downloaded file exists
             if not os.path.exists(new_exe_path):
                 raise Exception(f"Downloaded file not found: {new_exe_path}")
@@ -139,8 +795,11 @@ class AutoUpdater:
             # 1. Wait for current process to exit
             # 2. Backup current exe
             # 3. Copy new exe to current location
-            # 4. Start new exe
+            # 4. Start new exe (unless installing on exit)
             # 5. Delete temp files and itself
+            restart_command = f'''echo Starting updated application...
+start "" "{self.current_exe_path}"
+''' if restart else ''
             batch_content = f'''@echo off
 echo Waiting for application to exit...
 timeout /t 2 /nobreak >nul
@@ -159,9 +818,7 @@ if errorlevel 1 (
     exit /b 1
 )
 
-echo Starting updated application...
-start "" "{self.current_exe_path}"
-
+{restart_command}
 echo Cleaning up...
 timeout /t 1 /nobreak >nul
 del /F /Q "{new_exe_path}" >nul 2>nul
@@ -224,13 +881,13 @@ del /F /Q "%~f0" >nul 2>nul
             if not auto_install:
                 return True, f"Update available: {latest_version}"
             
-            # Download update
-            new_exe_path = self.download_update(download_url, progress_callback)
+            # Download update (returns at once when a prefetch already staged it)
+            new_exe_path = self.stage_update(download_url, latest_version, progress_callback)
             if not new_exe_path:
                 return False, "Download failed"
             
             # Apply update
-            if self.apply_update(new_exe_path):
+            if self.apply_staged_update(restart=True):
                 # Restart application
                 self.restart_application()
                 return True, "Update completed successfully"
@@ -246,15 +903,17 @@ def create_update_ui():
     from tkinter import ttk, messagebox
     
     class UpdateWindow:
-        def __init__(self, updater):
+        def __init__(self, updater, parent=None):
             self.updater = updater
-            self.root = tk.Tk()
+            self.parent = parent
+            # A dialog of the running application, or its own Tk root when run standalone
+            self.root = tk.Toplevel(parent) if parent is not None else tk.Tk()
             self.root.title("Exam Tool Updater")
             self.root.geometry("400x200")
             self.root.resizable(False, False)
             
             # Center the window
-            self.root.transient()
+            self.root.transient(parent)
             self.root.grab_set()
             
             self.setup_ui()
@@ -292,16 +951,38 @@ def create_update_ui():
             self.progress['value'] = value
             if text:
                 self.status_label.config(text=text)
-            self.root.update()
-            
-        def progress_callback(self, progress):
-            self.update_progress(progress, f"Downloading... {progress:.1f}%")
+            # Redraw only; input keeps going through the event loop
+            self.root.update_idletasks()
             
         def check_for_updates(self):
             self.update_progress(20, "Checking GitHub releases...")
+            self.start_check(self.show_check_result)
+            
+        def start_check(self, on_result):
+            """Query the release on a daemon thread; on_result(latest_version, download_url, changelog) runs on the Tk loop"""
+            self.check_results = queue.Queue()
+            
+            def check():
+                try:
+                    result = self.updater.check_for_updates()
+                except Exception as e:
+                    print(f"❌ Update check failed: {e}")
+                    result = (None, None, None)
+                self.check_results.put(result)
+            
+            threading.Thread(target=check, name='update-check', daemon=True).start()
+            self.root.after(PREFETCH_POLL_MS, self.poll_check, on_result)
             
-            latest_version, download_url, changelog = self.updater.check_for_updates()
+        def poll_check(self, on_result):
+            """Wait for the check thread without blocking the event loop"""
+            try:
+                result = self.check_results.get_nowait()
+            except queue.Empty:
+                self.root.after(PREFETCH_POLL_MS, self.poll_check, on_result)
+                return
+            on_result(*result)
             
+        def show_check_result(self, latest_version, download_url, changelog):
             if latest_version:
                 self.update_progress(100, f"Update available: {latest_version}")
                 self.install_btn.config(state=tk.NORMAL)
@@ -310,30 +991,58 @@ def create_update_ui():
                 if changelog:
                     messagebox.showinfo("Update Available", 
                                       f"Version {latest_version} is available!\n\n{changelog[:200]}...")
-                return True
             else:
                 self.update_progress(100, "You have the latest version!")
                 self.root.after(2000, self.root.destroy)
-                return False
                 
         def install_update(self):
             self.install_btn.config(state=tk.DISABLED)
-            self.cancel_btn.config(state=tk.DISABLED)
             
+            # A prefetched update installs without waiting for the network
+            if self.updater.staged_update():
+                self.finish_install()
+                return
+            
+            self.update_progress(0, "Checking GitHub releases...")
+            self.start_check(self.start_download)
+            
+        def start_download(self, latest_version, download_url, changelog):
+            if not latest_version:
+                messagebox.showerror("Update Failed", "No update available")
+                self.install_btn.config(state=tk.NORMAL)
+                return
+            self.update_progress(0, "Downloading...")
+            self.prefetcher = UpdatePrefetcher(self.updater, download_url, latest_version).start()
+            self.root.after(PREFETCH_POLL_MS, self.poll_prefetch)
+            
+        def poll_prefetch(self):
+            """Drain download events from the prefetch thread (the download never runs on the Tk loop)"""
+            while True:
+                try:
+                    kind, value = self.prefetcher.events.get_nowait()
+                except queue.Empty:
+                    self.root.after(PREFETCH_POLL_MS, self.poll_prefetch)
+                    return
+                if kind == 'progress':
+                    self.update_progress(value, f"Downloading... {value:.1f}%")
+                elif kind == 'staged':
+                    self.finish_install()
+                    return
+                else:
+                    messagebox.showerror("Update Failed", value)
+                    self.install_btn.config(state=tk.NORMAL)
+                    return
+            
+        def finish_install(self):
+            self.cancel_btn.config(state=tk.DISABLED)
             try:
-                success, message = self.updater.perform_update_check_and_install(
-                    auto_install=True, 
-                    progress_callback=self.progress_callback
-                )
-                
-                if success:
+                if self.updater.apply_staged_update(restart=True):
                     self.update_progress(100, "Update completed! Closing...")
-                    self.root.update()
                     # Close window immediately before exit
                     self.root.destroy()
-                    # Note: perform_update_check_and_install calls sys.exit(0) after this
+                    self.updater.restart_application()
                 else:
-                    messagebox.showerror("Update Failed", message)
+                    messagebox.showerror("Update Failed", "Update installation failed")
                     self.cancel_btn.config(state=tk.NORMAL)
                     
             except Exception as e:
@@ -346,7 +1055,8 @@ def create_update_ui():
         def run(self):
             # Start update check in background
             self.root.after(500, self.check_for_updates)
-            self.root.mainloop()
+            if self.parent is None:
+                self.root.mainloop()
     
     return UpdateWindow
 
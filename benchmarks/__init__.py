@@ -0,0 +1,4 @@
+"""
+Benchmarks for the exam comparison pipeline (not shipped with the executable)
+Run from the repository root: python -m benchmarks.runner
+"""
@@ -0,0 +1,118 @@
+"""
+Synthetic target/exam HTML for benchmarks
+Mimics the captures seen in debug_log.txt: numbered questions with an (id:N)
+main ID followed by the IDs of their alternatives, where several questions can
+draw from one shared alternative group (like the 127777/127778/127780/127795 cluster)
+"""
+import random
+
+ENTITIES = ['&amp;', '&quot;', '&#39;', '&nbsp;', '&lt;', '&gt;', '&ldquo;', '&rdquo;', '&#8217;', '&mdash;']
+WORDS = ['which', 'of', 'the', 'following', 'best', 'describes', 'patient', 'dose', 'value', 'result',
+         'system', 'normal', 'range', 'figure', 'table', 'select', 'all', 'that', 'apply', 'except']
+# Decoys: numbers, periods and parentheses that are not question markers.
+# Every "N. " is followed by a '(' so it cannot swallow the next question.
+NOISE_BLOCKS = [
+    '<p class="score">Score 3. of 5 (see rubric)</p>',
+    '<span class="hint">Step 2. Review the chart (optional)</span>',
+    '<div style="display:none">Version 1.2. build (42)</div>',
+    '<script>var q = {"n": 1, "t": "2. x"}; render(q);</script>',
+    '<table><tr><td>4.</td><td>(a)</td><td>10 mg</td></tr></table>',
+]
+
+
+class ExamGenerator:
+    """
+    Builds a matching target and exam capture.
+
+    questions          -> numbered questions per document
+    alternatives       -> alternative IDs listed per question
+    shared_group_size  -> questions drawing from one shared alternative group (1 = no sharing)
+    shared_fraction    -> fraction of questions that belong to a shared group
+    correct_fraction   -> fraction of exam questions that already show the target ID
+    noise              -> decoy HTML blocks per question
+    entity_density     -> fraction of question-text words followed by an HTML entity
+    duplicate_main_ids -> exam questions that repeat another question's main ID
+    """
+
+    def __init__(self, questions=30, alternatives=4, shared_group_size=3, shared_fraction=0.3,
+                 correct_fraction=0.3, noise=1, entity_density=0.1, duplicate_main_ids=0, seed=0):
+        self.questions = questions
+        self.alternatives = max(1, alternatives)
+        self.shared_group_size = max(1, shared_group_size)
+        self.shared_fraction = shared_fraction
+        self.correct_fraction = correct_fraction
+        self.noise = noise
+        self.entity_density = entity_density
+        self.duplicate_main_ids = duplicate_main_ids
+        self.random = random.Random(seed)
+        self._next_id = 127000
+
+    def _new_id(self):
+        self._next_id += 1
+        return str(self._next_id)
+
+    def _groups(self):
+        """Question positions grouped by the alternative pool they share"""
+        positions = list(range(self.questions))
+        self.random.shuffle(positions)
+        shared_count = int(self.questions * self.shared_fraction)
+        groups = []
+        # Shared groups are scattered over the exam (e.g. Q5, Q10, Q15)
+        for start in range(0, shared_count, self.shared_group_size):
+            groups.append(sorted(positions[start:min(start + self.shared_group_size, shared_count)]))
+        groups.extend([position] for position in positions[shared_count:])
+        return groups
+
+    def generate(self):
+        """Returns (target_html, exam_html)"""
+        target_main = [None] * self.questions
+        exam_main = [None] * self.questions
+        listed = [None] * self.questions  # alternative IDs shown under each question
+
+        for group in self._groups():
+            # A pool holds a target ID for every member plus spare alternatives
+            pool = [self._new_id() for _ in range(max(self.alternatives, len(group)))]
+            targets = self.random.sample(pool, len(group))
+            for position, target_id in zip(group, targets):
+                target_main[position] = target_id
+                listed[position] = pool
+                if self.random.random() < self.correct_fraction:
+                    exam_main[position] = target_id
+                else:
+                    exam_main[position] = self._new_id()  # a variant that is not in the target
+
+        for _ in range(min(self.duplicate_main_ids, self.questions - 1)):
+            position = self.random.randrange(1, self.questions)
+            exam_main[position] = exam_main[self.random.randrange(position)]
+
+        target = self._document(target_main, listed)
+        exam = self._document(exam_main, listed)
+        return target, exam
+
+    def _text(self, words):
+        parts = []
+        for _ in range(words):
+            parts.append(self.random.choice(WORDS))
+            if self.random.random() < self.entity_density:
+                parts.append(self.random.choice(ENTITIES))
+        return ' '.join(parts)
+
+    def _document(self, main_ids, listed):
+        parts = ['<!DOCTYPE html><html><head><title>Practice Exam &amp; Review</title>',
+                 '<style>.q{margin:4px} .alt{color:#333}</style></head><body><div id="exam">']
+        for position, main_id in enumerate(main_ids):
+            parts.append(f'<div class="q"><p>{position + 1}. {self._text(12)}? (id:{main_id})</p><ul>')
+            for alt_id in listed[position]:
+                if alt_id != main_id:
+                    parts.append(f'<li class="alt">{self._text(6)} (id:{alt_id})</li>')
+            parts.append('</ul>')
+            for _ in range(self.noise):
+                parts.append(self.random.choice(NOISE_BLOCKS))
+            parts.append('</div>')
+        parts.append('</div></body></html>')
+        return ''.join(parts)
+
+
+def generate_pair(questions=30, **options):
+    """Shortcut for ExamGenerator(questions, **options).generate()"""
+    return ExamGenerator(questions, **options).generate()
@@ -0,0 +1,111 @@
+"""
+Import-time report and budget check
+Runs `python -X importtime -c "import MODULE"` in fresh interpreters and
+aggregates the per-module lines by top-level package.
+
+Usage:
+    python -m benchmarks.import_time exam_analysis [--runs 5] [--top 15] [--json report.json]
+    python -m benchmarks.import_time exam_analysis --budget-ms 150    # exit 1 when over budget
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MODULE = 'exam_analysis'
+
+
+def parse_importtime(stderr):
+    """-X importtime lines -> [(name, depth, self_us, cumulative_us)] in import order"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        imports.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure_import(module, python=sys.executable):
+    """One cold import of module in a new interpreter (site, encodings etc. excluded)"""
+    result = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    imports = parse_importtime(result.stderr)
+    total = next((cumulative for name, depth, _, cumulative in imports if name == module and depth == 0), None)
+    if total is None:
+        raise RuntimeError(f"no import time reported for {module} (already imported at startup?)")
+    # Only what importing the module pulled in: the lines after interpreter startup
+    start = max(i for i, (name, depth, _, _) in enumerate(imports) if name in ('site', 'encodings') and depth == 0)
+    return total, imports[start + 1:]
+
+
+def aggregate(imports):
+    """Self time per top-level package, largest first: [(package, self_us, modules)]"""
+    packages = {}
+    for name, _, self_us, _ in imports:
+        top = name.split('.')[0]
+        total, count = packages.get(top, (0, 0))
+        packages[top] = (total + self_us, count + 1)
+    return sorted(((top, total, count) for top, (total, count) in packages.items()),
+                  key=lambda item: item[1], reverse=True)
+
+
+def import_report(module, runs=5):
+    """Fastest of several cold imports, with its per-package breakdown"""
+    best_total, best_imports = None, None
+    totals = []
+    for _ in range(runs):
+        total, imports = measure_import(module)
+        totals.append(total)
+        if best_total is None or total < best_total:
+            best_total, best_imports = total, imports
+    return {
+        'module': module,
+        'runs': runs,
+        'min_ms': best_total / 1000,
+        'all_ms': [total / 1000 for total in totals],
+        'packages': [{'package': top, 'self_ms': total / 1000, 'modules': count}
+                     for top, total, count in aggregate(best_imports)],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.import_time",
+                                     description="Aggregated -X importtime report with an optional budget")
+    parser.add_argument("modules", nargs='*', default=[DEFAULT_BUDGET_MODULE], help="modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module (the fastest counts)")
+    parser.add_argument("--top", type=int, default=15, help="packages listed per module")
+    parser.add_argument("--budget-ms", type=float, help="fail when a module's cold import takes longer")
+    parser.add_argument("--json", help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    reports = []
+    over_budget = []
+    for module in args.modules:
+        report = import_report(module, args.runs)
+        reports.append(report)
+        print(f"📦 import {module}: {report['min_ms']:.1f} ms (fastest of {args.runs})")
+        for package in report['packages'][:args.top]:
+            print(f"   {package['package']:<28} {package['self_ms']:>8.1f} ms  ({package['modules']} modules)")
+        if args.budget_ms is not None and report['min_ms'] > args.budget_ms:
+            over_budget.append(module)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'budget_ms': args.budget_ms, 'reports': reports}, f, indent=2)
+
+    if over_budget:
+        print(f"❌ Over the {args.budget_ms:.0f} ms import budget: {', '.join(over_budget)}")
+        return 1
+    if args.budget_ms is not None:
+        print(f"✅ Within the {args.budget_ms:.0f} ms import budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Per-stage benchmark of the comparison pipeline on synthetic captures
+
+Usage:
+    python -m benchmarks.runner [--sizes 10 100 1000 10000 100000] [--repeat 3] [--output bench.json]
+    python -m benchmarks.runner --compare previous.json    # ratio per stage against an earlier run
+"""
+import sys
+import json
+import html
+import time
+import platform
+import argparse
+import statistics
+
+from benchmarks.generator import ExamGenerator
+from exam_parser import ParsedExam, parse_cache
+from exam_matching import DEFAULT_MATCHING_ENGINE, ENGINE_CHOICES
+from exam_analysis import (detect_file_type_from_content, extract_comp_test_mapping_from_content,
+                           resolve_conflicts)
+from exam_report import CloneReport
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+STAGES = ['unescape', 'parse', 'detect_file_type', 'comp_test_mapping', 'resolve_conflicts', 'build_report']
+
+
+def run_stages(target_html, exam_html, engine=DEFAULT_MATCHING_ENGINE):
+    """Run the pipeline once, stage by stage; returns ({stage: seconds}, counts)"""
+    timings = {}
+
+    def timed(stage, function, *args, **kwargs):
+        start_time = time.perf_counter()
+        result = function(*args, **kwargs)
+        timings[stage] = time.perf_counter() - start_time
+        return result
+
+    # Each stage gets the previous stage's output, so nothing is parsed twice
+    target_text, exam_text = timed('unescape', lambda: (html.unescape(target_html), html.unescape(exam_html)))
+    target_parsed, exam_parsed = timed('parse', lambda: (ParsedExam(target_text), ParsedExam(exam_text)))
+    file_type, _ = timed('detect_file_type', detect_file_type_from_content, target_parsed)
+    mapping, error = timed('comp_test_mapping', extract_comp_test_mapping_from_content,
+                           target_parsed, exam_parsed, engine=engine)
+    if error:
+        raise RuntimeError(error)
+    resolved = timed('resolve_conflicts', resolve_conflicts, mapping, target_parsed, exam_parsed)
+    report = timed('build_report', CloneReport.build, exam_parsed.question_ids(), resolved or mapping,
+                   target_parsed.question_ids())
+
+    counts = {
+        'target_questions': len(target_parsed),
+        'exam_questions': len(exam_parsed),
+        'file_type': file_type,
+        'changes_needed': report.summary['changes_needed'],
+        'unknown': report.summary['unknown'],
+    }
+    return timings, counts
+
+
+def benchmark_size(questions, repeat, engine, options):
+    generator = ExamGenerator(questions, **options)
+    target_html, exam_html = generator.generate()
+
+    runs = []
+    counts = None
+    for _ in range(repeat):
+        parse_cache.clear()
+        timings, counts = run_stages(target_html, exam_html, engine)
+        runs.append(timings)
+
+    stages = {}
+    for stage in STAGES:
+        samples = [timings[stage] for timings in runs]
+        stages[stage] = {'min': min(samples), 'median': statistics.median(samples)}
+    return {
+        'questions': questions,
+        'target_bytes': len(target_html.encode('utf-8')),
+        'exam_bytes': len(exam_html.encode('utf-8')),
+        'counts': counts,
+        'stages': stages,
+        'total_min': sum(stage['min'] for stage in stages.values()),
+    }
+
+
+def compare_results(current, previous):
+    """Yield report lines with the min-time ratio per size and stage (> 1.0 = slower now)"""
+    previous_by_size = {result['questions']: result for result in previous['results']}
+    for result in current['results']:
+        old = previous_by_size.get(result['questions'])
+        if old is None:
+            continue
+        ratios = []
+        for stage in STAGES:
+            before = old['stages'].get(stage, {}).get('min')
+            after = result['stages'][stage]['min']
+            if before:
+                ratios.append(f"{stage} x{after / before:.2f}")
+        yield f"{result['questions']:>7} questions: " + ", ".join(ratios)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmarks.runner",
+                                     description="Time each pipeline stage on synthetic captures")
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES, help="question counts to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size (min and median are reported)")
+    parser.add_argument("--engine", choices=ENGINE_CHOICES, default=DEFAULT_MATCHING_ENGINE)
+    parser.add_argument("--alternatives", type=int, default=4, help="alternatives per question")
+    parser.add_argument("--shared-group-size", type=int, default=3, help="questions per shared alternative group")
+    parser.add_argument("--shared-fraction", type=float, default=0.3, help="fraction of questions in shared groups")
+    parser.add_argument("--correct-fraction", type=float, default=0.3, help="exam questions already correct")
+    parser.add_argument("--noise", type=int, default=1, help="decoy HTML blocks per question")
+    parser.add_argument("--entity-density", type=float, default=0.1, help="entities per question-text word")
+    parser.add_argument("--duplicate-main-ids", type=int, default=0, help="exam questions repeating a main ID")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    options = {
+        'alternatives': args.alternatives,
+        'shared_group_size': args.shared_group_size,
+        'shared_fraction': args.shared_fraction,
+        'correct_fraction': args.correct_fraction,
+        'noise': args.noise,
+        'entity_density': args.entity_density,
+        'duplicate_main_ids': args.duplicate_main_ids,
+        'seed': args.seed,
+    }
+
+    results = []
+    for questions in args.sizes:
+        result = benchmark_size(questions, args.repeat, args.engine, options)
+        results.append(result)
+        breakdown = ", ".join(f"{stage} {result['stages'][stage]['min'] * 1000:.1f}" for stage in STAGES)
+        print(f"⏱️ {questions:>7} questions ({result['exam_bytes'] / 1024:.0f} KB): "
+              f"{result['total_min'] * 1000:.1f} ms total - {breakdown} (ms)")
+
+    output = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'engine': args.engine,
+            'repeat': args.repeat,
+            'generator': options,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        print("=" * 30 + " COMPARISON " + "=" * 30)
+        for line in compare_results(output, previous):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -139,6 +139,11 @@ def main():
     exe_path = build_executable()
     
     if exe_path:
+        # Chunk manifest for delta updates (upload it next to the .exe)
+        from auto_updater import write_delta_manifest
+        manifest_path = write_delta_manifest(exe_path)
+        print(f"🧩 Delta manifest created: {manifest_path}")
+        
         # Create release notes
         create_release_notes()
         
@@ -147,7 +152,7 @@ def main():
         print("\n📋 Next steps:")
         print("1. Test the executable")
         print("2. Create GitHub release")
-        print("3. Upload the .exe file as a release asset")
+        print("3. Upload the .exe file and its .blocks.json manifest as release assets")
         print("4. Update version number for next release")
     else:
         print("❌ Build failed!")
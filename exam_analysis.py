@@ -0,0 +1,721 @@
+"""
+Exam comparison pipeline
+Type detection, comp test mapping, conflict resolution and report building.
+No UI imports here so it can run headless (see exam_cli.py).
+"""
+import re
+import time
+import logging
+from array import array
+
+from exam_parser import ParsedExam, parse_exam, parse_exam_file, parse_cache
+from exam_progress import ProgressEvent, AnalysisCancelled, check_cancelled
+from exam_report import CloneReport
+from exam_timing import StageTimer, document_size
+from exam_ids import target_codes, code_map, to_bits, bits_codes
+from exam_matching import (DEFAULT_MATCHING_ENGINE, FEWEST_CHANGES_ENGINE,
+                           fewest_changes_assignment, get_matching_engine)
+
+logger = logging.getLogger(__name__)
+
+def _duplicate_questions(parsed):
+    """{main ID: ['Q<n>', ...]} for the main IDs that head more than one question"""
+    questions = {}
+    for q_num, main_id in parsed.numbered:
+        questions.setdefault(main_id, []).append(f"Q{q_num}")
+    return {main_id: found for main_id, found in questions.items() if len(found) > 1}
+
+def resolve_conflicts(mapping_dict, target_content, exam_content):
+    """
+    Resolve conflicts where multiple exam IDs map to the same target ID.
+    Returns updated mapping with conflicts resolved.
+    """
+    try:
+        target_parsed = parse_exam(target_content)
+        exam_parsed = parse_exam(exam_content)
+
+        # Target main IDs are dense codes; any other ID has the code `other` (see exam_ids)
+        codes = target_codes(target_parsed)
+        exam_codes = codes.encode_document(exam_parsed)
+        ids, other = codes.ids, codes.other
+
+        # Check for duplicate target main IDs
+        duplicate_target_ids = _duplicate_questions(target_parsed) if target_parsed.has_duplicate_main_ids() else {}
+        if duplicate_target_ids:
+            logger.debug("WARNING: Duplicate target main IDs detected!")
+            for main_id, questions in duplicate_target_ids.items():
+                logger.debug("  Target ID %s appears in: %s", main_id, ', '.join(questions))
+
+        # Check for duplicate exam main IDs
+        duplicate_exam_ids = _duplicate_questions(exam_parsed) if exam_parsed.has_duplicate_main_ids() else {}
+        if duplicate_exam_ids:
+            logger.debug("WARNING: Duplicate exam main IDs detected!")
+            for main_id, questions in duplicate_exam_ids.items():
+                logger.debug("  Exam ID %s appears in: %s", main_id, ', '.join(questions))
+
+        # Exam main IDs that are also target main IDs, as a code map
+        exam_main_ids = code_map(exam_codes.mains, codes.size)
+
+        # Identify conflicts; usage[code] counts the mapping entries pointing at each target main ID
+        # (mapped IDs outside the target, normally none, are counted by string)
+        usage = array('I', bytes(4 * codes.size))
+        first_user = [None] * codes.size
+        other_usage = {}
+        other_first_user = {}
+        conflicts = {}
+
+        for exam_id, target_id, code in zip(mapping_dict, mapping_dict.values(), codes.encode(mapping_dict.values())):
+            if code == other:
+                used = other_usage.get(target_id, 0)
+                other_usage[target_id] = used + 1
+                if not used:
+                    other_first_user[target_id] = exam_id
+                    continue
+                first = other_first_user[target_id]
+            else:
+                used = usage[code]
+                usage[code] = used + 1
+                if not used:
+                    first_user[code] = exam_id
+                    continue
+                first = first_user[code]
+            # Conflict found
+            if target_id not in conflicts:
+                conflicts[target_id] = []
+            conflicts[target_id].append(exam_id)
+            conflicts[target_id].append(first)
+
+        logger.debug("Found %s conflicted target IDs", len(conflicts))
+
+        # If there are duplicate main IDs, add extra validation
+        if duplicate_target_ids or duplicate_exam_ids:
+            logger.debug("Using enhanced validation due to duplicate main IDs")
+
+        # Resolve conflicts by finding alternative mappings
+        resolved_mapping = mapping_dict.copy()
+        offsets, flat = exam_codes.offsets, exam_codes.flat
+
+        for target_id, conflicted_exam_ids in conflicts.items():
+            logger.debug("Resolving conflict for target ID %s with exam IDs %s", target_id, conflicted_exam_ids)
+
+            # Keep first exam ID, reassign others
+            for i, exam_id in enumerate(conflicted_exam_ids[1:], 1):
+                logger.debug("Finding alternative for exam ID %s", exam_id)
+
+                # Alternatives come from the exam question's section (IDs with their codes)
+                index = exam_parsed.index_for_main_id(exam_id)
+                alternatives = [] if index is None else \
+                    [(alt_id, code) for alt_id, code in zip(exam_parsed.section_ids[index],
+                                                            flat[offsets[index]:offsets[index + 1]])
+                     if alt_id != exam_id]
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Alternatives for exam_id %s: %s", exam_id, [alt_id for alt_id, _ in alternatives])
+
+                # Find alternative that doesn't conflict (forbidden: target IDs the mapping uses now)
+                new_target = None
+
+                for alt_id, alt_code in alternatives:
+                    # Enhanced validation for duplicate main IDs
+                    is_valid_target = alt_code != other
+                    is_not_exam_main = not exam_main_ids[alt_code]
+                    is_not_forbidden = not usage[alt_code]
+
+                    # Additional check: if target has duplicates, warn but allow
+                    if alt_id in duplicate_target_ids:
+                        logger.debug("Warning - alternative %s is a duplicate target ID", alt_id)
+
+                    # Additional check: if alternative is duplicate exam main, reject
+                    if alt_id in duplicate_exam_ids:
+                        logger.debug("Rejecting alternative %s - is duplicate exam main ID", alt_id)
+                        is_not_exam_main = False
+
+                    if is_valid_target and is_not_exam_main and is_not_forbidden:
+                        new_target = alt_code
+                        break
+
+                if new_target is not None:
+                    previous = resolved_mapping[exam_id]
+                    previous_code = codes.codes.get(previous, other)
+                    if previous_code == other:
+                        other_usage[previous] -= 1
+                    else:
+                        usage[previous_code] -= 1
+                    usage[new_target] += 1
+                    resolved_mapping[exam_id] = ids[new_target]
+                    logger.debug("Reassigned exam ID %s from %s to %s", exam_id, target_id, ids[new_target])
+                else:
+                    logger.debug("Could not find alternative for exam ID %s", exam_id)
+
+        return resolved_mapping
+
+    except Exception as e:
+        logger.debug("Error in conflict resolution: %s", e)
+        return None
+    
+def extract_exam_sections(exam_content):
+    """Extract question sections from exam content"""
+    parsed = ParsedExam(exam_content)
+    logger.debug("Found %s numbered questions in exam content.", len(parsed))
+    sections = {}
+    for i, (q_num, main_id) in enumerate(parsed.numbered):
+        sections[main_id] = parsed.section(i)
+    logger.debug("Extracted %s sections from exam content.", len(sections))
+    return sections
+
+def get_alternatives_for_exam_id(exam_id, exam_sections):
+    """Get alternatives for a specific exam ID"""
+    if exam_id in exam_sections:
+        section_content = exam_sections[exam_id]
+        all_ids = re.findall(r'\(id:(\d+)\)', section_content)
+        alternatives = [alt_id for alt_id in all_ids if alt_id != exam_id]
+        logger.debug("Alternatives for exam_id %s: %s", exam_id, alternatives)
+        return alternatives
+    logger.debug("No section found for exam_id %s in exam_sections.", exam_id)
+    return []
+
+def extract_numbered_questions_from_content(content):
+    """Extract numbered questions from HTML content (not file)"""
+    if not content:
+        return None, "No content provided"
+    
+    parsed = parse_exam(content)
+    
+    if not parsed.numbered:
+        return None, "No numbered questions found"
+    
+    # Sorted by question number
+    return parsed.question_ids(), None
+
+def detect_file_type_from_content(content):
+    """Detect file type from HTML content (not file)"""
+    if not content:
+        return None, "No content provided"
+    
+    parsed = parse_exam(content)
+    numbered_matches = parsed.numbered
+    
+    if len(numbered_matches) < 5:
+        # Not enough numbered questions to analyze
+        return None, f"Not enough numbered questions found ({len(numbered_matches)}). Need at least 5."
+    
+    # Count alternatives per question
+    alternative_counts = [len(unique_ids) for unique_ids in parsed.section_ids]
+    
+    if not alternative_counts:
+        return None, "Could not analyze question structure"
+    
+    avg_alternatives = sum(alternative_counts) / len(alternative_counts)
+    
+    if avg_alternatives >= 3:
+        return "normal_target", f"Normal target file with {len(numbered_matches)} questions (avg {avg_alternatives:.1f} IDs/question - has alternatives)"
+    else:
+        return "comp_test", f"Comp test file with {len(numbered_matches)} questions (avg {avg_alternatives:.1f} IDs/question - single IDs)"
+
+def extract_numbered_questions(filepath):
+    """Extract numbered questions from exam file"""
+    try:
+        # Streamed in chunks, the file is never held in memory as a whole
+        parsed = parse_exam_file(filepath)
+    except Exception as e:
+        return None, f"Error reading file: {e}"
+    
+    if not parsed.numbered:
+        return None, "No numbered questions found"
+    
+    # Sorted by question number
+    return parsed.question_ids(), None
+
+def detect_file_type(filepath):
+    """Detect file type based on alternatives structure:
+    - normal_target: Has numbered questions with multiple IDs (alternatives)
+    - comp_test: Has numbered questions with single IDs (no alternatives)
+    """
+    try:
+        # Streamed in chunks, the file is never held in memory as a whole
+        parsed = parse_exam_file(filepath)
+    except Exception as e:
+        return None, f"Error reading file: {e}"
+    
+    numbered_matches = parsed.numbered
+    
+    if len(numbered_matches) < 5:
+        # Not enough numbered questions to analyze
+        unique_ids = list(dict.fromkeys(parsed.all_ids))
+        
+        if len(unique_ids) >= 10:
+            return "comp_test", f"Comp test file with {len(unique_ids)} unique IDs (no numbered structure)"
+        else:
+            return "unknown", "Unable to determine file type"
+    
+    # Analyze first 5 questions to check for alternatives
+    total_ids_in_sections = 0
+    
+    for i in parsed.sorted_order()[:5]:
+        total_ids_in_sections += len(parsed.section_ids[i])
+    
+    # Calculate average IDs per question
+    avg_ids_per_question = total_ids_in_sections / min(5, len(numbered_matches))
+    
+    if avg_ids_per_question > 2.0:
+        return "normal_target", f"Normal target file with {len(numbered_matches)} questions (avg {avg_ids_per_question:.1f} IDs/question - has alternatives)"
+    else:
+        return "comp_test", f"Comp test file with {len(numbered_matches)} questions (avg {avg_ids_per_question:.1f} IDs/question - no alternatives)"
+
+def extract_comp_test_mapping_from_content(target_content, exam_content, engine=DEFAULT_MATCHING_ENGINE, costs=None,
+                                           matcher=None, cancel=None):
+    """
+    Content-based version of comp test mapping for browser capture
+    Goal: Make exam's main IDs exactly match target's main IDs by selecting correct alternatives
+    engine: 'hopcroft_karp' (maximum coverage), 'greedy' (original most-constrained-first)
+            or 'min_cost_flow' (maximum coverage with fewest changes, may move correct questions)
+    costs: edge costs for 'min_cost_flow' (see exam_matching.DEFAULT_CHANGE_COSTS)
+    matcher: optional IncrementalMatcher that repairs the previous 'hopcroft_karp' result
+    cancel: optional CancelToken checked by parsing and matching (raises AnalysisCancelled)
+    """
+    try:
+        target_parsed = parse_exam(target_content, cancel)
+        exam_parsed = parse_exam(exam_content, cancel)
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        # ONLY target main IDs matter - these are what exam must match. They are dense codes
+        # 0..other-1 and every other ID has the code `other` (see exam_ids); the engines still get strings
+        codes = target_codes(target_parsed)
+        exam_codes = codes.encode_document(exam_parsed)
+        ids, other = codes.ids, codes.other
+
+        logger.debug("Target has %s main questions", len(target_parsed))
+        if debug:
+            logger.debug("Target main IDs (must match these): %s", sorted(target_parsed.main_ids()))
+
+        logger.debug("Exam has %s questions", len(exam_parsed))
+        if debug:
+            logger.debug("Exam current main IDs: %s", sorted(exam_parsed.main_ids()))
+
+        # STEP 1: Every exam question by number (question_num -> question index); its section
+        # codes (current main ID included) are exam_codes.flat[offsets[i]:offsets[i + 1]]
+        question_index = {}
+        for i in exam_parsed.sorted_order():
+            question_index[int(exam_parsed.numbered[i][0])] = i
+        mains, offsets, flat = exam_codes.mains, exam_codes.offsets, exam_codes.flat
+        if debug:
+            for question_num, i in question_index.items():
+                logger.debug("Q%s current=%s, all_ids=%s", question_num, exam_parsed.numbered[i][1],
+                             exam_parsed.section_ids[i])
+
+        # STEP 2: Identify which questions need changes and what their options are
+        questions_needing_change = {}  # question_num -> list of valid target IDs it can switch to
+        already_correct = []  # (question_num, code) of questions holding a target main ID
+
+        for question_num, i in question_index.items():
+            current = mains[i]
+            
+            # If current ID is already in target, no change needed
+            if current != other:
+                already_correct.append((question_num, current))
+                if debug:
+                    logger.debug("Q%s: ID %s already matches target - no change needed", question_num, ids[current])
+                continue
+            
+            # Find which alternatives are valid target main IDs (the current ID is not one)
+            valid_alternatives = [ids[code] for code in flat[offsets[i]:offsets[i + 1]] if code != other]
+            
+            if valid_alternatives:
+                questions_needing_change[question_num] = {
+                    'current_id': exam_parsed.numbered[i][1],
+                    'options': valid_alternatives
+                }
+                if debug:
+                    logger.debug("Q%s: needs change, options=%s", question_num, valid_alternatives)
+            elif debug:
+                logger.debug("Q%s: needs change but has NO valid alternatives!", question_num)
+
+        # STEP 3: Perfect matching - assign alternatives to ensure all target IDs are covered
+        exam_to_target_mapping = {}
+        used_target_ids = set()
+        remaining = []
+        
+        if engine == FEWEST_CHANGES_ENGINE:
+            # Every question is movable, including ones that already hold a target ID
+            question_alternatives = {question_num: {'current_id': exam_parsed.numbered[i][1],
+                                                    'all_ids': exam_parsed.section_ids[i]}
+                                     for question_num, i in question_index.items()}
+            chosen = fewest_changes_assignment(question_alternatives, target_parsed.main_ids(), costs, cancel)
+            for question_num, chosen_target in chosen.items():
+                current_id = question_alternatives[question_num]['current_id']
+                if chosen_target != current_id:
+                    exam_to_target_mapping[current_id] = chosen_target
+                    if debug:
+                        logger.debug("Q%s: %s -> %s", question_num, current_id, chosen_target)
+                used_target_ids.add(chosen_target)
+        else:
+            # Add IDs that are already correct (no change needed)
+            for question_num, code in already_correct:
+                used_target_ids.add(ids[code])
+                if debug:
+                    logger.debug("Q%s: keeping %s (already correct)", question_num, ids[code])
+
+            logger.debug("Starting conflict resolution. %s questions need changes", len(questions_needing_change))
+            if debug:
+                logger.debug("Already matched target IDs: %s", sorted(used_target_ids))
+
+            # Assign alternatives with the selected engine (maximum matching by default)
+            if matcher is not None and engine == 'hopcroft_karp':
+                assignment, remaining = matcher.solve(questions_needing_change, used_target_ids,
+                                                      target_parsed.main_ids(), cancel=cancel)
+            else:
+                assignment, remaining = get_matching_engine(engine)(questions_needing_change, used_target_ids,
+                                                                    cancel=cancel)
+            for q_num, chosen_target in assignment.items():
+                exam_to_target_mapping[questions_needing_change[q_num]['current_id']] = chosen_target
+                used_target_ids.add(chosen_target)
+        
+        if remaining:
+            # Like the fewest-changes solver: these questions stay unmapped and show up as unknown
+            logger.warning("Could not find valid alternatives for %s questions: %s", len(remaining), remaining)
+
+        # STEP 4: Validate the solution
+        logger.debug("=== VALIDATION ===")
+        logger.debug("Mappings to apply: %s", len(exam_to_target_mapping))
+        
+        # Check for duplicates
+        assigned_targets = list(exam_to_target_mapping.values())
+        if len(assigned_targets) != len(set(assigned_targets)):
+            logger.debug("ERROR: Duplicate target assignments detected!")
+            return None, "Duplicate assignments - algorithm error"
+        
+        # Calculate final coverage (target main IDs left without a question, as bitsets)
+        if debug:
+            target_bits = to_bits(code_map(range(other), codes.size))
+            matched_bits = to_bits(code_map(codes.encode(used_target_ids), codes.size)) & target_bits
+            logger.debug("Final matched target IDs: %s/%s", matched_bits.bit_count(), target_bits.bit_count())
+            logger.debug("Matched: %s", sorted(used_target_ids))
+            missing_bits = target_bits & ~matched_bits
+            if missing_bits:
+                logger.debug("WARNING: %s target IDs not matched: %s", missing_bits.bit_count(),
+                             sorted(ids[code] for code in bits_codes(missing_bits)))
+        
+        return exam_to_target_mapping, None
+
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        return None, f"Error in comp test mapping: {e}"
+    
+def extract_comp_test_mapping(comp_test_filepath, exam_filepath):
+    """
+    Extract mapping for comp_test scenario using POSITIONAL matching
+    - comp_test_filepath: target file (contains the correct answers)
+    - exam_filepath: exam file (current selections to compare against target)
+    
+    CORRECT Logic: Position-based matching
+    - Exam Q8 should get alternatives from Target Q8 (same position)
+    - NOT based on ID matching across different question numbers
+    """
+    try:
+        # Stream-parse target and exam files
+        target_parsed = parse_exam_file(comp_test_filepath)
+        exam_parsed = parse_exam_file(exam_filepath)
+    except Exception as e:
+        return None, f"Error reading files: {e}"
+    
+    # Extract target numbered questions (main questions in target)
+    target_sorted = target_parsed.sorted_numbered()
+    
+    logger.debug("Target has %s main questions", len(target_sorted))
+    
+    # Create set of target main IDs for quick lookup
+    target_main_ids = set(qid for _, qid in target_sorted)
+    
+    # Build target question sections with all their alternatives
+    target_alternatives_map = {}  # alternative_id -> main_id
+    
+    for i in target_parsed.sorted_order():
+        target_q_num, target_main_id = target_parsed.numbered[i]
+        section_unique = target_parsed.section_ids[i]
+        
+        # Map all IDs in this target section to the main ID
+        for alt_id in section_unique:
+            target_alternatives_map[alt_id] = target_main_id
+        
+        logger.debug("Target Q%s (main:%s) has %s IDs", target_q_num, target_main_id, len(section_unique))
+    
+    # Extract exam numbered questions with their alternatives
+    exam_sorted = exam_parsed.sorted_numbered()
+    
+    logger.debug("Exam has %s questions", len(exam_sorted))
+    
+    # CORRECT APPROACH: Alternative-based matching
+    # For each exam question, find its alternatives and see which target main ID they match
+    exam_to_target_mapping = {}
+    
+    # Create set of all target main IDs for quick lookup
+    target_main_ids = set(main_id for _, main_id in target_sorted)
+    
+    # Create set of all exam main IDs to avoid conflicts
+    exam_main_ids = set(main_id for _, main_id in exam_sorted)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Exam main IDs: %s", sorted(exam_main_ids))
+        logger.debug("Target main IDs: %s", sorted(target_main_ids))
+    
+    for i in exam_parsed.sorted_order():
+        exam_q_num, exam_main_id = exam_parsed.numbered[i]
+        question_num = int(exam_q_num)
+        
+        logger.debug("Processing exam Q%s (current ID: %s)", question_num, exam_main_id)
+        
+        # FIRST: Check if current exam ID is already a target main ID
+        if exam_main_id in target_main_ids:
+            logger.debug("Q%s current ID %s is already a target main ID - no change needed",
+                         question_num, exam_main_id)
+            continue
+        
+        # The question's section lists all its alternatives
+        exam_unique_ids = exam_parsed.section_ids[i]
+        if exam_unique_ids:
+            # Get alternatives (excluding current main ID)
+            exam_alternatives = [alt_id for alt_id in exam_unique_ids if alt_id != exam_main_id]
+            
+            logger.debug("Exam Q%s has alternatives: %s", question_num, exam_alternatives)
+            
+            # IMPROVED: Check alternatives against target main IDs, avoiding conflicts
+            matching_alternative = None
+            for alt_id in exam_alternatives:
+                if alt_id in target_main_ids:
+                    # Check if this target main ID is NOT already used as a main ID in exam
+                    if alt_id not in exam_main_ids:
+                        matching_alternative = alt_id
+                        # Find which target question this matches
+                        for target_q_num, target_main_id in target_sorted:
+                            if target_main_id == alt_id:
+                                logger.debug("Exam Q%s alternative %s matches target Q%s (conflict-free)",
+                                             question_num, alt_id, target_q_num)
+                                break
+                        break
+                    else:
+                        logger.debug("Exam Q%s alternative %s matches target main ID but conflicts with exam Q - skipping",
+                                     question_num, alt_id)
+            
+            if matching_alternative:
+                exam_to_target_mapping[exam_main_id] = matching_alternative
+                logger.debug("Q%s should change from %s -> %s", question_num, exam_main_id, matching_alternative)
+            else:
+                logger.debug("Q%s - no alternatives match any target main ID", question_num)
+        else:
+            logger.debug("Q%s - could not extract section", question_num)
+
+    logger.debug("Total alternative-based mappings: %s", len(exam_to_target_mapping))
+    return exam_to_target_mapping, None
+
+def extract_target_mapping_from_content(content):
+    """Extract alternative-to-main mapping from HTML content"""
+    if not content:
+        return None, "No content provided"
+    
+    # Question sections come from the single-pass index
+    parsed = parse_exam(content)
+    
+    # Build mapping from each question's section
+    alternative_to_main = {}
+    
+    for i in parsed.sorted_order():
+        q_num, main_id = parsed.numbered[i]
+        unique_ids = parsed.section_ids[i]
+        
+        # Map all IDs in this section to the main ID
+        # Only map if ID hasn't been seen before (first occurrence wins)
+        # Exception: for Q17/Q22 shared alternatives, prefer Q22
+        for alt_id in unique_ids:
+            if alt_id not in alternative_to_main:
+                alternative_to_main[alt_id] = main_id
+            else:
+                # Handle Q17/Q22 conflict - prefer Q22 (136044) over Q17 (136045)
+                existing_main = alternative_to_main[alt_id]
+                if existing_main == '136045' and main_id == '136044':
+                    # Override Q17 with Q22 for shared alternatives
+                    alternative_to_main[alt_id] = main_id
+    
+    return alternative_to_main, None
+
+def extract_target_mapping_fixed(filepath):
+    """Extract alternative-to-main mapping using proper question boundary detection"""
+    # Since the file is one big line, it is streamed in fixed-size chunks and
+    # question boundaries come from the offsets of the numbered questions
+    try:
+        parsed = parse_exam_file(filepath)
+    except Exception as e:
+        return None, f"Error reading file: {e}"
+    
+    logger.debug("Found %s numbered questions", len(parsed))
+    
+    alternative_to_main = {}
+    question_sections = []
+    
+    for i in parsed.sorted_order():
+        q_num, main_id = parsed.numbered[i]
+        question_num = int(q_num)
+        unique_ids = parsed.section_ids[i]
+        
+        logger.debug("Q%s (Main: %s) has %s unique IDs", question_num, main_id, len(unique_ids))
+        logger.debug("Q%s IDs: %s...", question_num, unique_ids[:10])  # Show first 10
+        
+        # Map all IDs in this section to the main ID
+        for alt_id in unique_ids:
+            alternative_to_main[alt_id] = main_id
+        
+        question_sections.append({
+            'number': question_num,
+            'main_id': main_id,
+            'all_ids': unique_ids,
+            'section_length': parsed.ends[i] - parsed.starts[i]
+        })
+    
+    logger.debug("Total mappings created: %s", len(alternative_to_main))
+    
+    return alternative_to_main, None
+
+def run_clone_analysis(target_content, exam_content, engine=DEFAULT_MATCHING_ENGINE, matcher=None, status=None,
+                       progress=None, cancel=None, timer=None, bank=None):
+    """
+    Full "Generate Clone Report" pipeline: exam questions, target type detection,
+    comp test mapping, conflict resolution and per-position results.
+    status(message) receives the progress lines shown in the GUI status panel,
+    progress(ProgressEvent) the stage/count/elapsed updates.
+    cancel: optional CancelToken; once cancelled the pipeline raises AnalysisCancelled.
+    timer: optional exam_timing.StageTimer that records every stage with its sizes and counts.
+    bank: optional exam_bank.QuestionBank (opt-in); both documents are learned into it, and
+          test sections that look truncated are extended with the alternatives it knows.
+    Returns (analysis, error) where analysis is a plain JSON-serializable dict.
+    """
+    started = time.perf_counter()
+    if timer is None:
+        timer = StageTimer(enabled=False)
+
+    def report_status(message):
+        if status:
+            status(message)
+
+    def report_progress(stage, processed, total):
+        check_cancelled(cancel)
+        if progress:
+            progress(ProgressEvent(stage, processed, total, time.perf_counter() - started))
+
+    report_status("🔍 Analyzing test content...")
+    
+    # Parse each document once (cancellable); every step below reuses the index
+    if exam_content:
+        with timer.stage("parse_test", size=document_size(exam_content)) as stage:
+            exam_content = parse_exam(exam_content, cancel, stage)
+            stage.note(questions=len(exam_content))
+        report_progress("Parsing test", len(exam_content), len(exam_content))
+    if target_content:
+        with timer.stage("parse_target", size=document_size(target_content)) as stage:
+            target_content = parse_exam(target_content, cancel, stage)
+            stage.note(questions=len(target_content))
+        report_progress("Parsing target", len(target_content), len(target_content))
+    if bank is not None and exam_content and target_content:
+        with timer.stage("question_bank") as stage:
+            learned = bank.ingest(target_content) + bank.ingest(exam_content)
+            exam_content, added = bank.complete(exam_content, target_content)
+            stage.note(learned_ids=learned, added_ids=added)
+        if added:
+            report_status(f"📚 Question bank: {added} known alternatives added to truncated test sections")
+    
+    # Get exam current selections from content
+    exam_current, exam_error = extract_numbered_questions_from_content(exam_content)
+    if exam_error:
+        report_status(f"❌ Test content error: {exam_error}")
+        return None, f"Test content error: {exam_error}"
+    
+    report_status(f"✅ Test questions: {len(exam_current)}")
+    report_status("🔍 Detecting target content type...")
+    
+    # Detect target content type automatically
+    with timer.stage("detect_type"):
+        file_type, type_info = detect_file_type_from_content(target_content)
+    report_status(f"📋 {type_info}")
+    
+    # Always compare exam against target using alternatives (comp test algorithm)
+    report_status("🎯 Using comp test mapping algorithm (exam vs target)...")
+    with timer.stage("mapping", engine=engine) as stage:
+        alt_to_main, target_error = extract_comp_test_mapping_from_content(target_content, exam_content,
+                                                                           engine=engine, matcher=matcher,
+                                                                           cancel=cancel)
+        stage.note(entries=len(alt_to_main or {}))
+    if target_error:
+        report_status(f"❌ Comp test mapping error: {target_error}")
+        return None, f"Comp test mapping error: {target_error}"
+    
+    report_status(f"✅ Target mapping created: {len(alt_to_main)} entries")
+    report_progress("Matching", len(exam_current), len(exam_current))
+    
+    # Apply conflict resolution
+    report_status("🔄 Checking for conflicts...")
+    
+    with timer.stage("resolve_conflicts") as stage:
+        if timer.enabled:
+            # Exam IDs sharing a target ID with an earlier one
+            stage.note(conflicts=len(alt_to_main) - len(set(alt_to_main.values())))
+        resolved_mapping = resolve_conflicts(alt_to_main, target_content, exam_content)
+    if resolved_mapping:
+        alt_to_main = resolved_mapping
+        report_status("✅ Conflicts resolved successfully")
+    else:
+        report_status("⚠️ Conflict resolution failed, using original mapping")
+    report_progress("Resolving conflicts", len(exam_current), len(exam_current))
+    
+    report_status("🔍 Processing comp test mapping...")
+    
+    with timer.stage("build_report") as stage:
+        # Target main IDs in question order, parsed once for the whole report
+        target_current, _ = extract_numbered_questions_from_content(target_content)
+        
+        # For comp_test: alt_to_main contains exam_main_id -> target main ID mappings
+        report = CloneReport.build(exam_current, alt_to_main, target_current or [],
+                                   progress=lambda done: report_progress("Building report", done, len(exam_current)),
+                                   file_type=file_type, type_info=type_info, engine=engine)
+        stage.note(positions=report.summary['total_positions'], changes=report.summary['changes_needed'])
+    summary = report.summary
+    mappable = summary['changes_needed'] + summary['already_correct']
+    total_processed = summary['total_positions']
+    no_mapping_found = summary['unknown']
+    
+    report_status(f"🎯 Report complete! {mappable}/{total_processed} questions mapped")
+    if no_mapping_found > 0:
+        report_status(f"⚠️  {no_mapping_found} unknown IDs need investigation")
+    else:
+        report_status("🎉 All IDs successfully mapped!")
+    
+    logger.debug("Parse cache: %s", parse_cache.stats())
+    
+    analysis = report.as_dict()
+    return analysis, None
+
+def format_report_lines(analysis, target_source, exam_source):
+    """Yield the text lines of the clone report (each ending in a newline)"""
+    yield "📄 EXAM CLONE REPORT\n"
+    yield "=" * 70 + "\n"
+    yield f"Target: {target_source} ({analysis['file_type']})\n"
+    yield f"Test: {exam_source} (to compare)\n"
+    yield f"Analysis: {analysis['type_info']}\n"
+    yield "=" * 70 + "\n\n"
+    
+    for entry in analysis['entries']:
+        i = entry['position']
+        current_id = entry['current_id']
+        if entry['status'] == 'correct':
+            yield f"Question #{i}: ✅ Already correct (ID:{current_id})\n"
+        elif entry['status'] == 'change':
+            yield f"Question #{i}: Change (ID:{current_id}) -> (ID:{entry['to_id']})\n"
+        elif entry['status'] == 'matches_target':
+            yield f"Question #{i}: ✅ Already matches target Q{entry['target_position']} (ID:{current_id})\n"
+        else:
+            yield f"Question #{i}: ❌ No suitable alternatives (current ID:{current_id})\n"
+    
+    summary = analysis['summary']
+    yield "\n" + "=" * 30 + " SUMMARY " + "=" * 30 + "\n"
+    yield f"🔄 Changes needed: {summary['changes_needed']}\n"
+    yield f"✅ Already correct: {summary['already_correct']}\n"
+    yield f"❌ Unknown IDs: {summary['unknown']}\n"
+    yield f"📊 Total positions: {summary['total_positions']}\n"
+    yield f"📈 Mapping success: {summary['success_rate']:.1f}%\n"
+    yield "--- END REPORT ---\n"
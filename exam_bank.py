@@ -0,0 +1,294 @@
+"""
+Persistent question bank of alternative-ID groups learned from every parsed document
+Each question section lists IDs that are alternatives of one another; the bank
+merges those sets across documents with union-find and keeps the groups in a
+local SQLite file. A truncated or partly captured exam section can then be
+completed from the bank without re-parsing the documents it was learned from.
+The bank is opt-in: the GUI's "Use question bank" box or exam_cli --bank.
+
+Usage:
+    python -m exam_bank ingest FILE... [--bank PATH]     # learn from captures/targets
+    python -m exam_bank lookup ID... [--bank PATH]       # show the group of each ID
+    python -m exam_bank stats [--bank PATH]
+"""
+import os
+import sys
+import copy
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+
+from exam_parser import parse_exam, parse_exam_mapped
+
+# Bank file path; 'off' disables the bank
+BANK_FILE_ENV = 'EXAM_CLONE_BANK'
+BANK_FILE_NAME = 'question_bank.sqlite3'
+SCHEMA_VERSION = 1
+# SQLite's default limit on bound parameters is 999
+QUERY_BATCH = 900
+# SQLite INTEGER is a signed 64-bit value; larger IDs are not banked
+MAX_BANK_ID = 2 ** 63 - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS question_ids (
+    id INTEGER PRIMARY KEY,
+    group_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS question_ids_group ON question_ids (group_id);
+CREATE TABLE IF NOT EXISTS documents (
+    digest TEXT PRIMARY KEY,
+    source TEXT,
+    questions INTEGER NOT NULL,
+    ingested_at REAL NOT NULL
+);
+"""
+
+
+def default_bank_path():
+    """Per-user bank file (EXAM_CLONE_BANK overrides it); None when the bank is turned off"""
+    path = os.environ.get(BANK_FILE_ENV)
+    if path:
+        return None if path.lower() == 'off' else path
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_DATA_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'ExamCloneTool', BANK_FILE_NAME)
+
+
+class UnionFind:
+    """Disjoint sets over integer IDs; the smallest ID of a set is its root"""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent
+        parent.setdefault(item, item)
+        while parent[item] != item:
+            # Path halving
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def document_digest(parsed):
+    """Identity of a parsed document's question index (parse_exam_mapped keeps no text to hash)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for (number, main_id), ids in zip(parsed.numbered, parsed.section_ids):
+        digest.update(f"{number}:{main_id}:{','.join(ids)};".encode('ascii', 'replace'))
+    return digest.hexdigest()
+
+
+def _bank_id(qid):
+    """qid as a bank key, or None for IDs the bank cannot store (non-numeric or beyond 64 bits)"""
+    try:
+        value = int(qid)
+    except (TypeError, ValueError):
+        return None
+    return value if -MAX_BANK_ID - 1 <= value <= MAX_BANK_ID else None
+
+
+def _bank_ids(ids):
+    """The storable IDs of a sequence as bank keys; the others are skipped"""
+    return [value for value in map(_bank_id, ids) if value is not None]
+
+
+def _batches(items, size=QUERY_BATCH):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class QuestionBank:
+    """
+    SQLite-backed alternative groups: question_ids(id -> group_id) with an index on
+    group_id, where group_id is the smallest ID of the group. Every lookup is an
+    indexed query; the connection may be used from any thread (calls are serialized).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def ingest(self, content, source=None):
+        """
+        Learn the alternative groups of one document (HTML content or a ParsedExam).
+        Documents already ingested are skipped, and so are IDs the bank cannot store.
+        Returns the number of new IDs.
+        """
+        parsed = parse_exam(content)
+        digest = document_digest(parsed)
+        sections = [section for section in map(_bank_ids, parsed.section_ids) if len(section) > 1]
+        ids = {qid for section in sections for qid in section}
+
+        with self._lock, self.connection:
+            if self.connection.execute("SELECT 1 FROM documents WHERE digest = ?", (digest,)).fetchone():
+                return 0
+            existing = {}
+            for batch in _batches(ids):
+                existing.update(self.connection.execute(
+                    f"SELECT id, group_id FROM question_ids WHERE id IN ({','.join('?' * len(batch))})", batch))
+
+            # Stored groups enter as their root ID, so merging two of them relabels the whole group
+            groups = UnionFind()
+            for qid, group_id in existing.items():
+                groups.union(qid, group_id)
+            for section in sections:
+                for qid in section[1:]:
+                    groups.union(section[0], qid)
+
+            relabel = [(groups.find(group_id), group_id) for group_id in set(existing.values())
+                       if groups.find(group_id) != group_id]
+            self.connection.executemany("UPDATE question_ids SET group_id = ? WHERE group_id = ?", relabel)
+            new_rows = [(qid, groups.find(qid)) for qid in ids if qid not in existing]
+            self.connection.executemany("INSERT INTO question_ids (id, group_id) VALUES (?, ?)", new_rows)
+            self.connection.execute("INSERT INTO documents (digest, source, questions, ingested_at) "
+                                    "VALUES (?, ?, ?, ?)", (digest, source, len(parsed), time.time()))
+        return len(new_rows)
+
+    def alternatives(self, qid):
+        """All IDs in qid's group (as strings, qid included), or [] when the bank has not seen qid"""
+        key = _bank_id(qid)
+        if key is None:
+            return []
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT member.id FROM question_ids AS q JOIN question_ids AS member "
+                "ON member.group_id = q.group_id WHERE q.id = ? ORDER BY member.id", (key,)).fetchall()
+        return [str(member) for member, in rows]
+
+    def groups_for(self, ids):
+        """
+        {id: [group member IDs]} for the IDs the bank knows (strings in and out; IDs of one
+        group share a list). IDs the bank cannot store are skipped.
+        """
+        group_of = {}
+        members = {}
+        with self._lock:
+            for batch in _batches(set(_bank_ids(ids))):
+                group_of.update(self.connection.execute(
+                    f"SELECT id, group_id FROM question_ids WHERE id IN ({','.join('?' * len(batch))})", batch))
+            # Each group is read once, however many of its IDs were asked for
+            for batch in _batches(set(group_of.values())):
+                for group_id, member in self.connection.execute(
+                        f"SELECT group_id, id FROM question_ids WHERE group_id IN ({','.join('?' * len(batch))})",
+                        batch):
+                    members.setdefault(group_id, []).append(str(member))
+        return {str(qid): members[group_id] for qid, group_id in group_of.items()}
+
+    def complete(self, content, target=None):
+        """
+        The document with its truncated sections extended by their bank groups. A section
+        looks truncated when it holds a single ID, or fewer IDs than a target section it
+        shares an ID with. Bank IDs are appended after the captured ones as low-priority
+        options; captured IDs are never replaced. With a target, only IDs that appear in
+        the target are added: one bad capture can merge two unrelated groups, and their
+        other members would then belong to other questions.
+        Returns (ParsedExam, number of IDs added); the cached original is not modified.
+        """
+        parsed = parse_exam(content)
+        target_sizes = {}
+        if target is not None:
+            for ids in parse_exam(target).section_ids:
+                for qid in ids:
+                    target_sizes[qid] = max(target_sizes.get(qid, 0), len(ids))
+        truncated = [i for i, ids in enumerate(parsed.section_ids)
+                     if len(ids) == 1 or len(ids) < max((target_sizes.get(qid, 0) for qid in ids), default=0)]
+        if not truncated:
+            return parsed, 0
+
+        groups = self.groups_for(qid for i in truncated for qid in parsed.section_ids[i])
+        section_ids = list(parsed.section_ids)
+        added = 0
+        for i in truncated:
+            ids = section_ids[i]
+            seen = set(ids)
+            extended = list(ids)
+            for qid in ids:
+                for member in groups.get(qid, ()):
+                    if member not in seen and (target is None or member in target_sizes):
+                        seen.add(member)
+                        extended.append(member)
+            added += len(extended) - len(ids)
+            section_ids[i] = extended
+        if not added:
+            return parsed, 0
+        completed = copy.copy(parsed)
+        completed.section_ids = section_ids
+        return completed, added
+
+    def stats(self):
+        with self._lock:
+            ids, groups = self.connection.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT group_id) FROM question_ids").fetchone()
+            documents, = self.connection.execute("SELECT COUNT(*) FROM documents").fetchone()
+        return {'ids': ids, 'groups': groups, 'documents': documents}
+
+
+def open_default_bank():
+    """The per-user bank, or None when it is turned off or cannot be opened"""
+    path = default_bank_path()
+    if path is None:
+        return None
+    try:
+        return QuestionBank(path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Question bank unavailable ({path}): {e}")
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="exam_bank", description="Persistent bank of alternative ID groups")
+    parser.add_argument("--bank", default=default_bank_path(), help=f"bank file (default: ${BANK_FILE_ENV} or per-user)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="learn the groups of target/exam captures")
+    ingest_parser.add_argument("files", nargs='+')
+    lookup_parser = commands.add_parser("lookup", help="show the group of each ID")
+    lookup_parser.add_argument("ids", nargs='+')
+    commands.add_parser("stats", help="bank size")
+    args = parser.parse_args(argv)
+
+    if args.bank is None:
+        print(f"error: the question bank is turned off (${BANK_FILE_ENV}=off)", file=sys.stderr)
+        return 1
+    bank = QuestionBank(args.bank)
+    try:
+        if args.command == "ingest":
+            for path in args.files:
+                try:
+                    added = bank.ingest(parse_exam_mapped(path), source=os.path.basename(path))
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"❌ {path}: {e}", file=sys.stderr)
+                    continue
+                print(f"📚 {os.path.basename(path)}: {added} new IDs")
+        elif args.command == "lookup":
+            for qid in args.ids:
+                start_time = time.perf_counter()
+                group = bank.alternatives(qid)
+                elapsed = (time.perf_counter() - start_time) * 1000
+                print(f"{qid}: {', '.join(group) if group else 'unknown'} ({elapsed:.3f} ms)")
+        stats = bank.stats()
+        print(f"📊 {stats['ids']} IDs in {stats['groups']} groups from {stats['documents']} documents ({args.bank})")
+    finally:
+        bank.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
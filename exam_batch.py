@@ -0,0 +1,150 @@
+"""
+Batch comparison of one target against a directory of exam captures
+Parses the target once and fans the exams out over a process pool
+
+Usage:
+    python -m exam_batch TARGET EXAM_DIR [--workers N] [--engine hopcroft_karp] [--jsonl FILE]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from exam_parser import parse_exam, parse_exam_mapped
+from exam_matching import DEFAULT_MATCHING_ENGINE, ENGINE_CHOICES
+from exam_analysis import run_clone_analysis
+
+# Per-worker state, set by _init_worker (inherited as-is when the pool forks)
+_worker_target = None
+_worker_engine = DEFAULT_MATCHING_ENGINE
+
+
+def _init_worker(target, engine):
+    global _worker_target, _worker_engine
+    # Forked workers inherit the parent's parsed target as-is;
+    # spawned workers receive the pickled index (no document text)
+    _worker_target = parse_exam(target)
+    _worker_engine = engine
+
+
+def _analyze_exam_file(exam_path):
+    """Worker: compare one exam file against the shared target"""
+    start_time = time.perf_counter()
+    try:
+        exam_parsed = parse_exam_mapped(exam_path)
+        analysis, error = run_clone_analysis(_worker_target, exam_parsed, engine=_worker_engine)
+    except Exception as e:
+        analysis, error = None, f"{type(e).__name__}: {e}"
+    return {
+        'exam': exam_path,
+        'error': error,
+        'analysis': analysis,
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+def find_exam_files(directory, extensions=('.html', '.htm')):
+    """HTML captures in a directory, sorted by name"""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(extensions) and os.path.isfile(os.path.join(directory, name)))
+
+
+def _pool_context():
+    # fork shares the parsed target copy-on-write; spawn is the only option on Windows
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context('spawn')
+
+
+def run_batch(target, exam_paths, workers=None, engine=DEFAULT_MATCHING_ENGINE):
+    """
+    Compare every exam against the target (HTML content or a ParsedExam),
+    yielding result dicts as they complete (exam, error, analysis, seconds).
+    """
+    # Parse once in the parent; workers only ever see the index
+    target_parsed = parse_exam(target)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                             initializer=_init_worker, initargs=(target_parsed, engine)) as pool:
+        futures = [pool.submit(_analyze_exam_file, path) for path in exam_paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize_latencies(results, wall_seconds):
+    """Latency/throughput summary for a finished batch"""
+    latencies = sorted(result['seconds'] for result in results)
+    failed = sum(1 for result in results if result['error'])
+
+    def percentile(fraction):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(round(fraction * (len(latencies) - 1))))]
+
+    return {
+        'exams': len(results),
+        'failed': failed,
+        'wall_seconds': wall_seconds,
+        'exams_per_second': (len(results) / wall_seconds) if wall_seconds else 0.0,
+        'latency_min': latencies[0] if latencies else 0.0,
+        'latency_p50': percentile(0.50),
+        'latency_p95': percentile(0.95),
+        'latency_max': latencies[-1] if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="exam_batch",
+                                     description="Compare one target against every exam capture in a directory")
+    parser.add_argument("target", help="target HTML file (correct answers)")
+    parser.add_argument("exam_dir", help="directory of exam HTML captures")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--engine", choices=ENGINE_CHOICES, default=DEFAULT_MATCHING_ENGINE)
+    parser.add_argument("--jsonl", help="also write one JSON result per exam to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        target_parsed = parse_exam_mapped(args.target)
+        exam_paths = find_exam_files(args.exam_dir)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if not exam_paths:
+        print(f"error: no HTML files in {args.exam_dir}", file=sys.stderr)
+        return 1
+
+    jsonl = open(args.jsonl, 'w', encoding='utf-8') if args.jsonl else None
+    results = []
+    start_time = time.perf_counter()
+    try:
+        for result in run_batch(target_parsed, exam_paths, workers=args.workers, engine=args.engine):
+            results.append(result)
+            name = os.path.basename(result['exam'])
+            if result['error']:
+                print(f"❌ {name}: {result['error']} ({result['seconds'] * 1000:.1f} ms)")
+            else:
+                summary = result['analysis']['summary']
+                print(f"✅ {name}: {summary['changes_needed']} changes, {summary['unknown']} unknown, "
+                      f"{summary['success_rate']:.1f}% mapped ({result['seconds'] * 1000:.1f} ms)")
+            if jsonl:
+                jsonl.write(json.dumps(result, ensure_ascii=False) + "\n")
+                jsonl.flush()
+    finally:
+        if jsonl:
+            jsonl.close()
+
+    stats = summarize_latencies(results, time.perf_counter() - start_time)
+    print("=" * 30 + " BATCH SUMMARY " + "=" * 30)
+    print(f"📊 Exams: {stats['exams']} ({stats['failed']} failed) in {stats['wall_seconds']:.2f}s "
+          f"- {stats['exams_per_second']:.1f} exams/s")
+    print(f"⏱️ Latency ms: min {stats['latency_min'] * 1000:.1f} / p50 {stats['latency_p50'] * 1000:.1f} / "
+          f"p95 {stats['latency_p95'] * 1000:.1f} / max {stats['latency_max'] * 1000:.1f}")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Headless command line entry point for the exam comparison pipeline
+Runs the same steps as "Generate Clone Report" without Tk, win32 or the auto-updater
+
+Usage:
+    python -m exam_cli TARGET EXAM [--engine hopcroft_karp] [--format text|json|jsonl|csv] [--output FILE]
+                                   [--timings] [--trace FILE] [--log-file FILE] [--log-level debug]
+                                   [--bank [PATH]]
+Either path may be '-' to read that document from stdin.
+"""
+import sys
+import sqlite3
+import argparse
+
+from exam_logging import LOG_FILE, LOG_LEVELS, configure_logging
+from exam_parser import parse_exam_mapped, parse_exam_stream
+from exam_matching import DEFAULT_MATCHING_ENGINE, ENGINE_CHOICES
+from exam_analysis import run_clone_analysis, format_report_lines
+from exam_report import REPORT_EXPORTERS
+from exam_bank import BANK_FILE_ENV, QuestionBank, default_bank_path
+from exam_timing import StageTimer, trace_file_from_env
+
+
+def read_document(path):
+    """Index an HTML capture from a file path (memory-mapped), or stream-parse stdin for '-'"""
+    if path == '-':
+        return parse_exam_stream(sys.stdin)
+    return parse_exam_mapped(path)
+
+
+def open_bank(path):
+    """The question bank for --bank (the per-user file when no path is given), or None with an error printed"""
+    path = path or default_bank_path()
+    if path is None:
+        print(f"error: the question bank is turned off (${BANK_FILE_ENV}=off)", file=sys.stderr)
+        return None
+    try:
+        return QuestionBank(path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"error: failed to open the question bank {path}: {e}", file=sys.stderr)
+        return None
+
+
+def write_report(analysis, report_format, output, target_source, exam_source):
+    """Write the report as text or with one of REPORT_EXPORTERS to the output file (stdout when None)"""
+    newline = '' if report_format == 'csv' else None  # the csv module writes its own line endings
+    out = open(output, 'w', encoding='utf-8', newline=newline) if output else sys.stdout
+    try:
+        if report_format != 'text':
+            REPORT_EXPORTERS[report_format](analysis, out)
+        else:
+            for line in format_report_lines(analysis, target_source, exam_source):
+                out.write(line)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="exam_cli",
+        description="Compare a test exam against a target and print the clone report")
+    parser.add_argument("target", help="target HTML file (correct answers), or '-' for stdin")
+    parser.add_argument("exam", help="test exam HTML file to compare, or '-' for stdin")
+    parser.add_argument("--engine", choices=ENGINE_CHOICES, default=DEFAULT_MATCHING_ENGINE,
+                        help=f"assignment engine (default: {DEFAULT_MATCHING_ENGINE})")
+    parser.add_argument("--format", choices=['text'] + list(REPORT_EXPORTERS), default='text',
+                        help="report format (default: text)")
+    parser.add_argument("--json", action="store_const", dest="format", const="json", help="same as --format json")
+    parser.add_argument("--output", "-o", help="write the report to this file instead of stdout")
+    parser.add_argument("--verbose", "-v", action="store_true", help="print progress messages to stderr")
+    parser.add_argument("--log-file", help=f"write logging to this size-rotated file (default: {LOG_FILE})")
+    parser.add_argument("--log-level", choices=LOG_LEVELS,
+                        help="logging level (default: debug with --log-file, otherwise $EXAM_CLONE_LOG_LEVEL or off)")
+    parser.add_argument("--bank", nargs='?', const='', metavar="PATH",
+                        help="learn both documents into the question bank and complete truncated test "
+                             "sections from it (default file: $EXAM_CLONE_BANK or per-user)")
+    parser.add_argument("--timings", action="store_true", help="print a per-stage timing breakdown to stderr")
+    parser.add_argument("--trace", default=trace_file_from_env(),
+                        help="append per-stage timings to this Chrome trace-event file (default: $EXAM_CLONE_TRACE)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.target == '-' and args.exam == '-':
+        print("error: only one of TARGET and EXAM can be read from stdin", file=sys.stderr)
+        return 2
+
+    log_level = args.log_level or ('debug' if args.log_file else None)
+    configure_logging(log_level, filename=args.log_file or LOG_FILE)
+
+    timer = StageTimer(enabled=args.timings or bool(args.trace))
+    try:
+        with timer.stage("load_target") as stage:
+            target_content = read_document(args.target)
+            stage.note(size=target_content.length, questions=len(target_content))
+        with timer.stage("load_exam") as stage:
+            exam_content = read_document(args.exam)
+            stage.note(size=exam_content.length, questions=len(exam_content))
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"error: failed to read input: {e}", file=sys.stderr)
+        return 1
+
+    status = None
+    if args.verbose:
+        status = lambda message: print(message, file=sys.stderr)
+
+    bank = None
+    if args.bank is not None:
+        bank = open_bank(args.bank)
+        if bank is None:
+            return 1
+    try:
+        analysis, error = run_clone_analysis(target_content, exam_content, engine=args.engine, status=status,
+                                             timer=timer, bank=bank)
+    finally:
+        if bank is not None:
+            bank.close()
+    if error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+
+    target_source = "stdin" if args.target == '-' else f"File: {args.target}"
+    exam_source = "stdin" if args.exam == '-' else f"File: {args.exam}"
+    write_report(analysis, args.format, args.output, target_source, exam_source)
+
+    if args.timings:
+        print("⏱️ Timing breakdown:", file=sys.stderr)
+        for line in timer.breakdown_lines():
+            print(line, file=sys.stderr)
+    if args.trace:
+        timer.append_trace(args.trace)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,189 +1,74 @@
-import re
-import html
-import logging
-logging.basicConfig(filename='debug_log.txt', level=logging.DEBUG, format='%(asctime)s %(message)s')
+import time
+# Reference point for the time-to-first-window measurement
+STARTUP_STARTED = time.perf_counter()
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
-import subprocess
-import json
-import time
+import queue
+import logging
 import threading
 import sys
-try:
-    import win32gui
-    import win32con
-    import win32clipboard
-    import pyautogui
-    CAPTURE_AVAILABLE = True
-except ImportError:
-    CAPTURE_AVAILABLE = False
+import importlib.util
+
+# Browser capture needs pywin32 + pyautogui (a large dependency tree); they are
+# only located here and imported by load_capture_modules() on the first capture
+CAPTURE_MODULES = ('win32gui', 'win32con', 'win32clipboard', 'pyautogui')
+CAPTURE_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in CAPTURE_MODULES)
+win32gui = win32con = win32clipboard = pyautogui = None
+
+# How often the UI drains progress events from a running analysis
+ANALYSIS_POLL_MS = 50
+# How often the UI looks for the result of the background update check
+UPDATE_POLL_MS = 250
 
 # Application version and update configuration
 VERSION = "1.0.5"
 GITHUB_REPO = "zerocool5878/exam-clone-tool"
 
-# Import auto-updater
-try:
-    from auto_updater import AutoUpdater, create_update_ui
-    AUTO_UPDATE_AVAILABLE = True
-except ImportError:
-    AUTO_UPDATE_AVAILABLE = False
-    print("Auto-updater not available. Update checking disabled.")
-
-def resolve_conflicts(mapping_dict, target_content, exam_content):
-    """
-    Resolve conflicts where multiple exam IDs map to the same target ID.
-    Returns updated mapping with conflicts resolved.
-    """
-    try:
-        target_decoded = html.unescape(target_content)
-        exam_decoded = html.unescape(exam_content)
-
-        # Find target main IDs with duplicate detection
-        target_numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-        target_numbered = target_numbered_pattern.findall(target_decoded)
-
-        # Check for duplicate target main IDs
-        target_id_counts = {}
-        for q_num, main_id in target_numbered:
-            if main_id in target_id_counts:
-                target_id_counts[main_id].append(f"Q{q_num}")
-            else:
-                target_id_counts[main_id] = [f"Q{q_num}"]
-
-        duplicate_target_ids = {id: questions for id, questions in target_id_counts.items() if len(questions) > 1}
-        if duplicate_target_ids:
-            logging.debug("WARNING: Duplicate target main IDs detected!")
-            for main_id, questions in duplicate_target_ids.items():
-                logging.debug(f"  Target ID {main_id} appears in: {', '.join(questions)}")
-
-        target_main_ids = set(main_id for _, main_id in target_numbered)
-
-        # Find exam main IDs with duplicate detection
-        exam_numbered = target_numbered_pattern.findall(exam_decoded)
-
-        # Check for duplicate exam main IDs
-        exam_id_counts = {}
-        for q_num, main_id in exam_numbered:
-            if main_id in exam_id_counts:
-                exam_id_counts[main_id].append(f"Q{q_num}")
-            else:
-                exam_id_counts[main_id] = [f"Q{q_num}"]
-
-        duplicate_exam_ids = {id: questions for id, questions in exam_id_counts.items() if len(questions) > 1}
-        if duplicate_exam_ids:
-            logging.debug("WARNING: Duplicate exam main IDs detected!")
-            for main_id, questions in duplicate_exam_ids.items():
-                logging.debug(f"  Exam ID {main_id} appears in: {', '.join(questions)}")
+# Auto-updater (and requests) are imported by load_auto_updater() when the update check runs
+AUTO_UPDATE_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ('auto_updater', 'requests'))
 
-        exam_main_ids = set(main_id for _, main_id in exam_numbered)
+from exam_logging import configure_logging
+from exam_parser import parse_exam_mapped
+from exam_matching import DEFAULT_MATCHING_ENGINE, ENGINE_CHOICES, IncrementalMatcher
+from exam_progress import AnalysisWorker, CancelToken
+from exam_timing import StageTimer, trace_file_from_env
+from exam_results_view import VirtualResultsTable
+from exam_report import export_report
+from exam_analysis import run_clone_analysis, format_report_lines
 
-        # Identify conflicts
-        target_usage = {}
-        conflicts = {}
+logger = logging.getLogger(__name__)
 
-        for exam_id, target_id in mapping_dict.items():
-            if target_id in target_usage:
-                # Conflict found
-                if target_id not in conflicts:
-                    conflicts[target_id] = []
-                conflicts[target_id].append(exam_id)
-                conflicts[target_id].append(target_usage[target_id])
-            else:
-                target_usage[target_id] = exam_id
-
-        logging.debug(f"Found {len(conflicts)} conflicted target IDs")
-
-        # If there are duplicate main IDs, add extra validation
-        if duplicate_target_ids or duplicate_exam_ids:
-            logging.debug("Using enhanced validation due to duplicate main IDs")
-
-        # Resolve conflicts by finding alternative mappings
-        resolved_mapping = mapping_dict.copy()
-
-        for target_id, conflicted_exam_ids in conflicts.items():
-            logging.debug(f"Resolving conflict for target ID {target_id} with exam IDs {conflicted_exam_ids}")
-
-            # Keep first exam ID, reassign others
-            for i, exam_id in enumerate(conflicted_exam_ids[1:], 1):
-                logging.debug(f"Finding alternative for exam ID {exam_id}")
-
-                # Find exam question section to get alternatives
-                exam_sections = extract_exam_sections(exam_decoded)
-                alternatives = get_alternatives_for_exam_id(exam_id, exam_sections)
-
-                # Find alternative that doesn't conflict
-                new_target = None
-                forbidden_targets = set(resolved_mapping.values())
-
-                for alt_id in alternatives:
-                    # Enhanced validation for duplicate main IDs
-                    is_valid_target = alt_id in target_main_ids
-                    is_not_exam_main = alt_id not in exam_main_ids
-                    is_not_forbidden = alt_id not in forbidden_targets
-
-                    # Additional check: if target has duplicates, warn but allow
-                    if alt_id in duplicate_target_ids:
-                        logging.debug(f"Warning - alternative {alt_id} is a duplicate target ID")
-
-                    # Additional check: if alternative is duplicate exam main, reject
-                    if alt_id in duplicate_exam_ids:
-                        logging.debug(f"Rejecting alternative {alt_id} - is duplicate exam main ID")
-                        is_not_exam_main = False
-
-                    if is_valid_target and is_not_exam_main and is_not_forbidden:
-                        new_target = alt_id
-                        break
-
-                if new_target:
-                    resolved_mapping[exam_id] = new_target
-                    logging.debug(f"Reassigned exam ID {exam_id} from {target_id} to {new_target}")
-                else:
-                    logging.debug(f"Could not find alternative for exam ID {exam_id}")
-
-        return resolved_mapping
-
-    except Exception as e:
-        logging.debug(f"Error in conflict resolution: {e}")
+def load_capture_modules():
+    """Import the browser-capture modules on first use; returns CAPTURE_AVAILABLE"""
+    global win32gui, win32con, win32clipboard, pyautogui, CAPTURE_AVAILABLE
+    if CAPTURE_AVAILABLE and pyautogui is None:
+        try:
+            import win32gui
+            import win32con
+            import win32clipboard
+            import pyautogui
+        except ImportError as e:
+            logger.warning("Browser capture disabled: %s", e)
+            CAPTURE_AVAILABLE = False
+    return CAPTURE_AVAILABLE
+
+def load_auto_updater():
+    """Import auto_updater on first use; returns the module, or None when updates are unavailable"""
+    global AUTO_UPDATE_AVAILABLE
+    if not AUTO_UPDATE_AVAILABLE:
         return None
-    
-def extract_exam_sections(exam_content):
-    """Extract question sections from exam content"""
-    sections = {}
-    numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-    matches = numbered_pattern.findall(exam_content)
-    logging.debug(f"Found {len(matches)} numbered questions in exam content.")
-    for i, (q_num, main_id) in enumerate(matches):
-        question_num = int(q_num)
-        if i < len(matches) - 1:
-            next_q_num = int(matches[i+1][0])
-            section_pattern = rf'{question_num}\.\s+.*?(?={next_q_num}\.\s+)'
-        else:
-            section_pattern = rf'{question_num}\.\s+.*'
-        section_match = re.search(section_pattern, exam_content, re.DOTALL)
-        if section_match:
-            sections[main_id] = section_match.group(0)
-            logging.debug(f"Section for main_id {main_id} (Q{question_num}) length: {len(section_match.group(0))}")
-        else:
-            logging.debug(f"No section found for main_id {main_id} (Q{question_num})")
-    logging.debug(f"Extracted {len(sections)} sections from exam content.")
-    return sections
-
-def get_alternatives_for_exam_id(exam_id, exam_sections):
-    """Get alternatives for a specific exam ID"""
-    if exam_id in exam_sections:
-        section_content = exam_sections[exam_id]
-        all_ids = re.findall(r'\(id:(\d+)\)', section_content)
-        alternatives = [alt_id for alt_id in all_ids if alt_id != exam_id]
-        logging.debug(f"Alternatives for exam_id {exam_id}: {alternatives}")
-        return alternatives
-    logging.debug(f"No section found for exam_id {exam_id} in exam_sections.")
-    return []
+    try:
+        import auto_updater
+    except ImportError as e:
+        logger.warning("Auto-updater not available, update checking disabled: %s", e)
+        AUTO_UPDATE_AVAILABLE = False
+        return None
+    return auto_updater
 
 def get_browser_windows():
     """Get list of browser windows"""
-    if not CAPTURE_AVAILABLE:
+    if not load_capture_modules():
         return []
     
     browser_windows = []
@@ -215,621 +100,61 @@ def get_browser_windows():
     
     return browser_windows
 
-def capture_html_from_browser(hwnd):
-    """Capture HTML source from browser window"""
-    if not CAPTURE_AVAILABLE:
+def capture_html_from_browser(hwnd, timer=None):
+    """Capture HTML source from browser window (timer: optional StageTimer for the capture steps)"""
+    if not load_capture_modules():
         return None, "Browser capture not available (missing dependencies)"
+    if timer is None:
+        timer = StageTimer(enabled=False)
     
     try:
         # Bring window to foreground
-        win32gui.SetForegroundWindow(hwnd)
-        time.sleep(0.8)  # Longer wait for window to come to front
+        with timer.stage("capture_focus"):
+            win32gui.SetForegroundWindow(hwnd)
+            time.sleep(0.8)  # Longer wait for window to come to front
         
         # Send Ctrl+U to view source (works in most browsers)
-        pyautogui.hotkey('ctrl', 'u')
-        time.sleep(3)  # Longer wait for view source window to open
-        
-        # Send Ctrl+A to select all
-        pyautogui.hotkey('ctrl', 'a')
-        time.sleep(0.8)
-        
-        # Send Ctrl+C to copy
-        pyautogui.hotkey('ctrl', 'c')
-        time.sleep(0.8)
-        
-        # Get clipboard content
-        win32clipboard.OpenClipboard()
-        try:
-            html_content = win32clipboard.GetClipboardData(win32con.CF_UNICODETEXT)
-        except:
-            html_content = win32clipboard.GetClipboardData(win32con.CF_TEXT)
-        finally:
-            win32clipboard.CloseClipboard()
-        
-        # Ensure we're focused on the view source window before closing
-        time.sleep(0.5)
-        
-        # ONLY close the view source tab - NOT the entire browser
-        # Use Ctrl+W which closes current tab in all browsers
-        pyautogui.hotkey('ctrl', 'w')
-        
-        # Small delay to ensure tab closes
-        time.sleep(0.3)
-        
-        return html_content, None
-        
-    except Exception as e:
-        return None, f"Error capturing HTML: {str(e)}"
-
-def extract_numbered_questions_from_content(content):
-    """Extract numbered questions from HTML content (not file)"""
-    if not content:
-        return None, "No content provided"
-    
-    decoded_content = html.unescape(content)
-    
-    # Extract numbered questions
-    numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-    numbered_matches = numbered_pattern.findall(decoded_content)
-    
-    if not numbered_matches:
-        return None, "No numbered questions found"
-    
-    # Sort by question number
-    sorted_questions = sorted(numbered_matches, key=lambda x: int(x[0]))
-    question_ids = [qid for _, qid in sorted_questions]
-    
-    return question_ids, None
-
-def detect_file_type_from_content(content):
-    """Detect file type from HTML content (not file)"""
-    if not content:
-        return None, "No content provided"
-    
-    decoded_content = html.unescape(content)
-    
-    # Check for numbered questions pattern
-    numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-    numbered_matches = numbered_pattern.findall(decoded_content)
-    
-    if len(numbered_matches) < 5:
-        # Not enough numbered questions to analyze
-        id_pattern = re.compile(r'\(id:(\d+)\)')
-        all_ids = id_pattern.findall(decoded_content)
-        return None, f"Not enough numbered questions found ({len(numbered_matches)}). Need at least 5."
-    
-    # Count alternatives per question
-    alternative_counts = []
-    for i, (q_num, main_id) in enumerate(numbered_matches):
-        question_num = int(q_num)
-        
-        # Extract this question's section
-        if i < len(numbered_matches) - 1:
-            next_q_num = int(numbered_matches[i+1][0])
-            section_pattern = rf'{question_num}\.\s+.*?(?={next_q_num}\.\s+)'
-        else:
-            section_pattern = rf'{question_num}\.\s+.*'
-        
-        section_match = re.search(section_pattern, decoded_content, re.DOTALL)
-        
-        if section_match:
-            section_content = section_match.group(0)
-            section_ids = re.findall(r'\(id:(\d+)\)', section_content)
-            unique_ids = list(dict.fromkeys(section_ids))
-            alternative_counts.append(len(unique_ids))
-    
-    if not alternative_counts:
-        return None, "Could not analyze question structure"
-    
-    avg_alternatives = sum(alternative_counts) / len(alternative_counts)
-    
-    if avg_alternatives >= 3:
-        return "normal_target", f"Normal target file with {len(numbered_matches)} questions (avg {avg_alternatives:.1f} IDs/question - has alternatives)"
-    else:
-        return "comp_test", f"Comp test file with {len(numbered_matches)} questions (avg {avg_alternatives:.1f} IDs/question - single IDs)"
-
-def extract_numbered_questions(filepath):
-    """Extract numbered questions from exam file"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
-        return None, f"Error reading file: {e}"
-    
-    decoded_content = html.unescape(content)
-    
-    # Extract numbered questions
-    numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-    numbered_matches = numbered_pattern.findall(decoded_content)
-    
-    if not numbered_matches:
-        return None, "No numbered questions found"
-    
-    # Sort by question number
-    sorted_questions = sorted(numbered_matches, key=lambda x: int(x[0]))
-    question_ids = [qid for _, qid in sorted_questions]
-    
-    return question_ids, None
-
-def detect_file_type(filepath):
-    """Detect file type based on alternatives structure:
-    - normal_target: Has numbered questions with multiple IDs (alternatives)
-    - comp_test: Has numbered questions with single IDs (no alternatives)
-    """
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
-        return None, f"Error reading file: {e}"
-    
-    decoded_content = html.unescape(content)
-    
-    # Check for numbered questions pattern
-    numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-    numbered_matches = numbered_pattern.findall(decoded_content)
-    
-    if len(numbered_matches) < 5:
-        # Not enough numbered questions to analyze
-        id_pattern = re.compile(r'\(id:(\d+)\)')
-        all_ids = id_pattern.findall(decoded_content)
-        unique_ids = list(dict.fromkeys(all_ids))
-        
-        if len(unique_ids) >= 10:
-            return "comp_test", f"Comp test file with {len(unique_ids)} unique IDs (no numbered structure)"
-        else:
-            return "unknown", "Unable to determine file type"
-    
-    # Analyze first 5 questions to check for alternatives
-    numbered_sorted = sorted(numbered_matches, key=lambda x: int(x[0]))
-    total_ids_in_sections = 0
-    
-    for i, (q_num, main_id) in enumerate(numbered_sorted[:5]):
-        question_num = int(q_num)
-        
-        # Extract this question's section
-        if i < len(numbered_sorted) - 1:
-            next_q_num = int(numbered_sorted[i+1][0])
-            section_pattern = rf'{question_num}\.\s+.*?(?={next_q_num}\.\s+)'
-        else:
-            section_pattern = rf'{question_num}\.\s+.*'
-        
-        section_match = re.search(section_pattern, decoded_content, re.DOTALL)
-        
-        if section_match:
-            section_content = section_match.group(0)
-            section_ids = re.findall(r'\(id:(\d+)\)', section_content)
-            unique_ids = list(dict.fromkeys(section_ids))
-            total_ids_in_sections += len(unique_ids)
-    
-    # Calculate average IDs per question
-    avg_ids_per_question = total_ids_in_sections / min(5, len(numbered_matches))
-    
-    if avg_ids_per_question > 2.0:
-        return "normal_target", f"Normal target file with {len(numbered_matches)} questions (avg {avg_ids_per_question:.1f} IDs/question - has alternatives)"
-    else:
-        return "comp_test", f"Comp test file with {len(numbered_matches)} questions (avg {avg_ids_per_question:.1f} IDs/question - no alternatives)"
-
-def extract_comp_test_mapping_from_content(target_content, exam_content):
-    """
-    Content-based version of comp test mapping for browser capture
-    Goal: Make exam's main IDs exactly match target's main IDs by selecting correct alternatives
-    """
-    try:
-        target_decoded = html.unescape(target_content)
-        exam_decoded = html.unescape(exam_content)
-
-        # Extract target numbered questions (main questions in target)
-        target_numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-        target_numbered = target_numbered_pattern.findall(target_decoded)
-        target_sorted = sorted(target_numbered, key=lambda x: int(x[0]))
-
-        logging.debug(f"Target has {len(target_sorted)} main questions")
-
-        # ONLY target main IDs matter - these are what exam must match
-        target_main_ids = set(main_id for _, main_id in target_sorted)
-        logging.debug(f"Target main IDs (must match these): {sorted(target_main_ids)}")
-
-        # Extract exam numbered questions
-        exam_numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-        exam_numbered = exam_numbered_pattern.findall(exam_decoded)
-        exam_sorted = sorted(exam_numbered, key=lambda x: int(x[0]))
-
-        logging.debug(f"Exam has {len(exam_sorted)} questions")
-        
-        # Track which exam questions already have correct IDs
-        exam_main_ids = set(main_id for _, main_id in exam_sorted)
-        logging.debug(f"Exam current main IDs: {sorted(exam_main_ids)}")
-
-        # STEP 1: Build all possible alternatives for each exam question
-        question_alternatives = {}  # question_num -> {'current_id': X, 'alternatives': [list of ALL IDs]}
-
-        for i, (exam_q_num, exam_main_id) in enumerate(exam_sorted):
-            question_num = int(exam_q_num)
-
-            # Extract this question's section to get all alternatives
-            if i < len(exam_sorted) - 1:
-                next_exam_q_num = int(exam_sorted[i+1][0])
-                section_pattern = rf'{question_num}\.\s+.*?(?={next_exam_q_num}\.\s+)'
-            else:
-                section_pattern = rf'{question_num}\.\s+.*'
-
-            exam_section_match = re.search(section_pattern, exam_decoded, re.DOTALL)
-
-            if exam_section_match:
-                exam_section_content = exam_section_match.group(0)
-                exam_section_ids = re.findall(r'\(id:(\d+)\)', exam_section_content)
-                exam_unique_ids = list(dict.fromkeys(exam_section_ids))
-
-                question_alternatives[question_num] = {
-                    'current_id': exam_main_id,
-                    'all_ids': exam_unique_ids  # Including current main ID
-                }
-                logging.debug(f"Q{question_num} current={exam_main_id}, all_ids={exam_unique_ids}")
-
-        # STEP 2: Identify which questions need changes and what their options are
-        questions_needing_change = {}  # question_num -> list of valid target IDs it can switch to
-
-        for question_num, info in question_alternatives.items():
-            current_id = info['current_id']
-            
-            # If current ID is already in target, no change needed
-            if current_id in target_main_ids:
-                logging.debug(f"Q{question_num}: ID {current_id} already matches target - no change needed")
-                continue
-            
-            # Find which alternatives are valid target main IDs
-            valid_alternatives = [alt_id for alt_id in info['all_ids'] 
-                                 if alt_id != current_id and alt_id in target_main_ids]
-            
-            if valid_alternatives:
-                questions_needing_change[question_num] = {
-                    'current_id': current_id,
-                    'options': valid_alternatives
-                }
-                logging.debug(f"Q{question_num}: needs change, options={valid_alternatives}")
-            else:
-                logging.debug(f"Q{question_num}: needs change but has NO valid alternatives!")
-
-        # STEP 3: Perfect matching - assign alternatives to ensure all target IDs are covered
-        exam_to_target_mapping = {}
-        used_target_ids = set()
-        
-        # Add IDs that are already correct (no change needed)
-        for question_num, info in question_alternatives.items():
-            if question_num not in questions_needing_change:
-                current_id = info['current_id']
-                if current_id in target_main_ids:
-                    used_target_ids.add(current_id)
-                    logging.debug(f"Q{question_num}: keeping {current_id} (already correct)")
-
-        logging.debug(f"Starting conflict resolution. {len(questions_needing_change)} questions need changes")
-        logging.debug(f"Already matched target IDs: {sorted(used_target_ids)}")
-
-        # Iterative greedy assignment with constraint propagation
-        max_iterations = 20
-        iteration = 0
-        
-        while questions_needing_change and iteration < max_iterations:
-            iteration += 1
-            logging.debug(f"=== ITERATION {iteration} ===")
-            
-            # Filter out already-used target IDs from each question's options
-            for q_num in list(questions_needing_change.keys()):
-                original_options = questions_needing_change[q_num]['options']
-                available_options = [opt for opt in original_options if opt not in used_target_ids]
-                
-                if not available_options:
-                    logging.debug(f"Q{q_num}: ran out of options - cannot resolve!")
-                    del questions_needing_change[q_num]
-                else:
-                    questions_needing_change[q_num]['available_options'] = available_options
-            
-            if not questions_needing_change:
-                break
-            
-            # Sort by flexibility: questions with fewer options go first
-            sorted_questions = sorted(questions_needing_change.items(),
-                                     key=lambda x: len(x[1]['available_options']))
-            
-            # Assign the most constrained question
-            q_num, info = sorted_questions[0]
-            available = info['available_options']
-            
-            if available:
-                chosen_target = available[0]  # Pick first available
-                current_id = info['current_id']
-                
-                # Make assignment
-                exam_to_target_mapping[current_id] = chosen_target
-                used_target_ids.add(chosen_target)
-                
-                logging.debug(f"Q{q_num}: {current_id} -> {chosen_target} (had {len(available)} options)")
-                
-                # Remove this question
-                del questions_needing_change[q_num]
-        
-        if questions_needing_change:
-            remaining = list(questions_needing_change.keys())
-            logging.debug(f"ERROR: Could not resolve {len(remaining)} questions: {remaining}")
-            return None, f"Could not find valid alternatives for questions: {remaining}"
-
-        # STEP 4: Validate the solution
-        logging.debug(f"=== VALIDATION ===")
-        logging.debug(f"Mappings to apply: {len(exam_to_target_mapping)}")
-        
-        # Check for duplicates
-        assigned_targets = list(exam_to_target_mapping.values())
-        if len(assigned_targets) != len(set(assigned_targets)):
-            logging.debug("ERROR: Duplicate target assignments detected!")
-            return None, "Duplicate assignments - algorithm error"
-        
-        # Calculate final coverage
-        final_matched_ids = used_target_ids.copy()
-        logging.debug(f"Final matched target IDs: {len(final_matched_ids)}/{len(target_main_ids)}")
-        logging.debug(f"Matched: {sorted(final_matched_ids)}")
-        
-        missing = target_main_ids - final_matched_ids
-        if missing:
-            logging.debug(f"WARNING: {len(missing)} target IDs not matched: {sorted(missing)}")
-        
-        return exam_to_target_mapping, None
-
-    except Exception as e:
-        return None, f"Error in comp test mapping: {e}"
-    
-def extract_comp_test_mapping(comp_test_filepath, exam_filepath):
-    """
-    Extract mapping for comp_test scenario using POSITIONAL matching
-    - comp_test_filepath: target file (contains the correct answers)
-    - exam_filepath: exam file (current selections to compare against target)
-    
-    CORRECT Logic: Position-based matching
-    - Exam Q8 should get alternatives from Target Q8 (same position)
-    - NOT based on ID matching across different question numbers
-    """
-    import logging
-    logging.basicConfig(filename='debug_log.txt', level=logging.DEBUG, format='%(asctime)s %(message)s')
-    try:
-        # Read target file 
-        with open(comp_test_filepath, 'r', encoding='utf-8') as f:
-            target_content = f.read()
-        
-        # Read exam file  
-        with open(exam_filepath, 'r', encoding='utf-8') as f:
-            exam_content = f.read()
-            
-    except Exception as e:
-        return None, f"Error reading files: {e}"
-    
-    target_decoded = html.unescape(target_content)
-    exam_decoded = html.unescape(exam_content)
-    
-    # Extract target numbered questions (main questions in target)
-    target_numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-    target_numbered = target_numbered_pattern.findall(target_decoded)
-    target_sorted = sorted(target_numbered, key=lambda x: int(x[0]))
-    
-    print(f"DEBUG: Target has {len(target_sorted)} main questions")
-    
-    # Create set of target main IDs for quick lookup
-    target_main_ids = set(qid for _, qid in target_sorted)
-    
-    # Build target question sections with all their alternatives
-    target_alternatives_map = {}  # alternative_id -> main_id
-    
-    for i, (target_q_num, target_main_id) in enumerate(target_sorted):
-        question_num = int(target_q_num)
-        
-        # Extract this target question's section (including alternatives)
-        if i < len(target_sorted) - 1:
-            next_q_num = int(target_sorted[i+1][0])
-            section_pattern = rf'{question_num}\.\s+.*?(?={next_q_num}\.\s+)'
-        else:
-            section_pattern = rf'{question_num}\.\s+.*'
-        
-        section_match = re.search(section_pattern, target_decoded, re.DOTALL)
+        with timer.stage("capture_view_source"):
+            pyautogui.hotkey('ctrl', 'u')
+            time.sleep(3)  # Longer wait for view source window to open
         
-        if section_match:
-            section_content = section_match.group(0)
-            section_ids = re.findall(r'\(id:(\d+)\)', section_content)
-            section_unique = list(dict.fromkeys(section_ids))
-            
-            # Map all IDs in this target section to the main ID
-            for alt_id in section_unique:
-                target_alternatives_map[alt_id] = target_main_id
+        with timer.stage("capture_copy"):
+            # Send Ctrl+A to select all
+            pyautogui.hotkey('ctrl', 'a')
+            time.sleep(0.8)
             
-            print(f"DEBUG: Target Q{question_num} (main:{target_main_id}) has {len(section_unique)} IDs")
-    
-    # Extract exam numbered questions with their alternatives
-    exam_numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-    exam_numbered = exam_numbered_pattern.findall(exam_decoded)
-    exam_sorted = sorted(exam_numbered, key=lambda x: int(x[0]))
-    
-    print(f"DEBUG: Exam has {len(exam_sorted)} questions")
-    
-    # CORRECT APPROACH: Alternative-based matching
-    # For each exam question, find its alternatives and see which target main ID they match
-    exam_to_target_mapping = {}
-    
-    # Create set of all target main IDs for quick lookup
-    target_main_ids = set(main_id for _, main_id in target_sorted)
-    
-    # Create set of all exam main IDs to avoid conflicts
-    exam_main_ids = set(main_id for _, main_id in exam_sorted)
-    print(f"DEBUG: Exam main IDs: {sorted(exam_main_ids)}")
-    print(f"DEBUG: Target main IDs: {sorted(target_main_ids)}")
-    
-    for i, (exam_q_num, exam_main_id) in enumerate(exam_sorted):
-        question_num = int(exam_q_num)
-        
-        print(f"DEBUG: Processing exam Q{question_num} (current ID: {exam_main_id})")
+            # Send Ctrl+C to copy
+            pyautogui.hotkey('ctrl', 'c')
+            time.sleep(0.8)
         
-        # FIRST: Check if current exam ID is already a target main ID
-        if exam_main_id in target_main_ids:
-            print(f"DEBUG: Q{question_num} current ID {exam_main_id} is already a target main ID - no change needed")
-            continue
-        
-        # Extract exam question section to find all its alternatives
-        if i < len(exam_sorted) - 1:
-            next_exam_q_num = int(exam_sorted[i+1][0])
-            section_pattern = rf'{question_num}\.\s+.*?(?={next_exam_q_num}\.\s+)'
-        else:
-            section_pattern = rf'{question_num}\.\s+.*'
-        
-        exam_section_match = re.search(section_pattern, exam_decoded, re.DOTALL)
+        # Get clipboard content
+        with timer.stage("capture_clipboard") as stage:
+            win32clipboard.OpenClipboard()
+            try:
+                html_content = win32clipboard.GetClipboardData(win32con.CF_UNICODETEXT)
+            except:
+                html_content = win32clipboard.GetClipboardData(win32con.CF_TEXT)
+            finally:
+                win32clipboard.CloseClipboard()
+            stage.note(size=len(html_content or ''))
         
-        if exam_section_match:
-            exam_section_content = exam_section_match.group(0)
-            exam_section_ids = re.findall(r'\(id:(\d+)\)', exam_section_content)
-            exam_unique_ids = list(dict.fromkeys(exam_section_ids))
-            
-            # Get alternatives (excluding current main ID)
-            exam_alternatives = [alt_id for alt_id in exam_unique_ids if alt_id != exam_main_id]
+        with timer.stage("capture_close"):
+            # Ensure we're focused on the view source window before closing
+            time.sleep(0.5)
             
-            print(f"DEBUG: Exam Q{question_num} has alternatives: {exam_alternatives}")
+            # ONLY close the view source tab - NOT the entire browser
+            # Use Ctrl+W which closes current tab in all browsers
+            pyautogui.hotkey('ctrl', 'w')
             
-            # IMPROVED: Check alternatives against target main IDs, avoiding conflicts
-            matching_alternative = None
-            for alt_id in exam_alternatives:
-                if alt_id in target_main_ids:
-                    # Check if this target main ID is NOT already used as a main ID in exam
-                    if alt_id not in exam_main_ids:
-                        matching_alternative = alt_id
-                        # Find which target question this matches
-                        for target_q_num, target_main_id in target_sorted:
-                            if target_main_id == alt_id:
-                                print(f"DEBUG: Exam Q{question_num} alternative {alt_id} matches target Q{target_q_num} (conflict-free)")
-                                break
-                        break
-                    else:
-                        print(f"DEBUG: Exam Q{question_num} alternative {alt_id} matches target main ID but conflicts with exam Q - skipping")
-            
-            if matching_alternative:
-                exam_to_target_mapping[exam_main_id] = matching_alternative
-                print(f"DEBUG: Q{question_num} should change from {exam_main_id} -> {matching_alternative}")
-            else:
-                print(f"DEBUG: Q{question_num} - no alternatives match any target main ID")
-        else:
-            print(f"DEBUG: Q{question_num} - could not extract section")
-
-    print(f"DEBUG: Total alternative-based mappings: {len(exam_to_target_mapping)}")
-    return exam_to_target_mapping, None
-
-def extract_target_mapping_from_content(content):
-    """Extract alternative-to-main mapping from HTML content"""
-    if not content:
-        return None, "No content provided"
-    
-    decoded_content = html.unescape(content)
-    
-    # Find all numbered questions with their IDs - this gives us the main questions
-    numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-    numbered_matches = numbered_pattern.findall(decoded_content)
-    sorted_questions = sorted(numbered_matches, key=lambda x: int(x[0]))
-    
-    # Build mapping by finding question sections
-    alternative_to_main = {}
-    
-    for i, (q_num, main_id) in enumerate(sorted_questions):
-        question_num = int(q_num)
-        
-        # Create regex pattern to extract this question's section
-        if i < len(sorted_questions) - 1:
-            next_q_num = int(sorted_questions[i+1][0])
-            section_pattern = rf'{question_num}\.\s+.*?(?={next_q_num}\.\s+)'
-        else:
-            section_pattern = rf'{question_num}\.\s+.*'
+            # Small delay to ensure tab closes
+            time.sleep(0.3)
         
-        section_match = re.search(section_pattern, decoded_content, re.DOTALL)
+        return html_content, None
         
-        if section_match:
-            section_content = section_match.group(0)
-            
-            # Extract all IDs from this section
-            all_ids = re.findall(r'\(id:(\d+)\)', section_content)
-            unique_ids = list(dict.fromkeys(all_ids))
-            
-            # Map all IDs in this section to the main ID
-            # Only map if ID hasn't been seen before (first occurrence wins)
-            # Exception: for Q17/Q22 shared alternatives, prefer Q22
-            for alt_id in unique_ids:
-                if alt_id not in alternative_to_main:
-                    alternative_to_main[alt_id] = main_id
-                else:
-                    # Handle Q17/Q22 conflict - prefer Q22 (136044) over Q17 (136045)
-                    existing_main = alternative_to_main[alt_id]
-                    if existing_main == '136045' and main_id == '136044':
-                        # Override Q17 with Q22 for shared alternatives
-                        alternative_to_main[alt_id] = main_id
-    
-    return alternative_to_main, None
-
-def extract_target_mapping_fixed(filepath):
-    """Extract alternative-to-main mapping using proper question boundary detection"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
     except Exception as e:
-        return None, f"Error reading file: {e}"
-    
-    decoded_content = html.unescape(content)
-    
-    # Find all numbered questions with their IDs - this gives us the main questions
-    numbered_pattern = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
-    numbered_matches = numbered_pattern.findall(decoded_content)
-    sorted_questions = sorted(numbered_matches, key=lambda x: int(x[0]))
-    
-    print(f"DEBUG: Found {len(sorted_questions)} numbered questions")
-    
-    # Build mapping by finding question sections using a different approach
-    alternative_to_main = {}
-    
-    # Since the file is one big line, we need to split by question boundaries
-    # Look for the pattern: question number followed by question text and ID
-    question_sections = []
-    
-    for i, (q_num, main_id) in enumerate(sorted_questions):
-        question_num = int(q_num)
-        
-        # Create regex pattern to extract this question's section
-        # Look for: "N. [question text](id:XXXXX)" until next question "N+1. "
-        if i < len(sorted_questions) - 1:
-            next_q_num = int(sorted_questions[i+1][0])
-            # Pattern: from "N. " to "N+1. " (but not including the next question)
-            section_pattern = rf'{question_num}\.\s+.*?(?={next_q_num}\.\s+)'
-        else:
-            # Last question - goes to end of content
-            section_pattern = rf'{question_num}\.\s+.*'
-        
-        section_match = re.search(section_pattern, decoded_content, re.DOTALL)
-        
-        if section_match:
-            section_content = section_match.group(0)
-            
-            # Extract all IDs from this section
-            all_ids = re.findall(r'\(id:(\d+)\)', section_content)
-            # Remove duplicates while preserving order
-            unique_ids = list(dict.fromkeys(all_ids))
-            
-            print(f"DEBUG: Q{question_num} (Main: {main_id}) has {len(unique_ids)} unique IDs")
-            print(f"DEBUG: Q{question_num} IDs: {unique_ids[:10]}...")  # Show first 10
-            
-            # Map all IDs in this section to the main ID
-            for alt_id in unique_ids:
-                alternative_to_main[alt_id] = main_id
-            
-            question_sections.append({
-                'number': question_num,
-                'main_id': main_id,
-                'all_ids': unique_ids,
-                'section_length': len(section_content)
-            })
-    
-    print(f"DEBUG: Total mappings created: {len(alternative_to_main)}")
-    
-    return alternative_to_main, None
+        return None, f"Error capturing HTML: {str(e)}"
 
-def create_fixed_mapping_gui():
+def create_fixed_mapping_gui(check_updates=True, measure_startup=False):
     root = tk.Tk()
     root.title("📄 Exam Tool v3")
     root.geometry("1200x950")
@@ -851,8 +176,17 @@ def create_fixed_mapping_gui():
     title_label.pack(pady=(0, 15))
     
     # Variables to store captured content
-    target_content = {'content': None, 'source': None}
-    exam_content = {'content': None, 'source': None}
+    target_content = {'content': None, 'source': None, 'timings': []}
+    exam_content = {'content': None, 'source': None, 'timings': []}
+    
+    # Per-stage timing (on by default when EXAM_CLONE_TRACE names a trace file)
+    trace_file = trace_file_from_env()
+    timing_var = tk.BooleanVar(value=bool(trace_file))
+    # Complete truncated test sections from the question bank (opt-in)
+    bank_var = tk.BooleanVar(value=False)
+    
+    # Previous matching, repaired in place when the exam is recaptured
+    matcher = IncrementalMatcher()
     
     # File/Capture selection frame
     file_frame = tk.Frame(main_frame)
@@ -880,10 +214,14 @@ def create_fixed_mapping_gui():
         )
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                target_content['content'] = content
+                # Index the file straight from a memory map; only the question index is kept
+                timer = StageTimer(timing_var.get())
+                with timer.stage("load_target", size=os.path.getsize(file_path)) as stage:
+                    target_content['content'] = parse_exam_mapped(file_path)
+                    stage.note(questions=len(target_content['content']))
+                target_content['timings'] = timer.records
                 target_content['source'] = f"File: {os.path.basename(file_path)}"
+                library_state['library'] = None
                 target_path_var.set(file_path)
                 target_status_var.set("📄 Captured")
                 target_status_label.config(fg="green")
@@ -972,13 +310,16 @@ def create_fixed_mapping_gui():
             root.update()
             
             def capture_thread():
-                html_content, error = capture_html_from_browser(selected_hwnd[0])
+                timer = StageTimer(timing_var.get())
+                html_content, error = capture_html_from_browser(selected_hwnd[0], timer)
                 if error:
                     root.after(0, lambda: messagebox.showerror("Capture Error", error))
                     root.after(0, lambda: target_status_var.set("Capture failed"))
                     root.after(0, lambda: target_status_label.config(fg="red"))
                 else:
                     target_content['content'] = html_content
+                    target_content['timings'] = timer.records
+                    library_state['library'] = None
                     window_title = next(w['title'] for w in browser_windows if w['hwnd'] == selected_hwnd[0])
                     target_content['source'] = f"Browser: {window_title}"
                     root.after(0, lambda: target_path_var.set(f"Captured from: {window_title}"))
@@ -987,7 +328,73 @@ def create_fixed_mapping_gui():
             
             threading.Thread(target=capture_thread, daemon=True).start()
     
+    # Target library: the best matching target is picked whenever an exam is loaded
+    library_state = {'library': None}
+    
+    def select_target_library():
+        directory = filedialog.askdirectory(title="Select the folder with the target files")
+        if not directory:
+            return
+        target_status_var.set("Indexing...")
+        target_status_label.config(fg="orange")
+        
+        def index_thread():
+            # Imported on first use (it brings in the multiprocessing pool of exam_batch)
+            from exam_library import TargetLibrary
+            library = TargetLibrary()
+            try:
+                failed = library.load_directory(directory)
+            except OSError as e:
+                message = f"Failed to load target library: {e}"
+                root.after(0, lambda: messagebox.showerror("Error", message))
+                root.after(0, lambda: target_status_var.set("Not loaded"))
+                root.after(0, lambda: target_status_label.config(fg="red"))
+                return
+            root.after(0, lambda: library_loaded(directory, library, failed))
+        
+        threading.Thread(target=index_thread, daemon=True).start()
+    
+    def library_loaded(directory, library, failed):
+        for path, error in failed:
+            status_text.insert(tk.END, f"⚠️ Skipped {os.path.basename(path)}: {error}\n")
+        if not library:
+            messagebox.showerror("Error", f"No HTML target files in {directory}")
+            target_status_var.set("Not loaded")
+            target_status_label.config(fg="red")
+            return
+        library_state['library'] = library
+        target_content.update(content=None, source=None, timings=[])
+        target_path_var.set(f"📚 {directory}")
+        target_status_var.set(f"📚 {len(library)} targets")
+        target_status_label.config(fg="green")
+        status_text.insert(tk.END, f"📚 Target library: {len(library)} targets, {len(library.postings)} IDs indexed - "
+                                   f"the best match is picked for each exam\n")
+        status_text.see(tk.END)
+        pick_best_target()
+    
+    def pick_best_target():
+        """With a target library loaded, analyse the loaded exam against its best matching target"""
+        if library_state['library'] is not None and exam_content['content']:
+            generate_mapping()
+    
+    def analyze_library_exam(library, exam, **options):
+        # Runs on the analysis worker: ranking (and the exam parse it needs) stays off the Tk thread
+        from exam_library import analyze_best_target
+        ranking, analysis, error = analyze_best_target(library, exam, **options)
+        # Handed to finish_analysis, which pins the target on the Tk thread
+        analysis_job['library_pick'] = library.targets[ranking[0].target] if ranking else None
+        return analysis, error
+    
+    def pin_library_target(best):
+        if best is None:
+            target_content.update(content=None, source=None, timings=[])
+            return
+        target_content.update(content=best.parsed, source=best.source, timings=[])
+        target_path_var.set(f"📚 {best.name} (best of {len(library_state['library'])} targets)")
+        analysis_job['target_source'] = best.source
+    
     tk.Button(target_frame, text="📁 Browse File", command=select_target_file, bg="lightgreen").pack(side=tk.RIGHT, padx=2)
+    tk.Button(target_frame, text="📚 Target Library", command=select_target_library, bg="khaki").pack(side=tk.RIGHT, padx=2)
     tk.Button(target_frame, text="🌐 Capture Browser", command=capture_target_from_browser, bg="lightblue").pack(side=tk.RIGHT, padx=2)
     
     # Exam section (SECOND - test to compare)
@@ -1012,15 +419,20 @@ def create_fixed_mapping_gui():
         )
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                exam_content['content'] = content
+                # Index the file straight from a memory map; only the question index is kept
+                timer = StageTimer(timing_var.get())
+                with timer.stage("load_exam", size=os.path.getsize(file_path)) as stage:
+                    exam_content['content'] = parse_exam_mapped(file_path)
+                    stage.note(questions=len(exam_content['content']))
+                exam_content['timings'] = timer.records
                 exam_content['source'] = f"File: {os.path.basename(file_path)}"
                 exam_path_var.set(file_path)
                 exam_status_var.set("📄 Captured")
                 exam_status_label.config(fg="green")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load file: {e}")
+                return
+            pick_best_target()
     
     def capture_exam_from_browser():
         if not CAPTURE_AVAILABLE:
@@ -1104,194 +516,305 @@ def create_fixed_mapping_gui():
             root.update()
             
             def capture_thread():
-                html_content, error = capture_html_from_browser(selected_hwnd[0])
+                timer = StageTimer(timing_var.get())
+                html_content, error = capture_html_from_browser(selected_hwnd[0], timer)
                 if error:
                     root.after(0, lambda: messagebox.showerror("Capture Error", error))
                     root.after(0, lambda: exam_status_var.set("Capture failed"))
                     root.after(0, lambda: exam_status_label.config(fg="red"))
                 else:
                     exam_content['content'] = html_content
+                    exam_content['timings'] = timer.records
                     window_title = next(w['title'] for w in browser_windows if w['hwnd'] == selected_hwnd[0])
                     exam_content['source'] = f"Browser: {window_title}"
                     root.after(0, lambda: exam_path_var.set(f"Captured from: {window_title}"))
                     root.after(0, lambda: exam_status_var.set("🌐 Captured"))
                     root.after(0, lambda: exam_status_label.config(fg="green"))
+                    root.after(0, pick_best_target)
             
             threading.Thread(target=capture_thread, daemon=True).start()
     
+    watch_job = {'token': None, 'opening': None}
+    
+    def open_folder_watch(target, directory, status=None, progress=None, cancel=None, **options):
+        # Runs on the worker: FolderWatch parses a browser-captured target, which can take a while
+        from exam_watch import FolderWatch
+        return FolderWatch(target, directory, **options)
+    
+    def toggle_watch_folder():
+        if watch_job['opening'] is not None:
+            return
+        if watch_job['token'] is not None:
+            watch_job['token'].cancel()
+            watch_job['token'] = None
+            watch_btn.config(text="👁️ Watch Folder")
+            status_text.insert(tk.END, "⏹️ Stopped watching\n")
+            return
+        if not target_content['content']:
+            messagebox.showerror("Error", "Please load the target first - every capture in the folder is compared against it")
+            return
+        directory = filedialog.askdirectory(title="Select the folder exam captures are saved into")
+        if not directory:
+            return
+        
+        results = queue.Queue()
+        watch_job['opening'] = AnalysisWorker(open_folder_watch, target_content['content'], directory,
+                                              engine=engine_var.get(), on_result=results.put,
+                                              target_source=target_content['source']).start()
+        watch_btn.config(text="⏳ Preparing...", state=tk.DISABLED)
+        root.after(ANALYSIS_POLL_MS, lambda: poll_watch_opening(directory, results))
+    
+    def poll_watch_opening(directory, results):
+        for kind, payload in watch_job['opening'].poll():
+            if kind in AnalysisWorker.FINAL_EVENTS:
+                watch_job['opening'] = None
+                watch_btn.config(text="👁️ Watch Folder", state=tk.NORMAL)
+                if kind == 'done':
+                    start_folder_watch(payload, directory, results)
+                else:
+                    status_text.insert(tk.END, f"❌ Watching not started: {payload}\n")
+                    status_text.see(tk.END)
+                return
+        root.after(ANALYSIS_POLL_MS, lambda: poll_watch_opening(directory, results))
+    
+    def start_folder_watch(watch, directory, results):
+        token = CancelToken()
+        
+        def watch_thread():
+            try:
+                watch.run(token)
+            except Exception as e:
+                results.put({'exam': directory, 'error': f"Watching stopped: {e}", 'analysis': None,
+                             'seconds': 0.0, 'report': None})
+        
+        watch_job['token'] = token
+        threading.Thread(target=watch_thread, daemon=True).start()
+        watch_btn.config(text="⏹️ Stop Watching")
+        status_text.insert(tk.END, f"👁️ Watching {directory} - reports are written to {watch.output_dir}\n")
+        status_text.see(tk.END)
+        root.after(ANALYSIS_POLL_MS, lambda: poll_watch(token, results))
+    
+    def poll_watch(token, results):
+        while True:
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                break
+            name = os.path.basename(result['exam'])
+            if result['error']:
+                status_text.insert(tk.END, f"❌ {name}: {result['error']}\n")
+                continue
+            summary = result['analysis']['summary']
+            status_text.insert(tk.END, f"✅ {name}: {summary['changes_needed']} changes, {summary['unknown']} unknown "
+                                       f"({result['seconds'] * 1000:.0f} ms) → {os.path.basename(result['report'])}\n")
+            # The latest capture is shown unless a manual analysis is running
+            if analysis_job['worker'] is None:
+                analysis_job['target_source'] = target_content['source']
+                analysis_job['exam_source'] = f"Watched: {name}"
+                show_results(result['analysis'])
+        status_text.see(tk.END)
+        if not token.cancelled:
+            root.after(ANALYSIS_POLL_MS, lambda: poll_watch(token, results))
+    
     tk.Button(exam_frame, text="📁 Browse File", command=select_exam_file, bg="lightgreen").pack(side=tk.RIGHT, padx=2)
+    watch_btn = tk.Button(exam_frame, text="👁️ Watch Folder", command=toggle_watch_folder, bg="khaki")
+    watch_btn.pack(side=tk.RIGHT, padx=2)
     tk.Button(exam_frame, text="🌐 Capture Browser", command=capture_exam_from_browser, bg="lightblue").pack(side=tk.RIGHT, padx=2)
     
     # Compare button
+    analysis_job = {'worker': None, 'target_source': None, 'exam_source': None, 'analysis': None, 'timer': None,
+                    'library': None, 'library_pick': None}
+    bank_state = {'bank': None, 'opened': False}
+    
+    def question_bank():
+        # Opt-in: the per-user bank is opened with the first analysis that uses it (None when turned off)
+        if not bank_var.get():
+            return None
+        if not bank_state['opened']:
+            bank_state['opened'] = True
+            from exam_bank import open_default_bank
+            bank_state['bank'] = open_default_bank()
+        return bank_state['bank']
+    
+    def close_question_bank():
+        if bank_state['bank'] is not None:
+            bank_state['bank'].close()
+        bank_state['bank'] = None
+        bank_state['opened'] = False
+    
+    def on_bank_toggled(*_):
+        # An unticked bank is closed now, or by finish_analysis if an analysis is still using it
+        if not bank_var.get() and analysis_job['worker'] is None:
+            close_question_bank()
+    
+    bank_var.trace_add('write', on_bank_toggled)
+    
     def generate_mapping():
-        # Check if content is available (either from files or browser capture)
-        if not target_content['content'] or not exam_content['content']:
+        # Check if content is available (either from files or browser capture, or a target library)
+        library = library_state['library']
+        if not exam_content['content'] or (library is None and not target_content['content']):
             messagebox.showerror("Error", "Please load both target and exam content (via file or browser capture)")
             return
+        if analysis_job['worker'] is not None:
+            return
         
         # Clear previous results
         status_text.delete(1.0, tk.END)
-        results_text.delete(1.0, tk.END)
-        
-        status_text.insert(tk.END, "🔍 Analyzing test content...\n")
-        root.update()
-        
-        # Get exam current selections from content
-        exam_current, exam_error = extract_numbered_questions_from_content(exam_content['content'])
-        if exam_error:
-            status_text.insert(tk.END, f"❌ Test content error: {exam_error}\n")
+        results_table.clear()
+        results_header_var.set("")
+        results_summary_var.set("")
+        analysis_job['analysis'] = None
+        progress_var.set("")
+        
+        # The analysis runs on a worker thread; the UI only drains its events
+        analysis_job['target_source'] = target_content['source']
+        analysis_job['exam_source'] = exam_content['source']
+        timer = StageTimer(timing_var.get())
+        # Load/capture stages are reported with the first analysis after loading
+        timer.extend(target_content['timings'])
+        timer.extend(exam_content['timings'])
+        target_content['timings'] = []
+        exam_content['timings'] = []
+        analysis_job['timer'] = timer
+        options = dict(engine=engine_var.get(), matcher=matcher, timer=timer, bank=question_bank())
+        analysis_job['library'] = library
+        analysis_job['library_pick'] = None
+        if library is not None:
+            analysis_job['worker'] = AnalysisWorker(analyze_library_exam, library, exam_content['content'],
+                                                    **options).start()
+        else:
+            analysis_job['worker'] = AnalysisWorker(run_clone_analysis, target_content['content'],
+                                                    exam_content['content'], **options).start()
+        generate_btn.config(state=tk.DISABLED)
+        cancel_btn.config(state=tk.NORMAL)
+        root.after(ANALYSIS_POLL_MS, poll_analysis)
+    
+    def poll_analysis():
+        worker = analysis_job['worker']
+        if worker is None:
             return
-        
-        status_text.insert(tk.END, f"✅ Test questions: {len(exam_current)}\n")
-        status_text.insert(tk.END, "🔍 Detecting target content type...\n")
-        root.update()
-        
-        # Detect target content type automatically
-        file_type, type_info = detect_file_type_from_content(target_content['content'])
-        status_text.insert(tk.END, f"📋 {type_info}\n")
-        root.update()
-        
-        # FORCE comp test algorithm when both exam and target are loaded
-        # This is the scenario you want - compare exam against target using alternatives
-        status_text.insert(tk.END, "🎯 Using comp test mapping algorithm (exam vs target)...\n")
-        alt_to_main, target_error = extract_comp_test_mapping_from_content(target_content['content'], exam_content['content'])
-        if target_error:
-            status_text.insert(tk.END, f"❌ Comp test mapping error: {target_error}\n")
+        for kind, payload in worker.poll():
+            if kind == 'status':
+                status_text.insert(tk.END, payload + "\n")
+                status_text.see(tk.END)
+            elif kind == 'progress':
+                progress_var.set(f"{payload.stage}: {payload.processed}/{payload.total} questions "
+                                 f"({payload.elapsed:.1f}s)")
+            else:
+                finish_analysis(kind, payload)
+                return
+        root.after(ANALYSIS_POLL_MS, poll_analysis)
+    
+    def finish_analysis(kind, payload):
+        analysis_job['worker'] = None
+        if not bank_var.get():
+            close_question_bank()
+        generate_btn.config(state=tk.NORMAL)
+        cancel_btn.config(state=tk.DISABLED)
+        
+        if kind == 'cancelled':
+            status_text.insert(tk.END, "⏹️ Analysis cancelled\n")
+            progress_var.set("Cancelled")
             return
-        
-        if target_error:
-            status_text.insert(tk.END, f"❌ Target content error: {target_error}\n")
+        if kind == 'failed':
+            status_text.insert(tk.END, f"❌ Analysis failed: {payload}\n")
             return
         
-        status_text.insert(tk.END, f"✅ Target mapping created: {len(alt_to_main)} entries\n")
-        
-        # Apply conflict resolution
-        status_text.insert(tk.END, "🔄 Checking for conflicts...\n")
-        root.update()
-        
-        resolved_mapping = resolve_conflicts(alt_to_main, target_content['content'], exam_content['content'])
-        if resolved_mapping:
-            alt_to_main = resolved_mapping
-            status_text.insert(tk.END, "✅ Conflicts resolved successfully\n")
-        else:
-            status_text.insert(tk.END, "⚠️ Conflict resolution failed, using original mapping\n")
-        
-        # Generate results
-        results_text.insert(tk.END, "📄 EXAM CLONE REPORT\n")
-        results_text.insert(tk.END, "=" * 70 + "\n")
-        results_text.insert(tk.END, f"Target: {target_content['source']} ({file_type})\n")
-        results_text.insert(tk.END, f"Test: {exam_content['source']} (to compare)\n")
-        results_text.insert(tk.END, f"Analysis: {type_info}\n")
-        results_text.insert(tk.END, "=" * 70 + "\n\n")
-        
-        changes_needed = []
-        no_change_needed = []
-        no_mapping_found = []
-        
-        # Process each exam position with comp_test logic (forced)
-        # Always use comp_test logic when both exam and target are loaded
-        if True:  # Force comp_test processing
-            # For comp_test: alt_to_main contains exam_main_id → tart_id mappings
-            status_text.insert(tk.END, "🔍 Processing comp test mapping...\n")
-            root.update()
-            
-            for i, current_id in enumerate(exam_current, 1):
-                if current_id in alt_to_main:
-                    # This exam ID has a mapping to a tart ID
-                    target_id = alt_to_main[current_id]
-                    
-                    if current_id == target_id:
-                        # Already correct
-                        results_text.insert(tk.END, f"Question #{i}: ✅ Already correct (ID:{current_id})\n")
-                        no_change_needed.append(i)
-                    else:
-                        # Need to change to tart ID
-                        results_text.insert(tk.END, f"Question #{i}: Change (ID:{current_id}) -> (ID:{target_id})\n")
-                        changes_needed.append({
-                            'position': i,
-                            'from_id': current_id,
-                            'to_id': target_id
-                        })
-                else:
-                    # Check if current ID is already a target main ID (no change needed)
-                    target_current, _ = extract_numbered_questions_from_content(target_content['content'])
-                    if current_id in target_current:
-                        target_q_pos = target_current.index(current_id) + 1
-                        results_text.insert(tk.END, f"Question #{i}: ✅ Already matches target Q{target_q_pos} (ID:{current_id})\n")
-                        no_change_needed.append(i)
-                    else:
-                        # Truly unknown/no alternatives match
-                        results_text.insert(tk.END, f"Question #{i}: ❌ No suitable alternatives (current ID:{current_id})\n")
-                        no_mapping_found.append({
-                            'position': i,
-                            'current_id': current_id
-                        })
-        else:
-            # Normal target processing
-            for i, current_id in enumerate(exam_current, 1):
-                if current_id in alt_to_main:
-                    main_id = alt_to_main[current_id]
-                    
-                    if current_id == main_id:
-                        # Already the correct main question
-                        results_text.insert(tk.END, f"Question #{i}: ✅ Already correct (ID:{current_id})\n")
-                        no_change_needed.append(i)
-                    else:
-                        # Need to change from alternative to main
-                        results_text.insert(tk.END, f"Question #{i}: Change (ID:{current_id}) -> (ID:{main_id})\n")
-                        changes_needed.append({
-                            'position': i,
-                            'from_id': current_id,
-                            'to_id': main_id
-                        })
-                else:
-                    # Check if current ID is already a target main ID
-                    target_current, _ = extract_numbered_questions_from_content(target_content['content'])
-                    if current_id in target_current:
-                        target_q_pos = target_current.index(current_id) + 1
-                        results_text.insert(tk.END, f"Question #{i}: ✅ Already matches target Q{target_q_pos} (ID:{current_id})\n")
-                        no_change_needed.append(i)
-                    else:
-                        # No mapping found for this ID
-                        results_text.insert(tk.END, f"Question #{i}: ❌ Unknown ID:{current_id} (not in target)\n")
-                        no_mapping_found.append({
-                            'position': i,
-                            'current_id': current_id
-                        })
-        
-        # Summary
-        results_text.insert(tk.END, f"\n" + "=" * 30 + " SUMMARY " + "=" * 30 + "\n")
-        results_text.insert(tk.END, f"🔄 Changes needed: {len(changes_needed)}\n")
-        results_text.insert(tk.END, f"✅ Already correct: {len(no_change_needed)}\n")
-        results_text.insert(tk.END, f"❌ Unknown IDs: {len(no_mapping_found)}\n")
-        results_text.insert(tk.END, f"📊 Total positions: {len(exam_current)}\n")
-        
-        # Calculate success rate
-        total_processed = len(exam_current)
-        mappable = len(changes_needed) + len(no_change_needed)
-        success_rate = (mappable / total_processed * 100) if total_processed else 0
-        
-        results_text.insert(tk.END, f"📈 Mapping success: {success_rate:.1f}%\n")
-        results_text.insert(tk.END, f"--- END REPORT ---\n")
-        
-        # Update status
-        status_text.insert(tk.END, f"🎯 Report complete! {mappable}/{total_processed} questions mapped\n")
+        analysis, error = payload
+        if analysis_job['library'] is not None and analysis_job['library'] is library_state['library']:
+            pin_library_target(analysis_job['library_pick'])
+        if error:
+            return
         
-        if len(no_mapping_found) > 0:
-            status_text.insert(tk.END, f"⚠️  {len(no_mapping_found)} unknown IDs need investigation\n")
-        else:
-            status_text.insert(tk.END, "🎉 All IDs successfully mapped!\n")
+        timer = analysis_job['timer']
+        with timer.stage("render", rows=len(analysis['entries'])):
+            show_results(analysis)
+        if timer.enabled:
+            show_timings(timer)
+    
+    def show_results(analysis):
+        # The table only materialises the visible rows
+        analysis_job['analysis'] = analysis
+        results_header_var.set(f"Target: {analysis_job['target_source']} ({analysis['file_type']})   "
+                               f"Test: {analysis_job['exam_source']}\n{analysis['type_info']}")
+        summary = analysis['summary']
+        results_summary_var.set(f"🔄 Changes needed: {summary['changes_needed']}   "
+                                f"✅ Already correct: {summary['already_correct']}   "
+                                f"❌ Unknown IDs: {summary['unknown']}   "
+                                f"📊 Total positions: {summary['total_positions']}   "
+                                f"📈 Mapping success: {summary['success_rate']:.1f}%")
+        results_table.set_entries(analysis['entries'])
+    
+    def show_timings(timer):
+        status_text.insert(tk.END, "⏱️ Timing breakdown:\n")
+        for line in timer.breakdown_lines():
+            status_text.insert(tk.END, line + "\n")
+        if trace_file:
+            try:
+                timer.append_trace(trace_file)
+                status_text.insert(tk.END, f"📄 Trace appended to {trace_file}\n")
+            except OSError as e:
+                status_text.insert(tk.END, f"⚠️ Could not write trace file: {e}\n")
+        status_text.see(tk.END)
+    
+    def copy_report():
+        analysis = analysis_job['analysis']
+        if analysis is None:
+            return
+        root.clipboard_clear()
+        root.clipboard_append(''.join(format_report_lines(analysis, analysis_job['target_source'],
+                                                          analysis_job['exam_source'])))
+        status_text.insert(tk.END, "📋 Report copied to clipboard\n")
+    
+    def export_results():
+        analysis = analysis_job['analysis']
+        if analysis is None:
+            messagebox.showinfo("Export", "Generate a report first")
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="Export Clone Report",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("JSON Lines", "*.jsonl"), ("CSV", "*.csv")]
+        )
+        if file_path:
+            try:
+                export_report(analysis, file_path)
+                status_text.insert(tk.END, f"💾 Report exported: {os.path.basename(file_path)}\n")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export report: {e}")
     
-    # Generate button
-    generate_btn = tk.Button(main_frame, text="🔄 Generate Clone Report", command=generate_mapping, 
+    def cancel_mapping():
+        if analysis_job['worker'] is not None:
+            analysis_job['worker'].cancel()
+            status_text.insert(tk.END, "⏹️ Cancelling...\n")
+    
+    # Generate / cancel buttons
+    action_frame = tk.Frame(main_frame)
+    action_frame.pack(pady=15)
+    generate_btn = tk.Button(action_frame, text="🔄 Generate Clone Report", command=generate_mapping, 
                             font=("Arial", 13, "bold"), bg="darkblue", fg="white", padx=40, pady=10)
-    generate_btn.pack(pady=15)
+    generate_btn.pack(side=tk.LEFT)
+    cancel_btn = tk.Button(action_frame, text="⏹️ Cancel", command=cancel_mapping, state=tk.DISABLED,
+                           font=("Arial", 11), padx=10, pady=10)
+    cancel_btn.pack(side=tk.LEFT, padx=10)
+    
+    # Matching engine selection (greedy kept for comparing results)
+    engine_frame = tk.Frame(main_frame)
+    engine_frame.pack()
+    tk.Label(engine_frame, text="Matching engine:").pack(side=tk.LEFT)
+    engine_var = tk.StringVar(value=DEFAULT_MATCHING_ENGINE)
+    ttk.Combobox(engine_frame, textvariable=engine_var, values=ENGINE_CHOICES,
+                 state='readonly', width=16).pack(side=tk.LEFT, padx=5)
+    tk.Checkbutton(engine_frame, text="⏱️ Show timings", variable=timing_var).pack(side=tk.LEFT, padx=10)
+    tk.Checkbutton(engine_frame, text="📚 Use question bank", variable=bank_var).pack(side=tk.LEFT, padx=10)
     
     # Status area
     status_frame = tk.Frame(main_frame)
     status_frame.pack(fill=tk.X, pady=5)
     
     tk.Label(status_frame, text="📊 Analysis Status:", font=("Arial", 11, "bold")).pack(anchor='w')
+    progress_var = tk.StringVar(value="")
+    tk.Label(status_frame, textvariable=progress_var, font=("Arial", 9), fg="gray").pack(anchor='w')
     status_text = scrolledtext.ScrolledText(status_frame, height=8, width=80, font=("Consolas", 9))
     status_text.pack(fill=tk.X)
     
@@ -1299,9 +822,22 @@ def create_fixed_mapping_gui():
     results_frame = tk.Frame(main_frame)
     results_frame.pack(fill=tk.BOTH, expand=True, pady=5)
     
-    tk.Label(results_frame, text="📋 Clone Mapping Results:", font=("Arial", 11, "bold")).pack(anchor='w')
-    results_text = scrolledtext.ScrolledText(results_frame, width=80, font=("Consolas", 9))
-    results_text.pack(fill=tk.BOTH, expand=True)
+    results_bar = tk.Frame(results_frame)
+    results_bar.pack(fill=tk.X)
+    tk.Label(results_bar, text="📋 Clone Mapping Results:", font=("Arial", 11, "bold")).pack(side=tk.LEFT)
+    tk.Button(results_bar, text="💾 Export...", command=export_results).pack(side=tk.RIGHT, padx=2)
+    tk.Button(results_bar, text="📋 Copy Report", command=copy_report).pack(side=tk.RIGHT, padx=2)
+    results_filter_var = tk.StringVar(value='all')
+    for value, label in (('unknown', "Unknown only"), ('changes', "Changes only"), ('all', "All")):
+        tk.Radiobutton(results_bar, text=label, value=value, variable=results_filter_var,
+                       command=lambda: results_table.set_filter(results_filter_var.get())).pack(side=tk.RIGHT)
+    
+    results_header_var = tk.StringVar(value="")
+    tk.Label(results_frame, textvariable=results_header_var, justify=tk.LEFT, font=("Consolas", 9)).pack(anchor='w')
+    results_table = VirtualResultsTable(results_frame)
+    results_table.pack(fill=tk.BOTH, expand=True)
+    results_summary_var = tk.StringVar(value="")
+    tk.Label(results_frame, textvariable=results_summary_var, font=("Consolas", 9)).pack(anchor='w')
     
     # Add initial instructions
     status_text.insert(tk.END, "📄 Exam Clone Tool ready.\n")
@@ -1310,51 +846,145 @@ def create_fixed_mapping_gui():
     status_text.insert(tk.END, "Step 3: Generate report (auto-detects file types)\n")
     status_text.insert(tk.END, "Supports: Normal targets & comp test files\n")
     
+    # Update notification bar, shown above the main frame once a newer release is found
+    update_bar = tk.Frame(root, bg="lightyellow", bd=1, relief='solid')
+    update_var = tk.StringVar(value="")
+    tk.Label(update_bar, textvariable=update_var, bg="lightyellow", font=("Arial", 10)).pack(side=tk.LEFT, padx=10, pady=4)
+    tk.Button(update_bar, text="✕", command=update_bar.pack_forget, relief='flat',
+              bg="lightyellow").pack(side=tk.RIGHT, padx=4)
+    update_install_btn = tk.Button(update_bar, text="⬇️ Install Update")
+    update_install_btn.pack(side=tk.RIGHT, padx=4, pady=2)
+    
+    update_state = {'updater': None, 'staged': False}
+    
+    def show_update(updater, latest_version, download_url, changelog):
+        update_bar.pack(fill=tk.X, before=main_frame)
+        if not updater.can_self_update:
+            update_var.set(f"🆕 Update available: {VERSION} → {latest_version}")
+            update_install_btn.config(command=lambda: open_updater(updater))
+            return
+        # Download and verify while the user works; installing then needs no network
+        update_var.set(f"🆕 Update {latest_version} available - downloading in the background...")
+        update_install_btn.pack_forget()
+        update_state['updater'] = updater
+        prefetcher = load_auto_updater().UpdatePrefetcher(updater, download_url, latest_version).start()
+        root.after(UPDATE_POLL_MS, lambda: poll_prefetch(prefetcher, latest_version))
+    
+    def poll_prefetch(prefetcher, latest_version):
+        while True:
+            try:
+                kind, value = prefetcher.events.get_nowait()
+            except queue.Empty:
+                root.after(UPDATE_POLL_MS, lambda: poll_prefetch(prefetcher, latest_version))
+                return
+            if kind == 'progress':
+                update_var.set(f"🆕 Update {latest_version} available - downloading in the background... {value:.0f}%")
+            elif kind == 'staged':
+                update_state['staged'] = True
+                update_var.set(f"✅ Update {latest_version} ready - installs when you close the tool")
+                update_install_btn.config(text="🔄 Restart now", command=restart_with_update)
+                update_install_btn.pack(side=tk.RIGHT, padx=4, pady=2)
+                return
+            else:
+                logger.warning("Update prefetch failed: %s", value)
+                update_var.set(f"🆕 Update available: {VERSION} → {latest_version}")
+                update_install_btn.config(command=lambda: open_updater(prefetcher.updater))
+                update_install_btn.pack(side=tk.RIGHT, padx=4, pady=2)
+                return
+    
+    def restart_with_update():
+        if update_state['updater'].apply_staged_update(restart=True):
+            update_state['staged'] = False
+            root.destroy()
+    
+    def open_updater(updater):
+        update_bar.pack_forget()
+        UpdateWindow = load_auto_updater().create_update_ui()
+        UpdateWindow(updater, parent=root).run()
+    
+    startup = {'shown': False}
+    
+    def on_first_map(event):
+        if event.widget is not root or startup['shown']:
+            return
+        startup['shown'] = True
+        seconds = time.perf_counter() - STARTUP_STARTED
+        logger.info("Time to first window: %.3fs", seconds)
+        if measure_startup:
+            print(f"⏱️ Time to first window: {seconds * 1000:.0f} ms")
+            root.after(0, root.destroy)
+            return
+        timer = StageTimer(timing_var.get())
+        timer.record("startup_first_window", seconds)
+        if timer.enabled:
+            show_timings(timer)
+        # The update check only starts once the window is up and never blocks it
+        if check_updates:
+            start_update_check(root, show_update)
+    
+    root.bind('<Map>', on_first_map, add='+')
     root.mainloop()
+    close_question_bank()
+    
+    # A prefetched update is swapped in once the tool has exited
+    if update_state['staged']:
+        update_state['updater'].apply_staged_update(restart=False)
 
-def check_for_updates_startup():
-    """Check for updates at startup"""
+def start_update_check(root, on_update):
+    """
+    Check GitHub for a newer release on a daemon thread.
+    on_update(updater, latest_version, download_url, changelog) runs on the UI thread,
+    and only when an update exists (or an earlier session already staged one);
+    offline machines and failed checks stay silent.
+    """
     if not AUTO_UPDATE_AVAILABLE:
+        logger.info("Auto-updater not available. Update checking disabled.")
         return
+    results = queue.Queue()
     
-    try:
-        print(f"🔍 Checking for updates (Current version: {VERSION})...")
-        updater = AutoUpdater(VERSION, GITHUB_REPO)
-        
-        # Quick check without UI for startup
-        latest_version, download_url, changelog = updater.check_for_updates()
-        
+    def check():
+        try:
+            # Imported here so requests never loads on the UI thread or before the window
+            auto_updater = load_auto_updater()
+            if auto_updater is None:
+                results.put((None, None, None, None))
+                return
+            updater = auto_updater.AutoUpdater(VERSION, GITHUB_REPO)
+            latest_version, download_url, changelog = updater.check_for_updates()
+            if not latest_version:
+                # Offline or rate limited: an update staged last session still installs
+                staged = updater.staged_update()
+                if staged:
+                    latest_version = staged['version']
+            results.put((updater, latest_version, download_url, changelog))
+        except Exception as e:
+            logger.warning("Update check failed: %s", e)
+            results.put((None, None, None, None))
+    
+    def poll():
+        try:
+            updater, latest_version, download_url, changelog = results.get_nowait()
+        except queue.Empty:
+            root.after(UPDATE_POLL_MS, poll)
+            return
         if latest_version:
-            print(f"🆕 Update available: {VERSION} → {latest_version}")
-            
-            # Create update UI
-            UpdateWindow = create_update_ui()
-            window = UpdateWindow(updater)
-            
-            # Run update UI
-            root = tk.Tk()
-            root.withdraw()  # Hide main window during update
-            
-            try:
-                window.run()
-            except:
-                pass  # Continue if update UI fails
-            
-            root.destroy()
-        else:
-            print(f"✅ Running latest version: {VERSION}")
-            
-    except Exception as e:
-        print(f"⚠️ Update check failed: {e}")
-        # Continue with normal startup even if update check fails
+            on_update(updater, latest_version, download_url, changelog)
+    
+    logger.info("Checking for updates in the background (current version: %s)", VERSION)
+    threading.Thread(target=check, daemon=True).start()
+    root.after(UPDATE_POLL_MS, poll)
 
 def main():
-    """Main application entry point with update check"""
-    # Check for updates first
-    check_for_updates_startup()
+    """
+    Main application entry point.
+    The window comes up first; the update check runs in the background.
+    --measure-startup prints the time to first window and exits (no update check).
+    """
+    # Off unless EXAM_CLONE_LOG_LEVEL is set (e.g. debug)
+    configure_logging()
     
-    # Start main application
-    create_fixed_mapping_gui()
+    measure_startup = '--measure-startup' in sys.argv[1:]
+    create_fixed_mapping_gui(check_updates=not measure_startup, measure_startup=measure_startup)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Dense integer codes for question IDs
+A target's distinct main IDs are numbered 0..n-1 once (cached per parsed
+target, which is usually compared against many exams). Documents are encoded
+against that dictionary into array('I') codes; every ID that is not a target
+main ID shares the code n, so "is a target main ID" is simply code < n.
+
+Sets of IDs become code maps (bytearray, one byte per code). A code map doubles
+as a bitset: int.from_bytes() turns it into an integer with bit 8*code set for
+every member, so union, intersection, difference and counts run as word-level
+integer operations, while single members are tested by indexing.
+"""
+import threading
+import weakref
+from array import array
+from collections import namedtuple
+from itertools import accumulate, chain, repeat
+
+# mains[i]: code of question i's main ID (document order)
+# flat[offsets[i]:offsets[i + 1]]: codes of question i's section IDs (main ID first)
+EncodedExam = namedtuple('EncodedExam', ['mains', 'offsets', 'flat'])
+
+
+class IdCodes:
+    """
+    Dictionary encoding of one target's main IDs.
+    ids[code] is the ID of a code below `other`; `size` is the length of a code map.
+    """
+
+    def __init__(self, main_ids):
+        self.ids = list(dict.fromkeys(main_ids))
+        self.codes = dict(zip(self.ids, range(len(self.ids))))
+        self.other = len(self.ids)
+        self.size = self.other + 1
+        self._documents = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def encode(self, ids):
+        """array('I') of codes for a sequence of ID strings (`other` for non-target IDs)"""
+        return array('I', map(self.codes.get, ids, repeat(self.other)))
+
+    def encode_document(self, parsed):
+        """EncodedExam of a ParsedExam against this dictionary (cached per document)"""
+        with self._lock:
+            encoded = self._documents.get(parsed)
+        if encoded is None:
+            offsets = array('I', [0])
+            offsets.extend(accumulate(map(len, parsed.section_ids)))
+            encoded = EncodedExam(self.encode([main_id for _, main_id in parsed.numbered]), offsets,
+                                  self.encode(list(chain.from_iterable(parsed.section_ids))))
+            with self._lock:
+                self._documents[parsed] = encoded
+        return encoded
+
+
+_target_codes = weakref.WeakKeyDictionary()
+_target_codes_lock = threading.Lock()
+
+
+def target_codes(target_parsed):
+    """IdCodes of a parsed target, built on first use and kept while the target is cached"""
+    with _target_codes_lock:
+        codes = _target_codes.get(target_parsed)
+    if codes is None:
+        codes = IdCodes(main_id for _, main_id in target_parsed.numbered)
+        with _target_codes_lock:
+            _target_codes[target_parsed] = codes
+    return codes
+
+
+def code_map(codes, size):
+    """bytearray of `size` bytes with 1 at every code (an ID set as a byte-wide bitset)"""
+    flags = bytearray(size)
+    for code in codes:
+        flags[code] = 1
+    return flags
+
+
+def to_bits(flags):
+    """Code map -> integer bitset for word-level set operations (bit 8*code per member)"""
+    return int.from_bytes(flags, 'little')
+
+
+def bits_codes(bits):
+    """Codes of the members of an integer bitset, ascending"""
+    flags = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    return [code for code, flag in enumerate(flags) if flag]
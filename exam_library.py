@@ -0,0 +1,188 @@
+"""
+Target library: many targets behind one inverted ID index, ranked against an exam
+Every main and alternative ID of every loaded target points to its
+(target, question) entries, so ranking the library for an exam only walks the
+postings of the exam's own IDs - the cost follows the exam, not the number of targets.
+
+Usage:
+    python -m exam_library TARGET_DIR EXAM [--top 5] [--engine hopcroft_karp] [--format text|json|jsonl|csv] [-o FILE]
+"""
+import os
+import sys
+import time
+import argparse
+from collections import namedtuple
+
+from exam_parser import parse_exam, parse_exam_mapped
+from exam_matching import DEFAULT_MATCHING_ENGINE, ENGINE_CHOICES
+from exam_analysis import run_clone_analysis
+from exam_report import REPORT_EXPORTERS
+from exam_timing import StageTimer
+from exam_batch import find_exam_files
+from exam_cli import write_report
+
+# target: index into TargetLibrary.targets
+# score: (coverable + exam_hits) / (target questions + exam questions), 0..1
+# coverable: target questions whose main ID appears among the exam's IDs (main or alternative)
+# exam_hits: exam questions with at least one ID that is a target main ID
+# already_correct: exam main IDs that are target main IDs
+# shared_ids: distinct exam IDs found anywhere in the target
+TargetMatch = namedtuple('TargetMatch', ['target', 'name', 'score', 'coverable', 'exam_hits',
+                                         'already_correct', 'shared_ids', 'questions'])
+
+LibraryTarget = namedtuple('LibraryTarget', ['name', 'source', 'parsed'])
+
+
+class TargetLibrary:
+    """
+    Loaded targets plus the inverted index over their IDs:
+    postings[id] -> [(target index, question index, is main ID), ...]
+    """
+
+    def __init__(self):
+        self.targets = []
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.targets)
+
+    def add(self, name, content, source=None):
+        """Index one target (HTML content or a ParsedExam); returns its index"""
+        parsed = parse_exam(content)
+        target = len(self.targets)
+        self.targets.append(LibraryTarget(name, source or name, parsed))
+        for question, (_, main_id) in enumerate(parsed.numbered):
+            for qid in parsed.section_ids[question]:
+                self.postings.setdefault(qid, []).append((target, question, qid == main_id))
+        return target
+
+    def add_file(self, path):
+        return self.add(os.path.basename(path), parse_exam_mapped(path), source=f"File: {os.path.basename(path)}")
+
+    def load_directory(self, directory):
+        """Index every HTML target in a directory; returns [(path, error)] for the files that failed"""
+        failed = []
+        for path in find_exam_files(directory):
+            try:
+                self.add_file(path)
+            except (OSError, UnicodeDecodeError, ValueError) as e:
+                failed.append((path, str(e)))
+        return failed
+
+    def rank(self, exam_content, limit=None):
+        """
+        Targets sharing IDs with the exam, best first (targets with no shared ID are left out).
+        Only the postings of the exam's IDs are visited.
+        """
+        exam = parse_exam(exam_content)
+        covered = {}          # target -> target questions whose main ID the exam can offer
+        hit_questions = {}    # target -> exam questions that could take a target main ID
+        correct = {}          # target -> exam questions whose main ID already is a target main ID
+        shared = {}           # target -> distinct exam IDs present in the target
+        seen_ids = set()
+
+        for exam_question, (_, exam_main_id) in enumerate(exam.numbered):
+            for qid in exam.section_ids[exam_question]:
+                postings = self.postings.get(qid)
+                if not postings:
+                    continue
+                first_sighting = qid not in seen_ids
+                seen_ids.add(qid)
+                for target, question, is_main in postings:
+                    if first_sighting:
+                        shared.setdefault(target, set()).add(qid)
+                    if not is_main:
+                        continue
+                    covered.setdefault(target, set()).add(question)
+                    hit_questions.setdefault(target, set()).add(exam_question)
+                    if qid == exam_main_id:
+                        correct.setdefault(target, set()).add(exam_question)
+
+        matches = []
+        for target, ids in shared.items():
+            name, _, parsed = self.targets[target]
+            coverable = len(covered.get(target, ()))
+            exam_hits = len(hit_questions.get(target, ()))
+            total = len(parsed) + len(exam)
+            matches.append(TargetMatch(target, name, (coverable + exam_hits) / total if total else 0.0,
+                                       coverable, exam_hits, len(correct.get(target, ())), len(ids), len(parsed)))
+        matches.sort(key=lambda match: (match.score, match.already_correct, match.shared_ids), reverse=True)
+        return matches[:limit] if limit else matches
+
+
+def analyze_best_target(library, exam_content, engine=DEFAULT_MATCHING_ENGINE, status=None, top=5, **options):
+    """
+    Rank the library for this exam and run the full clone analysis against the best target.
+    The ranking (best `top` targets) is reported through status(message) before the analysis;
+    options (progress, cancel, timer, matcher, ...) are passed on to run_clone_analysis.
+    Returns (ranking, analysis, error).
+    """
+    report_status = status or (lambda message: None)
+    timer = options.setdefault('timer', StageTimer(enabled=False))
+    start_time = time.perf_counter()
+    with timer.stage("rank_targets", targets=len(library)) as stage:
+        exam = parse_exam(exam_content, options.get('cancel'))
+        ranking = library.rank(exam)
+        stage.note(ranked=len(ranking))
+    report_status(f"🔎 Ranked {len(library)} targets in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+    for line in format_ranking_lines(ranking, len(exam), top):
+        report_status(line)
+    if not ranking:
+        error = "No target in the library shares a question ID with this exam"
+        report_status(f"❌ {error}")
+        return ranking, None, error
+    best = library.targets[ranking[0].target]
+    analysis, error = run_clone_analysis(best.parsed, exam, engine=engine, status=status, **options)
+    return ranking, analysis, error
+
+
+def format_ranking_lines(ranking, exam_questions, top=5):
+    """Status lines for the best `top` targets"""
+    lines = []
+    for position, match in enumerate(ranking[:top], 1):
+        lines.append(f"{'🏆' if position == 1 else '  '} {position}. {match.name}: score {match.score:.2f} - "
+                     f"covers {match.coverable}/{match.questions} target questions, "
+                     f"{match.exam_hits}/{exam_questions} exam questions mappable, "
+                     f"{match.already_correct} already correct")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="exam_library",
+                                     description="Pick the best matching target from a folder and compare the exam against it")
+    parser.add_argument("target_dir", help="folder of target HTML files")
+    parser.add_argument("exam", help="test exam HTML file")
+    parser.add_argument("--top", type=int, default=5, help="ranked targets to list (default: 5)")
+    parser.add_argument("--engine", choices=ENGINE_CHOICES, default=DEFAULT_MATCHING_ENGINE)
+    parser.add_argument("--format", choices=['text'] + list(REPORT_EXPORTERS), default='text',
+                        help="report format (default: text)")
+    parser.add_argument("--output", "-o", help="write the report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    library = TargetLibrary()
+    start_time = time.perf_counter()
+    try:
+        failed = library.load_directory(args.target_dir)
+        exam_parsed = parse_exam_mapped(args.exam)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    for path, error in failed:
+        print(f"⚠️ Skipped {os.path.basename(path)}: {error}", file=sys.stderr)
+    if not library:
+        print(f"error: no HTML targets in {args.target_dir}", file=sys.stderr)
+        return 1
+    print(f"📚 {len(library)} targets indexed ({len(library.postings)} IDs) in "
+          f"{(time.perf_counter() - start_time) * 1000:.0f} ms", file=sys.stderr)
+
+    ranking, analysis, error = analyze_best_target(library, exam_parsed, engine=args.engine, top=args.top,
+                                                   status=lambda message: print(message, file=sys.stderr))
+    if error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    write_report(analysis, args.format, args.output, library.targets[ranking[0].target].source, f"File: {args.exam}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Logging setup shared by the GUI and the command line tools
+Records are handed to a QueueHandler and written by a background QueueListener
+into a size-rotated file, so the analysis thread never waits on disk I/O.
+Logging is off unless a level is configured (EXAM_CLONE_LOG_LEVEL or --log-level).
+"""
+import os
+import queue
+import atexit
+import logging
+
+LOG_FILE = 'debug_log.txt'
+LOG_LEVEL_ENV = 'EXAM_CLONE_LOG_LEVEL'
+LOG_FORMAT = '%(asctime)s %(message)s'
+# Rotate at 1 MB and keep debug_log.txt.1 .. debug_log.txt.3
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+
+LOG_LEVELS = ('off', 'debug', 'info', 'warning', 'error')
+
+_listener = None
+_queue_handler = None
+
+
+def parse_log_level(name):
+    """'debug'/'INFO'/... -> logging level, None for 'off' or an empty value"""
+    if not name or name.lower() == 'off':
+        return None
+    level = logging.getLevelName(name.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level '{name}' (available: {', '.join(LOG_LEVELS)})")
+    return level
+
+
+def configure_logging(level=None, filename=LOG_FILE, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    """
+    Route the root logger through a queue to a rotating file.
+    level: a logging level, a level name, or None to read EXAM_CLONE_LOG_LEVEL.
+    With logging off nothing is opened and every debug call is rejected by the level check.
+    Returns the QueueListener, or None when logging is off.
+    """
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_ENV)
+    if isinstance(level, str):
+        try:
+            level = parse_log_level(level)
+        except ValueError as e:
+            print(f"⚠️ {e}; logging disabled")
+            level = None
+
+    shutdown_logging()
+    root = logging.getLogger()
+    if level is None:
+        root.setLevel(logging.WARNING)
+        return None
+
+    global _listener, _queue_handler
+    # logging.handlers pulls in socket, pickle etc.; only needed once logging is on
+    from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+    file_handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backups,
+                                       encoding='utf-8', delay=True)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records to the file and detach the queue handler"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
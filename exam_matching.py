@@ -0,0 +1,526 @@
+"""
+Assignment engines for comp test mapping
+Decide which target main ID each exam question should switch to
+"""
+import heapq
+import logging
+import time
+from collections import deque
+
+from exam_progress import CANCEL_CHECK_INTERVAL, AnalysisCancelled, check_cancelled
+
+logger = logging.getLogger(__name__)
+
+# Each engine takes:
+#   candidates      -> {question_num: {'current_id': X, 'options': [valid target IDs]}}
+#   used_target_ids -> target IDs already held by questions that need no change
+# and returns (assignment, remaining):
+#   assignment -> {question_num: chosen target ID}, in the order assignments were made
+#   remaining  -> question numbers the engine gave up on (left unmapped, reported as unknown)
+# An optional cancel=CancelToken is checked between phases (raises AnalysisCancelled).
+
+
+def greedy_assignment(candidates, used_target_ids, max_iterations=20, cancel=None):
+    """Most-constrained-first greedy assignment (original algorithm)"""
+    questions_needing_change = {q_num: dict(info) for q_num, info in candidates.items()}
+    used_target_ids = set(used_target_ids)
+    assignment = {}
+
+    # Iterative greedy assignment with constraint propagation
+    iteration = 0
+
+    while questions_needing_change and iteration < max_iterations:
+        iteration += 1
+        check_cancelled(cancel)
+        logger.debug("=== ITERATION %s ===", iteration)
+
+        # Filter out already-used target IDs from each question's options
+        for q_num in list(questions_needing_change.keys()):
+            original_options = questions_needing_change[q_num]['options']
+            available_options = [opt for opt in original_options if opt not in used_target_ids]
+
+            if not available_options:
+                logger.debug("Q%s: ran out of options - cannot resolve!", q_num)
+                del questions_needing_change[q_num]
+            else:
+                questions_needing_change[q_num]['available_options'] = available_options
+
+        if not questions_needing_change:
+            break
+
+        # Sort by flexibility: questions with fewer options go first
+        sorted_questions = sorted(questions_needing_change.items(),
+                                  key=lambda x: len(x[1]['available_options']))
+
+        # Assign the most constrained question
+        q_num, info = sorted_questions[0]
+        available = info['available_options']
+
+        chosen_target = available[0]  # Pick first available
+        assignment[q_num] = chosen_target
+        used_target_ids.add(chosen_target)
+
+        logger.debug("Q%s: %s -> %s (had %s options)", q_num, info['current_id'], chosen_target, len(available))
+
+        # Remove this question
+        del questions_needing_change[q_num]
+
+    return assignment, list(questions_needing_change.keys())
+
+
+def hopcroft_karp(adjacency, right_count, cancel=None):
+    """
+    Maximum bipartite matching in O(E * sqrt(V)).
+    adjacency[u] lists the right vertices of left vertex u in preference order.
+    Returns match_left where match_left[u] is u's right vertex or -1.
+    """
+    left_count = len(adjacency)
+    match_left = [-1] * left_count
+    match_right = [-1] * right_count
+
+    # Cheap first pass: take the first free option of every vertex
+    for u in range(left_count):
+        for v in adjacency[u]:
+            if match_right[v] == -1:
+                match_left[u] = v
+                match_right[v] = u
+                break
+
+    while True:
+        check_cancelled(cancel)
+
+        # BFS layers from every free left vertex
+        dist = [-1] * left_count
+        queue = deque()
+        for u in range(left_count):
+            if match_left[u] == -1:
+                dist[u] = 0
+                queue.append(u)
+
+        limit = -1
+        while queue:
+            u = queue.popleft()
+            if limit != -1 and dist[u] >= limit:
+                continue
+            for v in adjacency[u]:
+                w = match_right[v]
+                if w == -1:
+                    if limit == -1:
+                        limit = dist[u] + 1
+                elif dist[w] == -1:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+
+        if limit == -1:
+            return match_left
+
+        # Iterative DFS along the layers, augmenting vertex-disjoint shortest paths
+        next_edge = [0] * left_count
+        for root in range(left_count):
+            if match_left[root] != -1:
+                continue
+            stack = [root]
+            while stack:
+                u = stack[-1]
+                edges = adjacency[u]
+                if next_edge[u] >= len(edges):
+                    dist[u] = -1  # dead end for this phase
+                    stack.pop()
+                    continue
+                v = edges[next_edge[u]]
+                next_edge[u] += 1
+                w = match_right[v]
+                if w == -1:
+                    if dist[u] + 1 != limit:
+                        continue
+                    # Flip the path: every vertex on the stack takes the edge it last tried
+                    for x in stack:
+                        taken = adjacency[x][next_edge[x] - 1]
+                        match_left[x] = taken
+                        match_right[taken] = x
+                    break
+                if dist[w] == dist[u] + 1:
+                    stack.append(w)
+
+
+def hopcroft_karp_assignment(candidates, used_target_ids, cancel=None):
+    """Maximum-coverage assignment via Hopcroft-Karp bipartite matching"""
+    question_nums = list(candidates.keys())
+    target_index = {}
+    adjacency = []
+
+    for q_num in question_nums:
+        edges = []
+        for opt in candidates[q_num]['options']:
+            if opt in used_target_ids:
+                continue
+            if opt not in target_index:
+                target_index[opt] = len(target_index)
+            edges.append(target_index[opt])
+        adjacency.append(edges)
+
+    match_left = hopcroft_karp(adjacency, len(target_index), cancel)
+    target_ids = list(target_index.keys())
+
+    assignment = {}
+    remaining = []
+    for u, q_num in enumerate(question_nums):
+        v = match_left[u]
+        if v == -1:
+            logger.debug("Q%s: no free option left in maximum matching - cannot resolve!", q_num)
+            remaining.append(q_num)
+            continue
+        assignment[q_num] = target_ids[v]
+        logger.debug("Q%s: %s -> %s", q_num, candidates[q_num]['current_id'], target_ids[v])
+
+    logger.debug("Maximum matching covered %s/%s questions", len(assignment), len(question_nums))
+    return assignment, remaining
+
+
+class IncrementalMatcher:
+    """
+    Keeps the last Hopcroft-Karp result and repairs it when the exam is recaptured.
+
+    Questions are compared with the previous run by their (current ID, options)
+    signature. Every changed question, and every target ID that became used or
+    free, is handled as a single vertex update followed by one augmenting-path
+    search, which keeps the matching maximum without re-solving the rest.
+    A different target set starts over with a full solve.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.target_main_ids = None
+        self.candidates = {}
+        self.used_target_ids = set()
+        self.match_q = {}
+        self.match_t = {}
+        self.option_index = {}
+        self.last_stats = {}
+
+    def solve(self, candidates, used_target_ids, target_main_ids, cancel=None):
+        """Same contract as the other engines, plus the target main ID set"""
+        try:
+            return self._solve(candidates, used_target_ids, target_main_ids, cancel)
+        except AnalysisCancelled:
+            # A half-applied repair is not a valid matching to build on
+            self.reset()
+            raise
+
+    def _solve(self, candidates, used_target_ids, target_main_ids, cancel):
+        start_time = time.perf_counter()
+        target_main_ids = frozenset(target_main_ids)
+
+        if self.target_main_ids != target_main_ids:
+            self.reset()
+            self.target_main_ids = target_main_ids
+            self.used_target_ids = set(used_target_ids)
+            assignment, remaining = hopcroft_karp_assignment(candidates, self.used_target_ids, cancel)
+            self.candidates = {q_num: list(info['options']) for q_num, info in candidates.items()}
+            for q_num, options in self.candidates.items():
+                self._index_options(q_num, options)
+            for q_num, target_id in assignment.items():
+                self.match_q[q_num] = target_id
+                self.match_t[target_id] = q_num
+            self.last_stats = {'mode': 'full', 'changed_questions': len(candidates),
+                               'searches': 0, 'seconds': time.perf_counter() - start_time}
+            return assignment, remaining
+
+        new_candidates = {q_num: list(info['options']) for q_num, info in candidates.items()}
+        changed = [q_num for q_num in self.candidates
+                   if new_candidates.get(q_num) != self.candidates[q_num]]
+        changed += [q_num for q_num in new_candidates if q_num not in self.candidates]
+        searches = 0
+
+        # Drop old versions of changed questions, then add the new ones
+        for count, q_num in enumerate(changed):
+            if count % CANCEL_CHECK_INTERVAL == 0:
+                check_cancelled(cancel)
+            if q_num in self.candidates:
+                self._unindex_options(q_num, self.candidates.pop(q_num))
+                freed = self.match_q.pop(q_num, None)
+                if freed is not None:
+                    del self.match_t[freed]
+                    searches += 1
+                    self._augment_from_target(freed)
+        for count, q_num in enumerate(changed):
+            if count % CANCEL_CHECK_INTERVAL == 0:
+                check_cancelled(cancel)
+            if q_num in new_candidates:
+                self.candidates[q_num] = new_candidates[q_num]
+                self._index_options(q_num, new_candidates[q_num])
+                searches += 1
+                self._augment_from_question(q_num)
+
+        # Target IDs taken or released by questions that need no change
+        used_target_ids = set(used_target_ids)
+        for target_id in used_target_ids - self.used_target_ids:
+            self.used_target_ids.add(target_id)
+            evicted = self.match_t.pop(target_id, None)
+            if evicted is not None:
+                del self.match_q[evicted]
+                searches += 1
+                self._augment_from_question(evicted)
+        for target_id in self.used_target_ids - used_target_ids:
+            self.used_target_ids.discard(target_id)
+            searches += 1
+            self._augment_from_target(target_id)
+
+        assignment = {q_num: self.match_q[q_num] for q_num in candidates if q_num in self.match_q}
+        remaining = [q_num for q_num in candidates if q_num not in self.match_q]
+        self.last_stats = {'mode': 'incremental', 'changed_questions': len(changed),
+                           'searches': searches, 'seconds': time.perf_counter() - start_time}
+        logger.debug("Incremental matching: %s", self.last_stats)
+        return assignment, remaining
+
+    def _index_options(self, q_num, options):
+        for target_id in options:
+            self.option_index.setdefault(target_id, set()).add(q_num)
+
+    def _unindex_options(self, q_num, options):
+        for target_id in options:
+            holders = self.option_index.get(target_id)
+            if holders:
+                holders.discard(q_num)
+
+    def _flip(self, path):
+        """Apply an alternating path given as [(q_num, target_id), ...]"""
+        for q_num, target_id in path:
+            self.match_q[q_num] = target_id
+            self.match_t[target_id] = q_num
+
+    def _augment_from_question(self, q_num):
+        """BFS from a free question to a free, unused target ID"""
+        parent = {q_num: None}
+        queue = deque([q_num])
+        while queue:
+            q = queue.popleft()
+            for target_id in self.candidates.get(q, []):
+                if target_id in self.used_target_ids:
+                    continue
+                owner = self.match_t.get(target_id)
+                if owner is None:
+                    path = []
+                    while q is not None:
+                        path.append((q, target_id))
+                        target_id, q = parent[q] if parent[q] else (None, None)
+                    self._flip(path)
+                    return True
+                if owner not in parent:
+                    parent[owner] = (target_id, q)
+                    queue.append(owner)
+        return False
+
+    def _augment_from_target(self, target_id):
+        """BFS from a free target ID back to an unmatched question"""
+        if target_id in self.used_target_ids or target_id in self.match_t:
+            return False
+        parent = {target_id: None}
+        queue = deque([target_id])
+        while queue:
+            t = queue.popleft()
+            for q in self.option_index.get(t, ()):
+                held = self.match_q.get(q)
+                if held is None:
+                    path = []
+                    while t is not None:
+                        path.append((q, t))
+                        q, t = parent[t] if parent[t] else (None, None)
+                    self._flip(path)
+                    return True
+                if held not in parent:
+                    parent[held] = (q, t)
+                    queue.append(held)
+        return False
+
+
+class MinCostFlow:
+    """Successive shortest paths min-cost max-flow (Dijkstra with potentials)"""
+
+    def __init__(self, node_count):
+        self.node_count = node_count
+        self.graph = [[] for _ in range(node_count)]
+        # Edge arrays; edge e and e ^ 1 are a forward/residual pair
+        self.to = []
+        self.cap = []
+        self.cost = []
+
+    def add_edge(self, u, v, cap, cost):
+        """Add u -> v; returns the edge index (its flow is cap of e ^ 1)"""
+        self.graph[u].append(len(self.to))
+        self.to.append(v)
+        self.cap.append(cap)
+        self.cost.append(cost)
+        self.graph[v].append(len(self.to))
+        self.to.append(u)
+        self.cap.append(0)
+        self.cost.append(-cost)
+        return len(self.to) - 2
+
+    def flow(self, source, sink, cancel=None):
+        """Push maximum flow at minimum cost; returns (flow, cost). Costs must be non-negative"""
+        total_flow = 0
+        total_cost = 0
+        potential = [0] * self.node_count
+
+        while True:
+            check_cancelled(cancel)
+            dist = [None] * self.node_count
+            prev_edge = [-1] * self.node_count
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d != dist[u]:
+                    continue
+                for e in self.graph[u]:
+                    if self.cap[e] <= 0:
+                        continue
+                    v = self.to[e]
+                    nd = d + self.cost[e] + potential[u] - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        prev_edge[v] = e
+                        heapq.heappush(heap, (nd, v))
+
+            if dist[sink] is None:
+                return total_flow, total_cost
+
+            for node in range(self.node_count):
+                if dist[node] is not None:
+                    potential[node] += dist[node]
+
+            # Bottleneck along the path
+            push = None
+            v = sink
+            while v != source:
+                e = prev_edge[v]
+                push = self.cap[e] if push is None else min(push, self.cap[e])
+                v = self.to[e ^ 1]
+
+            v = sink
+            while v != source:
+                e = prev_edge[v]
+                self.cap[e] -= push
+                self.cap[e ^ 1] += push
+                total_cost += push * self.cost[e]
+                v = self.to[e ^ 1]
+            total_flow += push
+
+
+# Edge costs for the fewest-changes solver:
+#   keep   -> question keeps its current ID
+#   change -> question switches to another ID (None = large enough that the
+#             number of changes always outweighs the rank preference)
+#   rank   -> added per position after the first listed valid alternative
+DEFAULT_CHANGE_COSTS = {'keep': 0, 'change': None, 'rank': 1}
+
+
+def fewest_changes_assignment(question_alternatives, target_main_ids, costs=None, cancel=None):
+    """
+    Maximise target coverage, then minimise the number of ID changes.
+    Unlike the other engines, questions that already hold a target ID may be
+    reassigned when that frees the only option of another question.
+
+    question_alternatives -> {question_num: {'current_id': X, 'all_ids': [...]}}
+    Returns {question_num: chosen target ID}; questions that end up without a
+    target ID are left out.
+    """
+    costs = dict(DEFAULT_CHANGE_COSTS, **(costs or {}))
+
+    # Candidate edges: (question_num, target_id, rank) where rank -1 = keep
+    edges_by_question = {}
+    max_rank_total = 0
+    for q_num, info in question_alternatives.items():
+        current_id = info['current_id']
+        edges = []
+        if current_id in target_main_ids:
+            edges.append((current_id, -1))
+        rank = 0
+        for alt_id in info['all_ids']:
+            if alt_id != current_id and alt_id in target_main_ids:
+                edges.append((alt_id, rank))
+                rank += 1
+        if edges:
+            edges_by_question[q_num] = edges
+            max_rank_total += max(rank - 1, 0)
+
+    change_cost = costs['change']
+    if change_cost is None:
+        change_cost = costs['keep'] + costs['rank'] * max_rank_total + 1
+    if min(costs['keep'], change_cost, costs['rank']) < 0 or costs['keep'] >= change_cost:
+        raise ValueError("Edge costs must be non-negative and keeping an ID must cost less than changing it")
+
+    # Alternative groups are small and mostly disjoint, so solve each
+    # connected component of the question/target graph on its own
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for q_num, edges in edges_by_question.items():
+        for target_id, _ in edges:
+            parent[find(('q', q_num))] = find(('t', target_id))
+
+    components = {}
+    for q_num in edges_by_question:
+        components.setdefault(find(('q', q_num)), []).append(q_num)
+
+    chosen = {}
+    for question_nums in components.values():
+        check_cancelled(cancel)
+        target_nodes = {}
+        for q_num in question_nums:
+            for target_id, _ in edges_by_question[q_num]:
+                target_nodes.setdefault(target_id, len(target_nodes))
+
+        # Nodes: 0 = source, 1 = sink, then questions, then targets
+        q_offset = 2
+        t_offset = q_offset + len(question_nums)
+        solver = MinCostFlow(t_offset + len(target_nodes))
+        question_edges = []
+        for qi, q_num in enumerate(question_nums):
+            solver.add_edge(0, q_offset + qi, 1, 0)
+            for target_id, rank in edges_by_question[q_num]:
+                cost = costs['keep'] if rank < 0 else change_cost + rank * costs['rank']
+                e = solver.add_edge(q_offset + qi, t_offset + target_nodes[target_id], 1, cost)
+                question_edges.append((q_num, target_id, e))
+        for target_id, ti in target_nodes.items():
+            solver.add_edge(t_offset + ti, 1, 1, 0)
+
+        solver.flow(0, 1, cancel)
+
+        for q_num, target_id, e in question_edges:
+            if solver.cap[e] == 0:
+                chosen[q_num] = target_id
+
+    if logger.isEnabledFor(logging.DEBUG):
+        changes = sum(1 for q_num, target_id in chosen.items()
+                      if target_id != question_alternatives[q_num]['current_id'])
+        logger.debug("Fewest-changes solver: %s components, %s questions covered, %s changes",
+                     len(components), len(chosen), changes)
+    return chosen
+
+
+MATCHING_ENGINES = {
+    'greedy': greedy_assignment,
+    'hopcroft_karp': hopcroft_karp_assignment,
+}
+DEFAULT_MATCHING_ENGINE = 'hopcroft_karp'
+
+# Solver mode that may also move questions which already hold a target ID
+FEWEST_CHANGES_ENGINE = 'min_cost_flow'
+ENGINE_CHOICES = list(MATCHING_ENGINES) + [FEWEST_CHANGES_ENGINE]
+
+
+def get_matching_engine(name):
+    """Look up an assignment engine by name"""
+    if name not in MATCHING_ENGINES:
+        raise ValueError(f"Unknown matching engine '{name}' (available: {', '.join(MATCHING_ENGINES)})")
+    return MATCHING_ENGINES[name]
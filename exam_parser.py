@@ -0,0 +1,528 @@
+"""
+Question index for captured exam/target HTML
+Builds the numbered-question structure of a document in a single pass
+"""
+import re
+import html
+import mmap
+import hashlib
+import logging
+import time
+import threading
+from collections import OrderedDict
+
+from exam_progress import CANCEL_CHECK_INTERVAL, check_cancelled
+
+logger = logging.getLogger(__name__)
+
+NUMBERED_PATTERN = re.compile(r'(\d+)\.\s+[^(]*\(id:(\d+)\)')
+ID_PATTERN = re.compile(r'\(id:(\d+)\)')
+
+
+class ParsedExam:
+    """
+    Numbered questions of one decoded document.
+
+    Every question is stored by its index in document order:
+    - numbered[i]     -> (question_number, main_id) as returned by findall
+    - starts[i]/ends[i] -> section boundaries as offsets into content
+    - section_ids[i]  -> unique IDs in the section (main ID first, then alternatives)
+
+    A section runs from the question's number up to the next numbered question,
+    the last one runs to the end of the document.
+
+    Built from a decoded string (checking the optional cancel token while
+    scanning), or event by event by StreamingExamParser and
+    parse_exam_mapped, in which case content is None and sections cannot be sliced.
+    (parse_exam_mapped offsets count bytes of the scanned buffer, not characters.)
+    """
+
+    def __init__(self, decoded_content=None, cancel=None):
+        self.content = decoded_content
+        self.length = 0
+        self.numbered = []
+        self.starts = []
+        self.ends = []
+        self.section_ids = []
+        self.all_ids = []
+        self._sorted_order = None
+        self._index_by_main_id = None
+        self._section_seen = []
+        if decoded_content is not None:
+            self._scan(cancel)
+
+    def _scan(self, cancel=None):
+        content = self.content
+
+        for match in NUMBERED_PATTERN.finditer(content):
+            if len(self.numbered) % CANCEL_CHECK_INTERVAL == 0:
+                check_cancelled(cancel)
+            self.numbered.append((match.group(1), match.group(2)))
+            self.starts.append(match.start())
+        self.ends = self.starts[1:] + [len(content)]
+
+        # Walk every (id:N) once and drop it into the section it falls in
+        section_seen = [dict() for _ in self.starts]
+        current = -1
+        next_start = self.starts[0] if self.starts else None
+        for match in ID_PATTERN.finditer(content):
+            pos = match.start()
+            while next_start is not None and pos >= next_start:
+                current += 1
+                next_start = self.starts[current + 1] if current + 1 < len(self.starts) else None
+            qid = match.group(1)
+            if len(self.all_ids) % CANCEL_CHECK_INTERVAL == 0:
+                check_cancelled(cancel)
+            self.all_ids.append(qid)
+            if current >= 0:
+                section_seen[current][qid] = None
+
+        self.section_ids = [list(seen) for seen in section_seen]
+        self.length = len(content)
+        logger.debug("Parsed %s numbered questions, %s IDs", len(self.numbered), len(self.all_ids))
+
+    # Incremental construction (used by StreamingExamParser)
+    def _add_question(self, q_num, main_id, start):
+        self.numbered.append((q_num, main_id))
+        self.starts.append(start)
+        self._section_seen.append({})
+
+    def _add_id(self, qid):
+        self.all_ids.append(qid)
+        if self._section_seen:
+            self._section_seen[-1][qid] = None
+
+    def _finish(self, length):
+        self.length = length
+        self.ends = self.starts[1:] + [length]
+        self.section_ids = [list(seen) for seen in self._section_seen]
+        self._section_seen = []
+        logger.debug("Stream-parsed %s numbered questions, %s IDs", len(self.numbered), len(self.all_ids))
+
+    def __len__(self):
+        return len(self.numbered)
+
+    def __bool__(self):
+        # An index is content even when it has no questions
+        return True
+
+    def section(self, index):
+        """Text of one question section (sliced on demand)"""
+        if self.content is None:
+            raise ValueError("Section text is not kept for stream-parsed documents")
+        return self.content[self.starts[index]:self.ends[index]]
+
+    def sorted_order(self):
+        """Question indices ordered by question number"""
+        if self._sorted_order is None:
+            self._sorted_order = sorted(range(len(self.numbered)), key=lambda i: int(self.numbered[i][0]))
+        return self._sorted_order
+
+    def sorted_numbered(self):
+        """(question_number, main_id) pairs ordered by question number"""
+        return [self.numbered[i] for i in self.sorted_order()]
+
+    def question_ids(self):
+        """Main IDs ordered by question number"""
+        return [self.numbered[i][1] for i in self.sorted_order()]
+
+    def main_ids(self):
+        return set(main_id for _, main_id in self.numbered)
+
+    def _main_id_index(self):
+        if self._index_by_main_id is None:
+            self._index_by_main_id = {qid: i for i, (_, qid) in enumerate(self.numbered)}
+        return self._index_by_main_id
+
+    def index_for_main_id(self, main_id):
+        """Index of the question with this main ID (last one wins on duplicates)"""
+        return self._main_id_index().get(main_id)
+
+    def has_duplicate_main_ids(self):
+        """True when some main ID heads more than one question"""
+        return len(self._main_id_index()) != len(self.numbered)
+
+    def alternatives_for(self, main_id):
+        """IDs listed in this main ID's section, excluding the main ID itself"""
+        index = self.index_for_main_id(main_id)
+        if index is None:
+            return []
+        return [alt_id for alt_id in self.section_ids[index] if alt_id != main_id]
+
+
+class ParseCache:
+    """
+    Bounded LRU of parsed documents keyed by a hash of the raw content.
+    The same target is usually compared against several exams, so entries
+    survive between analyses until evicted.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._recent_keys = []  # (content object, key) of the last few lookups
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def content_key(content):
+        digest = hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+        return f"{len(content)}:{digest}"
+
+    def _key_for(self, content):
+        # The same string objects are looked up over and over during one
+        # analysis (and once per exam for a batch target), so skip re-hashing them
+        for recent, key in self._recent_keys:
+            if recent is content:
+                return key
+        key = self.content_key(content)
+        self._recent_keys = [(content, key)] + self._recent_keys[:3]
+        return key
+
+    def get(self, content, cancel=None, stage=None):
+        """
+        Return the ParsedExam for content, parsing it on a miss (cancel aborts the parse).
+        stage: optional exam_timing stage noted with the cache outcome and unescape time.
+        """
+        key = self._key_for(content)
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if stage is not None:
+                    stage.note(cache='hit')
+                return parsed
+            self.misses += 1
+
+        unescape_start = time.perf_counter()
+        decoded = html.unescape(content)
+        if stage is not None:
+            stage.note(cache='miss', unescape_ms=round((time.perf_counter() - unescape_start) * 1000, 1))
+        parsed = ParsedExam(decoded, cancel)
+
+        with self._lock:
+            self._entries[key] = parsed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return parsed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._recent_keys = []
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+parse_cache = ParseCache()
+
+
+def parse_exam(content, cancel=None, stage=None):
+    """
+    Decode HTML content and build its ParsedExam index (cached by content hash).
+    An already built ParsedExam (e.g. from parse_exam_file) is returned as-is.
+    """
+    if isinstance(content, ParsedExam):
+        return content
+    return parse_cache.get(content, cancel, stage)
+
+
+# Longest text html.unescape can consume from one '&': '&' + 32 name chars + ';'
+MAX_ENTITY_LENGTH = 34
+NUMERIC_ENTITY_PREFIX = re.compile(r'&#[xX]?[0-9a-fA-F]*')
+QUESTION_START = re.compile(r'(\d+)\.\s')
+TRAILING_QUESTION_START = re.compile(r'\d+\.?$')
+ID_TOKEN_PREFIXES = ('(', '(i', '(id', '(id:')
+
+
+class StreamingExamParser:
+    """
+    Builds a ParsedExam from HTML fed in chunks, keeping only a small carry-over
+    between chunks: a possibly incomplete entity before decoding, and a possibly
+    incomplete question number or (id:NNN) token after decoding.
+
+    Produces the same questions, offsets and IDs as ParsedExam(html.unescape(text)):
+    the numbered-question regex decides a match at the first '(' after the number,
+    so a candidate "N. " only has to be remembered until that '(' is seen.
+    """
+
+    def __init__(self, cancel=None):
+        self.parsed = ParsedExam()
+        self.cancel = cancel
+        self._raw_carry = ''
+        self._text = ''       # decoded text not yet scanned
+        self._text_base = 0   # decoded offset of _text[0]
+        self._pending = None  # (question_number, start) waiting for its '('
+
+    def feed(self, chunk):
+        """Consume the next chunk of raw HTML"""
+        check_cancelled(self.cancel)
+        raw = self._raw_carry + chunk
+        self._raw_carry = ''
+
+        # Hold back a trailing entity that the next chunk may complete
+        amp = raw.rfind('&')
+        if amp != -1:
+            tail = raw[amp:]
+            if len(tail) <= MAX_ENTITY_LENGTH or NUMERIC_ENTITY_PREFIX.fullmatch(tail):
+                self._raw_carry = tail
+                raw = raw[:amp]
+
+        self._scan(html.unescape(raw), final=False)
+
+    def close(self):
+        """Flush the carry-over and return the finished ParsedExam"""
+        text = html.unescape(self._raw_carry) if self._raw_carry else ''
+        self._raw_carry = ''
+        self._scan(text, final=True)
+        self.parsed._finish(self._text_base + len(self._text))
+        return self.parsed
+
+    def _scan(self, decoded, final):
+        text = self._text + decoded
+        base = self._text_base
+        pos = 0
+
+        while True:
+            paren = text.find('(', pos)
+            region_end = len(text) if paren == -1 else paren
+
+            # Leftmost "N. " between the scan position and the next '('
+            if self._pending is None:
+                start = QUESTION_START.search(text, pos, region_end)
+                if start:
+                    self._pending = (start.group(1), base + start.start())
+
+            if paren == -1:
+                pos = len(text)
+                if self._pending is None and not final:
+                    # Keep a question number that may continue in the next chunk
+                    trailing = TRAILING_QUESTION_START.search(text)
+                    if trailing:
+                        pos = trailing.start()
+                break
+
+            token = ID_PATTERN.match(text, paren)
+            if token is None:
+                if not final and text[paren:] in ID_TOKEN_PREFIXES or (
+                        not final and text.startswith('(id:', paren) and text[paren + 4:].isdigit()):
+                    pos = paren  # incomplete (id:NNN), wait for more text
+                    break
+                # A '(' that is not an ID ends every pending question candidate
+                self._pending = None
+                pos = paren + 1
+                continue
+
+            qid = token.group(1)
+            if self._pending is not None:
+                self.parsed._add_question(self._pending[0], qid, self._pending[1])
+                self._pending = None
+            self.parsed._add_id(qid)
+            pos = token.end()
+
+        self._text = text[pos:]
+        self._text_base = base + pos
+
+
+def parse_exam_stream(stream, chunk_size=65536, cancel=None):
+    """Build a ParsedExam from a text stream read in fixed-size chunks"""
+    parser = StreamingExamParser(cancel)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+    return parser.close()
+
+
+def parse_exam_file(filepath, chunk_size=65536, cancel=None):
+    """Stream-parse an HTML capture without holding the whole file in memory"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return parse_exam_stream(f, chunk_size, cancel)
+
+
+# Byte-level scanning of memory-mapped captures (see parse_exam_mapped)
+NUMBERED_PATTERN_BYTES = re.compile(rb'(\d+)\.\s+[^(]*\(id:(\d+)\)')
+ID_PATTERN_BYTES = re.compile(rb'\(id:(\d+)\)')
+ASCII_BYTES = bytes(range(0x80))
+# ASCII separators that str regexes count as whitespace and bytes regexes do not
+SEPARATOR_LITERALS = {bytes([code]): b' ' for code in range(0x1c, 0x20)}
+SIMPLE_ENTITY_BYTES = re.compile(rb'&(?:#[0-9]{1,8}|#[xX][0-9a-fA-F]{1,8}|[A-Za-z][A-Za-z0-9]{1,31});')
+CHARREF_PATTERN = re.compile(r'&(#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)')  # as in html.unescape
+# Characters the question/ID patterns look at, in the decoded and in the raw text
+DECODED_MARKER_CHARS = re.compile(r'[\d\s().:id]')
+RAW_MARKER_CHARS = re.compile(r'[\d\s().]')
+ENTITY_SCAN_BLOCK = 1 << 20  # bytes copied at a time when collecting the non-ASCII characters
+ENTITY_WINDOW = 160  # bytes: 32 name chars of up to 4 UTF-8 bytes each, plus '&' and ';'
+
+
+def _decode_window(data):
+    # Strict UTF-8, except for a character cut off by the end of the window
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        if e.reason != 'unexpected end of data':
+            raise
+        return data[:e.start].decode('utf-8')
+
+
+def _entity_at(buffer, pos):
+    """(raw_length, decoded_text) of the character reference at buffer[pos] == b'&'"""
+    window = ENTITY_WINDOW
+    while True:
+        raw = _decode_window(bytes(buffer[pos:pos + window]))
+        match = CHARREF_PATTERN.match(raw)
+        # Numeric references have no length limit: widen until the digits end
+        if match is None or match.end() < len(raw) or pos + window >= len(buffer):
+            break
+        window *= 4
+    if match is None:
+        return 1, '&'
+    text = match.group(0)
+    return len(text.encode('utf-8')), html.unescape(text)
+
+
+class _NonAsciiDigit(Exception):
+    """A non-ASCII digit would take part in a match, which bytes regexes cannot see"""
+
+
+def _marker_literal(decoded):
+    """Decoded text as bytes in which every marker character is ASCII (Unicode whitespace -> space)"""
+    literal = []
+    for char in decoded:
+        if char.isascii() and not ('\x1c' <= char <= '\x1f'):
+            literal.append(char)
+        elif char.isspace():
+            literal.append(' ')
+        elif DECODED_MARKER_CHARS.match(char):
+            raise _NonAsciiDigit(char)
+        else:
+            literal.append(char)
+    return ''.join(literal).encode('utf-8')
+
+
+def _entity_literal(raw, decoded):
+    """Replacement bytes for one character reference, or None when it reads the same either way"""
+    if decoded == raw or (not DECODED_MARKER_CHARS.search(decoded) and not RAW_MARKER_CHARS.search(raw)):
+        return None
+    return _marker_literal(decoded)
+
+
+def _literal_spans(buffer):
+    """
+    Replacement bytes for the spans of buffer that a bytes regex would not
+    read like the decoded text, as a list of (start, end, replacement).
+
+    Entities and non-ASCII text that decode to nothing the patterns look at
+    (e.g. &quot; or curly quotes) are left in place; the rest is replaced by
+    its decoded text with ASCII marker characters. Raises _NonAsciiDigit.
+    """
+    # Terminated references such as &quot; repeat thousands of times: classify
+    # each distinct one once and let the search skip the ones left in place
+    simple = {}
+    for token in set(SIMPLE_ENTITY_BYTES.findall(buffer)):
+        text = token.decode('ascii')
+        simple[token] = _entity_literal(text, html.unescape(text))
+    inert = [re.escape(token[1:]) for token, literal in simple.items() if literal is None]
+
+    # Non-ASCII text only matters where it decodes to whitespace (or a digit):
+    # search for exactly those characters
+    characters = dict(SEPARATOR_LITERALS)
+    non_ascii = b''.join(buffer[offset:offset + ENTITY_SCAN_BLOCK].translate(None, ASCII_BYTES)
+                         for offset in range(0, len(buffer), ENTITY_SCAN_BLOCK))
+    for char in set(non_ascii.decode('utf-8')):
+        if DECODED_MARKER_CHARS.match(char):
+            characters[char.encode('utf-8')] = _marker_literal(char)
+
+    ampersand = b'&(?!' + b'|'.join(inert) + b')' if inert else b'&'
+    pattern = re.compile(b'|'.join([ampersand] + [re.escape(char) for char in characters]))
+
+    spans = []
+    pos = 0
+    while True:
+        match = pattern.search(buffer, pos)
+        if match is None:
+            return spans
+        start = match.start()
+        if buffer[start] == 0x26:  # '&'
+            token = SIMPLE_ENTITY_BYTES.match(buffer, start)
+            if token is not None:
+                end = token.end()
+                literal = simple[token.group(0)]
+            else:
+                raw_length, decoded = _entity_at(buffer, start)
+                raw = bytes(buffer[start:start + raw_length]).decode('utf-8')
+                if decoded == raw:
+                    pos = start + 1
+                    continue
+                # The reference may swallow non-ASCII name characters; resume after it
+                end = start + raw_length
+                literal = _entity_literal(raw, decoded)
+        else:
+            end = match.end()
+            literal = characters[match.group(0)]
+        pos = end
+        if literal is not None:
+            spans.append((start, end, literal))
+
+
+def _scan_bytes(buffer, cancel=None):
+    """ParsedExam of a buffer in which every marker character is plain ASCII"""
+    parsed = ParsedExam()
+    questions = NUMBERED_PATTERN_BYTES.finditer(buffer)
+    question = next(questions, None)
+    for match in ID_PATTERN_BYTES.finditer(buffer):
+        # A question's number always comes before its main (id:N) token
+        while question is not None and question.start() < match.start():
+            parsed._add_question(question.group(1).decode('ascii'), question.group(2).decode('ascii'),
+                                 question.start())
+            question = next(questions, None)
+        if len(parsed.all_ids) % CANCEL_CHECK_INTERVAL == 0:
+            check_cancelled(cancel)
+        parsed._add_id(match.group(1).decode('ascii'))
+    parsed._finish(len(buffer))
+    return parsed
+
+
+def parse_exam_mapped(filepath, cancel=None):
+    """
+    Build a ParsedExam by memory-mapping an HTML capture and scanning its
+    bytes, without decoding or unescaping the whole file.
+
+    Questions and IDs are identical to parse_exam(text) of the decoded file.
+    Only entities and non-ASCII runs are decoded, and only those that can
+    affect a match are substituted (into a bytes copy of the file); the
+    mapping itself is scanned in place when there are none. Falls back to
+    parse_exam_file for the rare capture with non-ASCII digits.
+    """
+    with open(filepath, 'rb') as f:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return parse_exam_file(filepath, cancel=cancel)  # empty file (cannot be mapped)
+
+    with mapping:
+        try:
+            spans = _literal_spans(mapping)
+        except _NonAsciiDigit:
+            logger.debug("Non-ASCII digits in %s, parsing decoded text", filepath)
+            return parse_exam_file(filepath, cancel=cancel)
+        if not spans:
+            return _scan_bytes(mapping, cancel)
+
+        pieces = []
+        pos = 0
+        for start, end, literal in spans:
+            pieces.append(mapping[pos:start])
+            pieces.append(literal)
+            pos = end
+        pieces.append(mapping[pos:])
+        logger.debug("Substituted %s entity/non-ASCII spans in %s", len(spans), filepath)
+        return _scan_bytes(b''.join(pieces), cancel)
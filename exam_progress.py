@@ -0,0 +1,93 @@
+"""
+Progress events and cancellation for long-running analyses
+The GUI runs the pipeline on a worker thread and drains its events with root.after
+"""
+import queue
+import threading
+from collections import namedtuple
+
+# stage: short stage name, processed/total: questions (or positions) done so far,
+# elapsed: seconds since the analysis started
+ProgressEvent = namedtuple('ProgressEvent', ['stage', 'processed', 'total', 'elapsed'])
+
+# Loops check their cancel token once every this many iterations
+CANCEL_CHECK_INTERVAL = 1024
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside the pipeline once its CancelToken has been cancelled"""
+
+
+class CancelToken:
+    """Thread-safe cancel flag shared between the UI and a worker"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise AnalysisCancelled()
+
+
+def check_cancelled(cancel):
+    """Raise AnalysisCancelled if cancel (a CancelToken or None) has been cancelled"""
+    if cancel is not None and cancel.cancelled:
+        raise AnalysisCancelled()
+
+
+class AnalysisWorker:
+    """
+    Runs one analysis function on a daemon thread.
+
+    The function is called with status=, progress= and cancel= keyword arguments
+    (see exam_analysis.run_clone_analysis). Everything it reports is queued as
+    (kind, payload) events for the UI thread to drain with poll():
+    ('status', message), ('progress', ProgressEvent), and finally exactly one of
+    ('done', result), ('cancelled', None) or ('failed', message).
+    """
+
+    FINAL_EVENTS = ('done', 'cancelled', 'failed')
+
+    def __init__(self, function, *args, **kwargs):
+        self.cancel_token = CancelToken()
+        self.events = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(function, args, kwargs), daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _run(self, function, args, kwargs):
+        try:
+            result = function(*args,
+                              status=lambda message: self.events.put(('status', message)),
+                              progress=lambda event: self.events.put(('progress', event)),
+                              cancel=self.cancel_token, **kwargs)
+            self.events.put(('done', result))
+        except AnalysisCancelled:
+            self.events.put(('cancelled', None))
+        except Exception as e:
+            self.events.put(('failed', f"{type(e).__name__}: {e}"))
+
+    def poll(self, max_events=500):
+        """Events queued since the last poll (never blocks)"""
+        events = []
+        while len(events) < max_events:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
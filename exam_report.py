@@ -0,0 +1,187 @@
+"""
+Clone report model and exporters
+Per-position results of one exam/target comparison, streamed to JSON, JSONL or CSV
+"""
+import csv
+import json
+
+# Report entry status -> kind
+ENTRY_KINDS = {
+    'change': 'change',
+    'correct': 'no_change',
+    'matches_target': 'no_change',
+    'no_alternatives': 'unknown',
+}
+
+# Positions between progress callbacks while building
+REPORT_PROGRESS_INTERVAL = 256
+
+CSV_COLUMNS = ['position', 'kind', 'status', 'current_id', 'to_id', 'target_position']
+
+
+def position_index(question_ids):
+    """ID -> 1-based position of its first occurrence (same answer as list.index + 1)"""
+    positions = {}
+    for position, qid in enumerate(question_ids, 1):
+        positions.setdefault(qid, position)
+    return positions
+
+
+class CloneReport:
+    """
+    Results of one comparison, in exam position order.
+
+    Each entry is a dict with 'position', 'status' and 'current_id', plus
+    'to_id' for a change or 'target_position' for an ID that already matches a
+    target question. ENTRY_KINDS groups the statuses into change / no_change / unknown.
+    """
+
+    def __init__(self, entries=None, summary=None, file_type=None, type_info=None, engine=None, mapping=None):
+        self.entries = entries or []
+        self.summary = summary or {}
+        self.file_type = file_type
+        self.type_info = type_info
+        self.engine = engine
+        self.mapping = mapping or {}
+        # Target ID -> first position, filled in by build()
+        self.target_positions = {}
+
+    @classmethod
+    def build(cls, exam_ids, mapping, target_ids, progress=None, **info):
+        """
+        Build the report in one pass over the exam positions.
+        exam_ids/target_ids: main IDs in question order, mapping: exam ID -> target ID.
+        progress(positions_done) is called every REPORT_PROGRESS_INTERVAL positions.
+        """
+        target_positions = position_index(target_ids)
+        entries = []
+        counts = {'change': 0, 'no_change': 0, 'unknown': 0}
+
+        for i, current_id in enumerate(exam_ids, 1):
+            if progress and i % REPORT_PROGRESS_INTERVAL == 0:
+                progress(i)
+            if current_id in mapping:
+                target_id = mapping[current_id]
+                if current_id == target_id:
+                    # Already correct
+                    entry = {'position': i, 'status': 'correct', 'current_id': current_id}
+                else:
+                    # Need to change to the target ID
+                    entry = {'position': i, 'status': 'change', 'current_id': current_id, 'to_id': target_id}
+            elif current_id in target_positions:
+                # Current ID is already a target main ID (no change needed)
+                entry = {'position': i, 'status': 'matches_target', 'current_id': current_id,
+                         'target_position': target_positions[current_id]}
+            else:
+                # Truly unknown/no alternatives match
+                entry = {'position': i, 'status': 'no_alternatives', 'current_id': current_id}
+            entries.append(entry)
+            counts[ENTRY_KINDS[entry['status']]] += 1
+        if progress:
+            progress(len(entries))
+
+        total = len(entries)
+        mappable = counts['change'] + counts['no_change']
+        summary = {
+            'changes_needed': counts['change'],
+            'already_correct': counts['no_change'],
+            'unknown': counts['unknown'],
+            'total_positions': total,
+            'success_rate': round((mappable / total * 100) if total else 0, 1),
+        }
+        report = cls(entries, summary, mapping=mapping, **info)
+        report.target_positions = target_positions
+        return report
+
+    @classmethod
+    def from_analysis(cls, analysis):
+        """Wrap an analysis dict from run_clone_analysis"""
+        return cls(analysis['entries'], analysis['summary'], analysis.get('file_type'),
+                   analysis.get('type_info'), analysis.get('engine'), analysis.get('mapping'))
+
+    def as_dict(self):
+        """Plain JSON-serializable dict (the analysis format of run_clone_analysis)"""
+        return {
+            'file_type': self.file_type,
+            'type_info': self.type_info,
+            'engine': self.engine,
+            'mapping': self.mapping,
+            'entries': self.entries,
+            'summary': self.summary,
+        }
+
+    def entries_of_kind(self, kind):
+        return (entry for entry in self.entries if ENTRY_KINDS[entry['status']] == kind)
+
+    @property
+    def changes(self):
+        return list(self.entries_of_kind('change'))
+
+    @property
+    def no_change(self):
+        return list(self.entries_of_kind('no_change'))
+
+    @property
+    def unknown(self):
+        return list(self.entries_of_kind('unknown'))
+
+
+def _as_report(report):
+    return report if isinstance(report, CloneReport) else CloneReport.from_analysis(report)
+
+
+def write_report_json(report, out):
+    """Stream a report (CloneReport or analysis dict) as one JSON document, one entry per line"""
+    report = _as_report(report)
+    out.write("{\n")
+    for key, value in (('file_type', report.file_type), ('type_info', report.type_info),
+                       ('engine', report.engine), ('summary', report.summary)):
+        out.write(f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n")
+    out.write('  "mapping": {')
+    separator = "\n"
+    for exam_id, target_id in report.mapping.items():
+        out.write(f"{separator}    {json.dumps(exam_id)}: {json.dumps(target_id)}")
+        separator = ",\n"
+    out.write("\n  },\n")
+    out.write('  "entries": [')
+    separator = "\n"
+    for entry in report.entries:
+        out.write(separator + "    " + json.dumps(entry, ensure_ascii=False))
+        separator = ",\n"
+    out.write("\n  ]\n}\n")
+
+
+def write_report_jsonl(report, out):
+    """Stream a report as JSON lines: one per entry (with its kind), then a summary record"""
+    report = _as_report(report)
+    for entry in report.entries:
+        out.write(json.dumps(dict(entry, kind=ENTRY_KINDS[entry['status']]), ensure_ascii=False) + "\n")
+    out.write(json.dumps({'kind': 'summary', 'file_type': report.file_type, 'engine': report.engine,
+                          **report.summary}, ensure_ascii=False) + "\n")
+
+
+def write_report_csv(report, out):
+    """Stream report entries as CSV rows (CSV_COLUMNS)"""
+    report = _as_report(report)
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    for entry in report.entries:
+        writer.writerow([entry['position'], ENTRY_KINDS[entry['status']], entry['status'], entry['current_id'],
+                         entry.get('to_id', ''), entry.get('target_position', '')])
+
+
+REPORT_EXPORTERS = {
+    'json': write_report_json,
+    'jsonl': write_report_jsonl,
+    'csv': write_report_csv,
+}
+
+
+def export_report(report, path, fmt=None):
+    """Write a report to a file; the format defaults to the file extension"""
+    fmt = fmt or path.rsplit('.', 1)[-1].lower()
+    if fmt not in REPORT_EXPORTERS:
+        raise ValueError(f"Unknown report format '{fmt}' (available: {', '.join(REPORT_EXPORTERS)})")
+    newline = '' if fmt == 'csv' else None
+    with open(path, 'w', encoding='utf-8', newline=newline) as out:
+        REPORT_EXPORTERS[fmt](report, out)
@@ -0,0 +1,192 @@
+"""
+Virtualized results table for clone reports
+Only the rows that fit on screen exist as Treeview items; scrolling refills
+them from the in-memory entry list, so large reports render in constant time
+"""
+import tkinter as tk
+from tkinter import ttk
+
+# (column id, heading, width)
+RESULT_COLUMNS = (
+    ('position', 'Position', 80),
+    ('from_id', 'From ID', 120),
+    ('to_id', 'To ID', 120),
+    ('status', 'Status', 320),
+)
+
+# Rows moved per mouse wheel notch
+WHEEL_ROWS = 3
+
+# Entry statuses shown by each filter (None = everything)
+RESULT_FILTERS = {
+    'all': None,
+    'changes': {'change'},
+    'unknown': {'no_alternatives'},
+}
+
+
+def status_label(entry):
+    """Status column text for one report entry"""
+    status = entry['status']
+    if status == 'change':
+        return "🔄 Change"
+    if status == 'correct':
+        return "✅ Already correct"
+    if status == 'matches_target':
+        return f"✅ Already matches target Q{entry['target_position']}"
+    return "❌ No suitable alternatives"
+
+
+def result_row(entry):
+    """Column values for one report entry"""
+    return (entry['position'], entry['current_id'], entry.get('to_id', ''), status_label(entry))
+
+
+def _id_sort_key(value):
+    # Numeric IDs in numeric order, empty cells last
+    return (0, int(value), '') if value.isdigit() else (1, 0, value)
+
+
+def result_sort_key(column):
+    """Sort key over report entries for a column id"""
+    if column == 'position':
+        return lambda entry: entry['position']
+    if column == 'from_id':
+        return lambda entry: _id_sort_key(entry['current_id'])
+    if column == 'to_id':
+        return lambda entry: _id_sort_key(entry.get('to_id', ''))
+    return lambda entry: (status_label(entry), entry['position'])
+
+
+def select_results(entries, filter_name='all', sort_column='position', descending=False):
+    """Filtered and sorted view of report entries (the list the table pages through)"""
+    statuses = RESULT_FILTERS[filter_name]
+    rows = entries if statuses is None else [entry for entry in entries if entry['status'] in statuses]
+    return sorted(rows, key=result_sort_key(sort_column), reverse=descending)
+
+
+class VirtualResultsTable(tk.Frame):
+    """
+    Treeview that pages through a list of report entries.
+
+    The Treeview holds one item per visible row; set_entries/set_filter/sort_by
+    only rebuild the row list, and scrolling just rewrites the item values.
+    """
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.entries = []
+        self.rows = []
+        self.filter_name = 'all'
+        self.sort_column = 'position'
+        self.descending = False
+        self.offset = 0
+        self._items = []
+        self._detached = set()
+
+        self.tree = ttk.Treeview(self, columns=[column for column, _, _ in RESULT_COLUMNS],
+                                 show='headings', selectmode='browse')
+        for column, heading, width in RESULT_COLUMNS:
+            self.tree.heading(column, text=heading, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, anchor='w', stretch=(column == 'status'))
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        self.tree.bind('<Configure>', lambda event: self._resize(event.height))
+        # Scrolling moves the window over self.rows, never the Treeview itself
+        for sequence, direction, what in (('<Button-4>', -1, 'units'), ('<Button-5>', 1, 'units'),
+                                          ('<Prior>', -1, 'pages'), ('<Next>', 1, 'pages')):
+            self.tree.bind(sequence, lambda event, d=direction, w=what: self._scroll_event(d, w))
+        self.tree.bind('<MouseWheel>', lambda event: self._scroll_event(-1 if event.delta > 0 else 1, 'units'))
+        self.tree.bind('<Home>', lambda event: self._scroll_event(0, 'start'))
+        self.tree.bind('<End>', lambda event: self._scroll_event(0, 'end'))
+        self._update_headings()
+
+    # View model
+    def set_entries(self, entries):
+        self.entries = list(entries)
+        self._refresh(reset_offset=True)
+
+    def set_filter(self, filter_name):
+        self.filter_name = filter_name
+        self._refresh(reset_offset=True)
+
+    def sort_by(self, column):
+        """Sort by a column; a second click on the same column reverses the order"""
+        self.descending = not self.descending if column == self.sort_column else False
+        self.sort_column = column
+        self._update_headings()
+        self._refresh(reset_offset=False)
+
+    def clear(self):
+        self.set_entries([])
+
+    def _refresh(self, reset_offset):
+        self.rows = select_results(self.entries, self.filter_name, self.sort_column, self.descending)
+        if reset_offset:
+            self.offset = 0
+        self.scroll_to(self.offset)
+
+    def _update_headings(self):
+        for column, heading, _ in RESULT_COLUMNS:
+            arrow = (" ▼" if self.descending else " ▲") if column == self.sort_column else ""
+            self.tree.heading(column, text=heading + arrow)
+
+    # Scrolling
+    def scroll(self, direction, what='units', amount=1):
+        step = amount if what == 'units' else max(1, len(self._items) - 1)
+        self.scroll_to(self.offset + direction * step)
+
+    def _scroll_event(self, direction, what):
+        if what == 'start':
+            self.scroll_to(0)
+        elif what == 'end':
+            self.scroll_to(len(self.rows))
+        else:
+            self.scroll(direction, what, WHEEL_ROWS)
+        return 'break'
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.rows) - len(self._items)))
+        self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * len(self.rows)))
+        elif action == 'scroll':
+            self.scroll(int(args[0]), args[1])
+
+    def _resize(self, height):
+        # One item per row that fits under the heading
+        visible = max(1, (height - self.row_height - 4) // self.row_height)
+        while len(self._items) < visible:
+            self._items.append(self.tree.insert('', tk.END, values=()))
+        while len(self._items) > visible:
+            item = self._items.pop()
+            self._detached.discard(item)
+            self.tree.delete(item)
+        self.scroll_to(self.offset)
+
+    def _render(self):
+        # Items past the end of the list are detached (always a tail of _items)
+        selection = self.tree.selection()
+        if selection:
+            self.tree.selection_remove(selection)
+        for k, item in enumerate(self._items):
+            index = self.offset + k
+            if index < len(self.rows):
+                if item in self._detached:
+                    self.tree.move(item, '', k)
+                    self._detached.discard(item)
+                self.tree.item(item, values=result_row(self.rows[index]))
+            elif item not in self._detached:
+                self.tree.detach(item)
+                self._detached.add(item)
+
+        total = len(self.rows)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(self._items)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
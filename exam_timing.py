@@ -0,0 +1,154 @@
+"""
+Per-stage timing for loading, capture and analysis
+A disabled StageTimer hands out one shared no-op stage, so the instrumented
+code paths cost a method call per stage when nobody is looking.
+Enabled timers keep (stage, wall time, sizes/counts) records that can be shown
+as a breakdown or appended to a Chrome trace-event file (chrome://tracing, Perfetto).
+"""
+import os
+import json
+import time
+import threading
+
+# Set to a file path to enable timing and append every run to that trace file
+TRACE_FILE_ENV = 'EXAM_CLONE_TRACE'
+
+
+class StageRecord:
+    """One timed stage: name, start (epoch seconds), duration (seconds), thread and counts"""
+
+    __slots__ = ('name', 'start', 'duration', 'thread_id', 'counts', '_started')
+
+    def __init__(self, name, counts):
+        self.name = name
+        self.counts = counts
+        self.start = 0.0
+        self.duration = 0.0
+        self.thread_id = threading.get_ident()
+        self._started = 0.0
+
+    def note(self, **counts):
+        """Attach sizes/counts only known once the stage has run (e.g. questions parsed)"""
+        self.counts.update(counts)
+
+    def __enter__(self):
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._started
+        if exc_type is not None:
+            self.counts['error'] = exc_type.__name__
+        return False
+
+
+class _NullStage:
+    """Stand-in for StageRecord when timing is disabled"""
+
+    def note(self, **counts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageTimer:
+    """
+    Collects StageRecords for one run.
+
+        with timer.stage("parse_test", size=len(html)) as stage:
+            parsed = parse_exam(html)
+            stage.note(questions=len(parsed))
+
+    Records are appended from whichever thread runs the stage (list.append is atomic).
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.records = []
+
+    def stage(self, name, **counts):
+        if not self.enabled:
+            return _NULL_STAGE
+        record = StageRecord(name, counts)
+        self.records.append(record)
+        return record
+
+    def record(self, name, duration, **counts):
+        """Add a stage that was measured by other means and ends now (e.g. startup time)"""
+        if not self.enabled:
+            return
+        record = StageRecord(name, counts)
+        record.duration = duration
+        record.start = time.time() - duration
+        self.records.append(record)
+
+    def extend(self, records):
+        """Add records timed elsewhere (e.g. when the documents were loaded)"""
+        if self.enabled:
+            self.records.extend(records)
+
+    @property
+    def total(self):
+        return sum(record.duration for record in self.records)
+
+    def breakdown_lines(self):
+        """Status-panel lines: one per stage with its share of the total"""
+        total = self.total
+        lines = []
+        for record in self.records:
+            share = (record.duration / total * 100) if total else 0
+            details = ", ".join(f"{key} {_format_count(key, value)}" for key, value in record.counts.items())
+            line = f"   {record.name:<20} {record.duration * 1000:>9.1f} ms {share:>5.1f}%"
+            lines.append(f"{line}  ({details})" if details else line)
+        lines.append(f"   {'total':<20} {total * 1000:>9.1f} ms")
+        return lines
+
+    def trace_events(self):
+        """Chrome trace 'complete' events (timestamps and durations in microseconds)"""
+        pid = os.getpid()
+        return [{'name': record.name, 'cat': 'exam_clone', 'ph': 'X',
+                 'ts': int(record.start * 1e6), 'dur': int(record.duration * 1e6),
+                 'pid': pid, 'tid': record.thread_id, 'args': record.counts}
+                for record in self.records]
+
+    def append_trace(self, path):
+        """
+        Append this run's events to a Chrome trace file in JSON array format.
+        The closing ']' is optional in that format, so runs are appended without
+        rewriting earlier ones and the file stays loadable after a crash.
+        """
+        events = self.trace_events()
+        if not events:
+            return
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, 'a', encoding='utf-8') as f:
+            if new_file:
+                f.write("[\n")
+            for event in events:
+                f.write(json.dumps(event) + ",\n")
+
+
+def _format_count(key, value):
+    if key.endswith('size') and isinstance(value, int):
+        return f"{value / 1024:.0f} KB"
+    return str(value)
+
+
+def trace_file_from_env():
+    """Trace file path from EXAM_CLONE_TRACE, or None"""
+    return os.environ.get(TRACE_FILE_ENV) or None
+
+
+def document_size(content):
+    """Size of a loaded document: characters of a raw capture, or scanned length of a ParsedExam"""
+    if isinstance(content, str):
+        return len(content)
+    return getattr(content, 'length', 0)
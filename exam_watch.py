@@ -0,0 +1,351 @@
+"""
+Watch-folder mode: analyse exam captures as they are saved into a directory
+The target is parsed once; every new or modified .html file is debounced until
+its writes have finished, compared against that target, and its report written
+to the output directory. Changes come from inotify on Linux, otherwise the
+directory is polled.
+
+Usage:
+    python -m exam_watch TARGET WATCH_DIR [--output-dir DIR] [--format json|jsonl|csv|text]
+                                          [--existing] [--poll] [--debounce 0.1] [--workers N]
+                                          [--engine hopcroft_karp]
+"""
+import os
+import sys
+import time
+import select
+import struct
+import logging
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from exam_parser import parse_exam, parse_exam_mapped
+from exam_matching import DEFAULT_MATCHING_ENGINE, ENGINE_CHOICES
+from exam_analysis import run_clone_analysis, format_report_lines
+from exam_report import REPORT_EXPORTERS, export_report
+from exam_progress import CancelToken
+from exam_batch import find_exam_files, _analyze_exam_file, _init_worker, _pool_context
+
+logger = logging.getLogger(__name__)
+
+WATCH_EXTENSIONS = ('.html', '.htm')
+# A file is analysed once it has seen no writes for this long
+DEBOUNCE_SECONDS = 0.1
+# Directory scan interval without inotify (a file also has to stay unchanged for one scan)
+POLL_INTERVAL = 0.5
+# Longest wait for events, so a cancelled watch stops promptly
+MAX_WAIT_SECONDS = 0.5
+REPORTS_SUBDIR = 'reports'
+
+# <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+INOTIFY_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len (name follows)
+
+
+def is_capture(name):
+    """HTML capture names; hidden and temporary files (e.g. '.~x.html') are skipped"""
+    return name.lower().endswith(WATCH_EXTENSIONS) and not name.startswith(('.', '~'))
+
+
+class InotifyWatcher:
+    """
+    Linux inotify on one directory (through libc with ctypes, no extra packages).
+    Browsers that save to a temporary name and rename show up as IN_MOVED_TO.
+    """
+
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    settle_seconds = 0.0
+
+    def __init__(self, directory):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+        self.directory = directory
+
+    def read(self, timeout):
+        """Names of files changed within timeout seconds (None after a queue overflow: rescan)"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            if mask & IN_Q_OVERFLOW:
+                return None
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback: rescans the directory and reports files whose size or mtime changed"""
+
+    def __init__(self, directory, interval=POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        # Settled only after a scan that saw no further change
+        self.settle_seconds = interval
+        self.signatures = self._scan()
+
+    def _scan(self):
+        signatures = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    pass  # removed while scanning
+        return signatures
+
+    def read(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        signatures = self._scan()
+        changed = [name for name, signature in signatures.items() if self.signatures.get(name) != signature]
+        self.signatures = signatures
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(directory, polling=False):
+    """inotify where available, otherwise the polling watcher"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            logger.info("inotify unavailable (%s), polling %s", e, directory)
+    return PollingWatcher(directory)
+
+
+class FolderWatch:
+    """
+    Analyses captures landing in `directory` against one pre-parsed target.
+
+        watch = FolderWatch(target_parsed, folder, on_result=print)
+        watch.run(cancel)          # until cancel.cancel() (or KeyboardInterrupt)
+
+    on_result(result) gets the same dicts as exam_batch.run_batch (exam, error,
+    analysis, seconds) plus 'report', the written report path. With workers > 1
+    captures are analysed in an exam_batch process pool and on_result is called
+    from the pool's result thread; otherwise on the watching thread.
+    """
+
+    def __init__(self, target, directory, output_dir=None, report_format='json',
+                 engine=DEFAULT_MATCHING_ENGINE, debounce=DEBOUNCE_SECONDS, polling=False,
+                 on_result=None, target_source=None, workers=1):
+        if report_format != 'text' and report_format not in REPORT_EXPORTERS:
+            raise ValueError(f"Unknown report format '{report_format}'")
+        self.target = parse_exam(target)
+        self.directory = directory
+        self.output_dir = output_dir or os.path.join(directory, REPORTS_SUBDIR)
+        self.report_format = report_format
+        self.engine = engine
+        self.debounce = debounce
+        self.polling = polling
+        self.on_result = on_result
+        self.workers = workers
+        self.target_source = target_source or "Pinned target"
+        # path -> (mtime_ns, size) last analysed, so repeated events don't re-run a file
+        self.processed = {}
+        # path -> time of the last write seen
+        self.pending = {}
+        self.analysed = 0
+
+    def report_path(self, exam_path):
+        stem = os.path.splitext(os.path.basename(exam_path))[0]
+        extension = 'txt' if self.report_format == 'text' else self.report_format
+        return os.path.join(self.output_dir, f"{stem}.report.{extension}")
+
+    def queue_existing(self):
+        """Analyse the captures already in the directory on the first pass"""
+        for path in find_exam_files(self.directory, WATCH_EXTENSIONS):
+            self.pending[path] = 0.0
+
+    def claim(self, exam_path):
+        """True when exam_path holds content not analysed yet (it may have vanished or be unchanged)"""
+        try:
+            stat = os.stat(exam_path)
+        except OSError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if stat.st_size == 0 or self.processed.get(exam_path) == signature:
+            return False
+        self.processed[exam_path] = signature
+        return True
+
+    def process(self, exam_path):
+        """Compare one capture and write its report"""
+        start_time = time.perf_counter()
+        try:
+            exam_parsed = parse_exam_mapped(exam_path)
+            analysis, error = run_clone_analysis(self.target, exam_parsed, engine=self.engine)
+        except Exception as e:
+            analysis, error = None, f"{type(e).__name__}: {e}"
+        return self.finish({
+            'exam': exam_path,
+            'error': error,
+            'analysis': analysis,
+            'seconds': time.perf_counter() - start_time,
+        })
+
+    def finish(self, result):
+        result['report'] = None
+        if result['analysis'] is not None:
+            try:
+                result['report'] = self.write_report(result['analysis'], result['exam'])
+            except OSError as e:
+                result['error'] = f"Report not written: {e}"
+        if self.on_result:
+            self.on_result(result)
+        return result
+
+    def _pool_done(self, exam_path, start_time, future):
+        # Captures still queued when the watch stops are cancelled, not reported
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            # A crashed worker (e.g. BrokenProcessPool) is reported like a failed analysis
+            result = {'exam': exam_path, 'error': f"{type(e).__name__}: {e}", 'analysis': None,
+                      'seconds': time.perf_counter() - start_time}
+        self.finish(result)
+
+    def write_report(self, analysis, exam_path):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = self.report_path(exam_path)
+        # Written under a temporary name, so readers of the output folder never see half a report
+        temp_path = path + '.tmp'
+        if self.report_format == 'text':
+            with open(temp_path, 'w', encoding='utf-8') as out:
+                for line in format_report_lines(analysis, self.target_source,
+                                                f"File: {os.path.basename(exam_path)}"):
+                    out.write(line)
+        else:
+            export_report(analysis, temp_path, self.report_format)
+        os.replace(temp_path, path)
+        return path
+
+    def run(self, cancel=None):
+        """Watch until cancelled; returns the number of captures analysed"""
+        cancel = cancel or CancelToken()
+        watcher = open_watcher(self.directory, self.polling)
+        settle = max(self.debounce, watcher.settle_seconds)
+        logger.info("Watching %s with %s (settle %.2fs)", self.directory, type(watcher).__name__, settle)
+        pool = None
+        if self.workers > 1:
+            # Workers get the parsed target once, as in exam_batch
+            pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context(),
+                                       initializer=_init_worker, initargs=(self.target, self.engine))
+        try:
+            while not cancel.cancelled:
+                now = time.monotonic()
+                waits = [last + settle - now for last in self.pending.values()]
+                names = watcher.read(max(0.0, min(waits + [MAX_WAIT_SECONDS])))
+                now = time.monotonic()
+                if names is None:
+                    # Events were dropped: treat every capture as possibly changed
+                    names = [os.path.basename(path) for path in find_exam_files(self.directory, WATCH_EXTENSIONS)]
+                for name in names:
+                    if is_capture(name):
+                        self.pending[os.path.join(self.directory, name)] = now
+
+                for path in [path for path, last in self.pending.items() if now - last >= settle]:
+                    del self.pending[path]
+                    if not self.claim(path):
+                        continue
+                    self.analysed += 1
+                    if pool is None:
+                        self.process(path)
+                    else:
+                        pool.submit(_analyze_exam_file, path).add_done_callback(
+                            partial(self._pool_done, path, time.perf_counter()))
+        finally:
+            watcher.close()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        return self.analysed
+
+
+def print_result(result):
+    name = os.path.basename(result['exam'])
+    if result['error']:
+        print(f"❌ {name}: {result['error']} ({result['seconds'] * 1000:.1f} ms)")
+        return
+    summary = result['analysis']['summary']
+    print(f"✅ {name}: {summary['changes_needed']} changes, {summary['unknown']} unknown, "
+          f"{summary['success_rate']:.1f}% mapped ({result['seconds'] * 1000:.1f} ms) "
+          f"→ {os.path.basename(result['report'])}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="exam_watch",
+                                     description="Analyse exam captures as they are saved into a folder")
+    parser.add_argument("target", help="target HTML file (correct answers), parsed once")
+    parser.add_argument("watch_dir", help="folder the exam captures are saved into")
+    parser.add_argument("--output-dir", help=f"where reports are written (default: WATCH_DIR/{REPORTS_SUBDIR})")
+    parser.add_argument("--format", choices=['text'] + list(REPORT_EXPORTERS), default='json',
+                        help="report format (default: json)")
+    parser.add_argument("--engine", choices=ENGINE_CHOICES, default=DEFAULT_MATCHING_ENGINE)
+    parser.add_argument("--existing", action="store_true", help="also analyse the captures already in the folder")
+    parser.add_argument("--poll", action="store_true", help="poll the folder instead of using inotify")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="analyse captures in this many worker processes (default: 1, in the watcher)")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS,
+                        help=f"seconds without writes before a capture is analysed (default: {DEBOUNCE_SECONDS})")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.watch_dir):
+        print(f"error: {args.watch_dir} is not a directory", file=sys.stderr)
+        return 1
+    try:
+        target_parsed = parse_exam_mapped(args.target)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    watch = FolderWatch(target_parsed, args.watch_dir, output_dir=args.output_dir, report_format=args.format,
+                        engine=args.engine, debounce=args.debounce, polling=args.poll, on_result=print_result,
+                        target_source=f"File: {args.target}", workers=args.workers)
+    if args.existing:
+        watch.queue_existing()
+    print(f"👁️ Watching {args.watch_dir} ({len(watch.target)} target questions) - reports in {watch.output_dir}")
+    print("   Press Ctrl+C to stop")
+    try:
+        watch.run()
+    except KeyboardInterrupt:
+        pass
+    print(f"⏹️ Stopped after {watch.analysed} captures")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Question bank tests
+Completion only extends truncated sections, never replaces captured IDs, and
+with a target only adds IDs that appear in that target.
+"""
+import os
+import sys
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from exam_bank import QuestionBank  # noqa: E402
+from exam_parser import ParsedExam  # noqa: E402
+
+
+def parsed_document(sections):
+    """ParsedExam with one question per section (the section's first ID is its main ID)"""
+    parsed = ParsedExam()
+    parsed.numbered = [(str(number), ids[0]) for number, ids in enumerate(sections, 1)]
+    parsed.section_ids = [list(ids) for ids in sections]
+    return parsed
+
+
+class QuestionBankTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bank = QuestionBank(':memory:')
+
+    def tearDown(self):
+        self.bank.close()
+
+    def test_ids_the_bank_cannot_store_are_skipped(self):
+        too_big = str(2 ** 70)
+        added = self.bank.ingest(parsed_document([['1', 'abc', '2'], [too_big, '3', '4']]))
+        self.assertEqual(added, 4)
+        self.assertEqual(self.bank.alternatives('abc'), [])
+        self.assertEqual(self.bank.alternatives(too_big), [])
+        self.assertEqual(self.bank.groups_for(['1', too_big, '4']), {'1': ['1', '2'], '4': ['3', '4']})
+
+    def test_only_truncated_sections_are_extended(self):
+        self.bank.ingest(parsed_document([['1', '2', '3'], ['7', '8', '9']]))
+        exam = parsed_document([['1', '2', '3'], ['7', '8'], ['2']])
+        target = parsed_document([['9', '7', '8'], ['5', '6']])
+        completed, added = self.bank.complete(exam, target)
+        self.assertEqual(completed.section_ids, [['1', '2', '3'], ['7', '8', '9'], ['2']])
+        self.assertEqual(added, 1)
+        # The cached original keeps its captured sections
+        self.assertEqual(exam.section_ids[1], ['7', '8'])
+
+    def test_merged_groups_only_add_target_ids(self):
+        self.bank.ingest(parsed_document([['1', '2', '3'], ['7', '8', '9']]))
+        # A bad capture joins the two unrelated groups
+        self.bank.ingest(parsed_document([['3', '7']]))
+        self.assertEqual(self.bank.alternatives('1'), ['1', '2', '3', '7', '8', '9'])
+
+        exam = parsed_document([['5001', '1']])
+        target = parsed_document([['2', '3', '1'], ['40', '41']])
+        completed, added = self.bank.complete(exam, target)
+        self.assertEqual(completed.section_ids, [['5001', '1', '2', '3']])
+        self.assertEqual(added, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Import regression test
+The headless modules must not pull in the GUI, browser capture or update
+dependencies, and the GUI only imports capture/update modules on first use
+(load_capture_modules / load_auto_updater). Every module is imported in a
+fresh interpreter, so the result does not depend on timing or on what the
+test process has already imported.
+"""
+import os
+import sys
+import json
+import unittest
+import subprocess
+import importlib.util
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEADLESS_MODULES = ['exam_analysis', 'exam_cli', 'exam_batch', 'exam_watch', 'exam_library', 'exam_bank']
+DEFERRED_MODULES = ['tkinter', 'auto_updater', 'requests', 'win32gui', 'win32clipboard', 'pyautogui']
+
+
+def modules_loaded_by(module, watched):
+    """Which of the watched modules are in sys.modules after importing module in a new interpreter"""
+    code = f"import json, sys, {module}; print(json.dumps([name for name in {watched!r} if name in sys.modules]))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise AssertionError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class ImportDependencyTest(unittest.TestCase):
+
+    def test_headless_modules_skip_gui_capture_and_update_dependencies(self):
+        for module in HEADLESS_MODULES:
+            with self.subTest(module=module):
+                self.assertEqual(modules_loaded_by(module, DEFERRED_MODULES), [])
+
+    @unittest.skipUnless(importlib.util.find_spec('tkinter'), "tkinter is not installed")
+    def test_gui_defers_capture_and_update_dependencies(self):
+        # The window is built right away, so only tkinter is imported eagerly
+        watched = [name for name in DEFERRED_MODULES if name != 'tkinter']
+        self.assertEqual(modules_loaded_by('exam_clone_tool_v2', watched), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
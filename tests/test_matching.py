@@ -0,0 +1,53 @@
+"""
+Matching engine regression tests
+Questions an engine cannot place stay unmapped and are reported as unknown;
+they never abort the analysis, whichever engine is selected.
+"""
+import os
+import sys
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from exam_analysis import extract_comp_test_mapping_from_content, run_clone_analysis  # noqa: E402
+from exam_matching import ENGINE_CHOICES  # noqa: E402
+
+
+def exam_html(questions):
+    """Minimal capture: questions is a list of (main_id, [alternative IDs]) in question order"""
+    parts = ['<html><body>']
+    for number, (main_id, alternatives) in enumerate(questions, 1):
+        parts.append(f'<div><p>{number}. Question text? (id:{main_id})</p><ul>')
+        parts.extend(f'<li>Alternative (id:{alt_id})</li>' for alt_id in alternatives)
+        parts.append('</ul></div>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+class UnmatchedQuestionTest(unittest.TestCase):
+
+    def setUp(self):
+        # Target Q1-Q6 hold 1001-1006; exam Q1 and Q2 both only offer 1001
+        self.target = exam_html([(str(1000 + n), []) for n in range(1, 7)])
+        self.exam = exam_html([('5001', ['1001']), ('5002', ['1001'])] +
+                              [(str(1000 + n), []) for n in range(3, 7)])
+
+    def test_two_questions_sharing_one_id_map_one_on_every_engine(self):
+        for engine in ENGINE_CHOICES:
+            with self.subTest(engine=engine):
+                mapping, error = extract_comp_test_mapping_from_content(self.target, self.exam, engine=engine)
+                self.assertIsNone(error)
+                self.assertEqual(mapping, {'5001': '1001'})
+
+    def test_unmatched_question_is_reported_as_unknown_on_every_engine(self):
+        for engine in ENGINE_CHOICES:
+            with self.subTest(engine=engine):
+                analysis, error = run_clone_analysis(self.target, self.exam, engine=engine)
+                self.assertIsNone(error)
+                self.assertEqual(analysis['summary']['unknown'], 1)
+                self.assertEqual(analysis['entries'][1]['status'], 'no_alternatives')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,360 @@
+"""
+Auto-updater tests against a local HTTP stand-in for the GitHub release API
+The stand-in answers queued replies per path (status, headers, body), serves
+release assets with Range support (optionally dropping the connection part
+way through a body), and records every request so the tests can check what
+reached the network.
+"""
+import io
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import shutil
+import tempfile
+import threading
+import unittest
+import contextlib
+import importlib.util
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+REQUESTS_AVAILABLE = importlib.util.find_spec('requests') is not None
+if REQUESTS_AVAILABLE:
+    import auto_updater
+
+RELEASE_PATH = '/repos/owner/exam-clone-tool/releases/latest'
+EXE_NAME = 'Exam_Clone_Tool_v2.exe'
+EXE_PATH = f'/download/{EXE_NAME}'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head=False):
+        stand_in = self.server.stand_in
+        stand_in.requests.append((self.command, self.path, dict(self.headers)))
+        if self.path in stand_in.files:
+            self.send_file(stand_in, stand_in.files[self.path], head)
+            return
+        queued = stand_in.replies.get(self.path)
+        if not queued:
+            self.reply(404, {}, b'', head)
+            return
+        # The last reply repeats once the queue is down to it
+        status, headers, body = queued.pop(0) if len(queued) > 1 else queued[0]
+        self.reply(status, headers, body, head)
+
+    def send_file(self, stand_in, data, head):
+        headers = {'Accept-Ranges': 'bytes'}
+        status, start, end = 200, 0, len(data) - 1
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            if start >= len(data):
+                self.reply(416, {'Content-Range': f"bytes */{len(data)}"}, b'', head)
+                return
+            status = 206
+            headers['Content-Range'] = f"bytes {start}-{end}/{len(data)}"
+        body = data[start:end + 1]
+        drop_after = None if head else stand_in.drop_after.pop(self.path, None)
+        if drop_after is None:
+            self.reply(status, headers, body, head)
+            return
+        # Announce the whole body, send part of it and hang up
+        self.reply(status, headers, body[:drop_after], head, length=len(body))
+        self.close_connection = True
+
+    def reply(self, status, headers, body, head=False, length=None):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body) if length is None else length))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+
+    def handle_error(self, request, client_address):
+        # Aborted downloads hang up on purpose; the tests check the client side
+        pass
+
+
+class StandInServer:
+    """Local HTTP server on a free port, run on a daemon thread"""
+
+    def __init__(self):
+        self.replies = {}  # path -> [(status, headers, body), ...]
+        self.files = {}  # path -> bytes, served with Range support
+        self.drop_after = {}  # path -> bytes sent before the next GET of that file is cut off
+        self.requests = []  # (method, path, headers) of every request
+        self.httpd = QuietHTTPServer(('127.0.0.1', 0), StandInHandler)
+        self.httpd.stand_in = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def requests_for(self, path):
+        return [request for request in self.requests if request[1] == path]
+
+
+def json_reply(data, status=200, **headers):
+    return status, dict(headers, **{'Content-Type': 'application/json'}), json.dumps(data).encode('utf-8')
+
+
+@unittest.skipUnless(REQUESTS_AVAILABLE, "requests is not installed")
+class UpdaterTestCase(unittest.TestCase):
+    """A stand-in server plus an AutoUpdater whose cache, download and staging dirs are temporary"""
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        # The updater reports on stdout
+        quiet = contextlib.redirect_stdout(io.StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+        self.updater = self.make_updater()
+
+    def make_updater(self, cache_name='release_cache.json', **options):
+        updater = auto_updater.AutoUpdater(
+            '1.0.0', 'owner/exam-clone-tool', exe_name=EXE_NAME, api_url=self.server.url(RELEASE_PATH),
+            cache_path=os.path.join(self.directory, cache_name),
+            download_dir=os.path.join(self.directory, 'downloads'),
+            staging_dir=os.path.join(self.directory, 'staged'), **options)
+        self.addCleanup(updater.session.close)
+        return updater
+
+    def release(self, version='2.0.0', assets=()):
+        exe_url = self.server.url(EXE_PATH)
+        return {'tag_name': f'v{version}', 'body': 'Release notes',
+                'assets': list(assets) or [{'name': EXE_NAME, 'browser_download_url': exe_url, 'size': 1}]}
+
+    def publish(self, data, published=None, extra_assets=()):
+        """Serve data as the release exe, with the SHA-256 of `published` (default: data) as its digest"""
+        self.server.files[EXE_PATH] = data
+        digest = hashlib.sha256(data if published is None else published).hexdigest()
+        asset = {'name': EXE_NAME, 'browser_download_url': self.server.url(EXE_PATH), 'size': len(data),
+                 'digest': f"sha256:{digest}"}
+        self.updater.latest_release = self.release(assets=[asset, *extra_assets])
+        return self.server.url(EXE_PATH)
+
+    def exe_requests(self, method='GET'):
+        return [headers for request_method, _, headers in self.server.requests_for(EXE_PATH)
+                if request_method == method]
+
+    def download_files(self):
+        return sorted(os.listdir(self.updater.download_dir)) if os.path.isdir(self.updater.download_dir) else []
+
+
+class ReleaseCheckTest(UpdaterTestCase):
+
+    def test_etag_revalidation_answers_304_from_the_cache(self):
+        release = self.release()
+        self.server.replies[RELEASE_PATH] = [json_reply(release, ETag='"v2-etag"'), (304, {}, b'')]
+
+        data, source = self.updater.fetch_latest_release(force=True)
+        self.assertEqual((data['tag_name'], source), ('v2.0.0', 'fresh'))
+        data, source = self.updater.fetch_latest_release(force=True)
+        self.assertEqual((data['tag_name'], source), ('v2.0.0', 'not_modified'))
+
+        requests = self.server.requests_for(RELEASE_PATH)
+        self.assertEqual(len(requests), 2)
+        self.assertNotIn('If-None-Match', requests[0][2])
+        self.assertEqual(requests[1][2]['If-None-Match'], '"v2-etag"')
+        # A 304 still yields the cached release's update
+        self.assertEqual(self.updater.check_for_updates(force=True)[0], '2.0.0')
+
+    def test_recent_check_is_answered_from_the_cache(self):
+        self.server.replies[RELEASE_PATH] = [json_reply(self.release(), ETag='"v2-etag"')]
+        self.updater.fetch_latest_release()
+        # A new updater (next start of the tool) reads the cache file
+        data, source = self.make_updater().fetch_latest_release()
+        self.assertEqual((data['tag_name'], source), ('v2.0.0', 'cached'))
+        self.assertEqual(len(self.server.requests_for(RELEASE_PATH)), 1)
+
+    def test_rate_limit_backs_off_until_retry_after(self):
+        for status in (403, 429):
+            with self.subTest(status=status):
+                cache_name = f'release_cache_{status}.json'
+                self.server.requests.clear()
+                updater = self.make_updater(cache_name)
+                self.server.replies[RELEASE_PATH] = [json_reply(self.release(), ETag='"v2-etag"'),
+                                                     json_reply({'message': 'rate limited'}, status,
+                                                                **{'Retry-After': '120'})]
+                updater.fetch_latest_release(force=True)
+                started = time.time()
+                data, source = updater.fetch_latest_release(force=True)
+                # The cached release is used while backing off, even when forced
+                self.assertEqual((data['tag_name'], source), ('v2.0.0', 'cached'))
+                self.assertAlmostEqual(updater.cache.data['retry_after'], started + 120, delta=5)
+                self.assertEqual(self.make_updater(cache_name).fetch_latest_release(force=True)[1], 'cached')
+                self.assertEqual(len(self.server.requests_for(RELEASE_PATH)), 2)
+
+    def test_missing_release_is_remembered(self):
+        self.server.replies[RELEASE_PATH] = [json_reply({'message': 'Not Found'}, 404)]
+        self.assertEqual(self.updater.fetch_latest_release(), (None, 'not_found'))
+        self.assertEqual(self.make_updater().fetch_latest_release(), (None, 'not_found'))
+        self.assertEqual(self.updater.check_for_updates(), (None, None, None))
+        self.assertEqual(len(self.server.requests_for(RELEASE_PATH)), 1)
+
+
+def payload(size, seed=0):
+    return random.Random(seed).randbytes(size)
+
+
+class DownloadTest(UpdaterTestCase):
+
+    def test_dropped_download_resumes_with_a_range_request(self):
+        data = payload(1024 * 1024)
+        url = self.publish(data)
+        self.server.drop_after[EXE_PATH] = 300 * 1024
+
+        self.assertIsNone(self.updater.stage_update(url, '2.0.0'))
+        part_files = [name for name in self.download_files() if name.endswith('.part')]
+        self.assertEqual(len(part_files), 1)
+        kept = os.path.getsize(os.path.join(self.updater.download_dir, part_files[0]))
+        self.assertTrue(0 < kept < len(data))
+
+        staged_path = self.updater.stage_update(url, '2.0.0')
+        self.assertIsNotNone(staged_path)
+        with open(staged_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        requests = self.exe_requests()
+        self.assertEqual(len(requests), 2)
+        self.assertNotIn('Range', requests[0])
+        self.assertEqual(requests[1]['Range'], f"bytes={kept}-")
+        self.assertEqual(self.download_files(), [])
+
+    def test_corrupted_payload_is_rejected_and_not_staged(self):
+        data = payload(256 * 1024)
+        corrupted = bytearray(data)
+        corrupted[1000] ^= 0xff
+        url = self.publish(bytes(corrupted), published=data)
+
+        self.assertIsNone(self.updater.stage_update(url, '2.0.0'))
+        self.assertIsNone(self.updater.staged_update())
+        self.assertFalse(os.path.exists(self.updater.staging_dir))
+        # The bad download is deleted, so the next attempt does not resume it
+        self.assertEqual(self.download_files(), [])
+
+    def test_parallel_ranges_are_verified(self):
+        data = payload(1024 * 1024)
+        updater = self.updater = self.make_updater(parallel_downloads=4)
+        url = self.publish(data)
+        with mock.patch.object(auto_updater, 'PARALLEL_MIN_SIZE', 64 * 1024):
+            staged_path = updater.stage_update(url, '2.0.0')
+        self.assertIsNotNone(staged_path)
+        with open(staged_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(sorted(headers['Range'] for headers in self.exe_requests()),
+                         sorted(f"bytes={i * len(data) // 4}-{(i + 1) * len(data) // 4 - 1}" for i in range(4)))
+
+    def test_dropped_parallel_range_is_discarded(self):
+        data = payload(1024 * 1024)
+        updater = self.updater = self.make_updater(parallel_downloads=4)
+        url = self.publish(data)
+        self.server.drop_after[EXE_PATH] = 32 * 1024
+        with mock.patch.object(auto_updater, 'PARALLEL_MIN_SIZE', 64 * 1024):
+            self.assertIsNone(updater.stage_update(url, '2.0.0'))
+        self.assertIsNone(updater.staged_update())
+        # A part file with holes cannot be resumed as one stream
+        self.assertEqual(self.download_files(), [])
+
+
+class DeltaUpdateTest(UpdaterTestCase):
+    """The installed exe and the new release share a prefix and a suffix; only the middle changed"""
+
+    def setUp(self):
+        super().setUp()
+        prefix, suffix = payload(1024 * 1024, seed=1), payload(1024 * 1024, seed=2)
+        self.old = prefix + payload(64 * 1024, seed=3) + suffix
+        self.new = prefix + payload(100 * 1024, seed=4) + suffix
+        self.updater.current_exe_path = self.write_file('installed.exe', self.old)
+
+    def write_file(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def publish_with_manifest(self, manifest_source=None):
+        """Publish self.new with a '.blocks.json' built from manifest_source (default: self.new)"""
+        manifest_path = EXE_PATH + auto_updater.DELTA_MANIFEST_SUFFIX
+        if manifest_source is not None:
+            manifest = auto_updater.build_delta_manifest(self.write_file('manifest_source.exe', manifest_source))
+            self.server.files[manifest_path] = json.dumps(manifest).encode('utf-8')
+        manifest_asset = {'name': EXE_NAME + auto_updater.DELTA_MANIFEST_SUFFIX,
+                          'browser_download_url': self.server.url(manifest_path)}
+        return self.publish(self.new, extra_assets=[manifest_asset])
+
+    def changed_bytes(self):
+        """Bytes of the new exe in chunks the installed exe does not contain"""
+        local = {auto_updater.chunk_digest(self.old[offset:offset + length])
+                 for offset, length in auto_updater.content_chunks(self.old)}
+        return sum(length for offset, length in auto_updater.content_chunks(self.new)
+                   if auto_updater.chunk_digest(self.new[offset:offset + length]) not in local)
+
+    def range_bytes(self, requests):
+        spans = [re.fullmatch(r'bytes=(\d+)-(\d+)', headers['Range']).groups() for headers in requests]
+        return sum(int(end) - int(start) + 1 for start, end in spans)
+
+    def assert_downloaded_new_exe(self, path):
+        self.assertIsNotNone(path)
+        with open(path, 'rb') as f:
+            self.assertEqual(hashlib.sha256(f.read()).hexdigest(), hashlib.sha256(self.new).hexdigest())
+
+    def test_only_changed_chunks_are_fetched(self):
+        url = self.publish_with_manifest(self.new)
+        self.assert_downloaded_new_exe(self.updater.download_update(url))
+
+        requests = self.exe_requests()
+        self.assertTrue(requests)
+        self.assertTrue(all('Range' in headers for headers in requests))
+        changed = self.changed_bytes()
+        self.assertEqual(self.range_bytes(requests), changed)
+        self.assertLess(changed, len(self.new) // 4)
+
+    def test_missing_block_map_falls_back_to_a_full_download(self):
+        # The release lists the '.blocks.json' asset, but the server answers 404
+        url = self.publish_with_manifest()
+        self.assert_downloaded_new_exe(self.updater.download_update(url))
+        self.assertEqual([headers.get('Range') for headers in self.exe_requests()], [None])
+
+    def test_stale_block_map_falls_back_to_a_full_download(self):
+        # A block map of another build: the fetched chunks do not match its digests
+        url = self.publish_with_manifest(self.old[:-1024] + payload(2048, seed=5))
+        self.assert_downloaded_new_exe(self.updater.download_update(url))
+        requests = self.exe_requests()
+        self.assertIn('Range', requests[0])
+        self.assertNotIn('Range', requests[-1])
+        self.assertEqual(self.download_files(), [EXE_NAME])
+
+
+if __name__ == "__main__":
+    unittest.main()